@@ -0,0 +1,39 @@
+"""
+性能基准脚本
+
+在临时测试数据库中运行，不会修改开发数据库：
+    python -m benchmarks.slugs
+"""
+import math
+import os
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_blog_backend.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """创建临时测试数据库，结束后销毁"""
+    from django.test.utils import setup_databases, teardown_databases
+
+    config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(config, verbosity=0)
+
+
+def percentile(sorted_values, q):
+    """
+    最近秩法计算分位数
+    :param sorted_values: 已排序的数值列表
+    :param q: 分位（0 到 100）
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
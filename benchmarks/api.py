@@ -0,0 +1,178 @@
+"""
+接口基准：生成合成语料后通过 Django 测试客户端依次请求各接口，
+统计吞吐量、延迟分位数和查询数，结果输出为 JSON 便于对比不同版本：
+
+    python -m benchmarks.api --posts 10000 --requests 200 --output before.json
+    python -m benchmarks.api --posts 10000 --requests 200 --output after.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks import percentile, setup_django, test_database
+
+setup_django()
+
+import django
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from benchmarks.corpus import BENCH_PASSWORD, BENCH_USERNAME, CorpusGenerator
+from blog.models import Post, TagStat
+
+SEARCH_TERMS = ['django', '性能', '数据库 索引', 'cache', '异步编程', 'shujuku']
+
+
+class Scenarios:
+    """各接口的请求，每次调用随机选取参数"""
+
+    def __init__(self, client, seed=0):
+        self.client = client
+        self.rng = random.Random(seed)
+        self.post_slugs = list(
+            Post.objects.filter(published=True).order_by('?').values_list('slug', flat=True)[:1000]
+        )
+        self.tag_names = list(
+            TagStat.objects.filter(post_count__gt=0).order_by('-post_count')
+            .values_list('tag__name', flat=True)[:50]
+        )
+
+    def list(self):
+        return self.client.get('/api/posts/')
+
+    def detail(self):
+        return self.client.get(f'/api/posts/{self.rng.choice(self.post_slugs)}/')
+
+    def search(self):
+        return self.client.get('/api/posts/', {'search': self.rng.choice(SEARCH_TERMS)})
+
+    def tag_filter(self):
+        return self.client.get('/api/posts/', {'tags': self.rng.choice(self.tag_names)})
+
+    def tags(self):
+        return self.client.get('/api/posts/tags/')
+
+    def login(self):
+        return self.client.post('/api/auth/login/', {
+            'username': BENCH_USERNAME,
+            'password': BENCH_PASSWORD,
+        }, content_type='application/json')
+
+
+def run_scenario(request, count, warmup=3):
+    """
+    依次发送请求
+    :return: 统计结果
+    """
+    for _ in range(warmup):
+        request()
+
+    latencies = []
+    queries = []
+    errors = 0
+    current = {'queries': 0}
+
+    def count_queries(execute, sql, params, many, context):
+        current['queries'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        started = time.perf_counter()
+        for _ in range(count):
+            current['queries'] = 0
+            start = time.perf_counter()
+            response = request()
+            latencies.append(time.perf_counter() - start)
+            queries.append(current['queries'])
+            if response.status_code != 200:
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': count,
+        'errors': errors,
+        'throughput_rps': round(count / elapsed, 2),
+        'latency_ms': {
+            name: round(percentile(latencies, q) * 1000, 3)
+            for name, q in (('p50', 50), ('p90', 90), ('p95', 95), ('p99', 99), ('max', 100))
+        },
+        'queries': {
+            'mean': round(sum(queries) / count, 2),
+            'max': max(queries),
+        },
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=10000, help='生成的文章数（建议 1 万到 100 万）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--batch-size', type=int, default=2000, help='生成语料时每批写入的文章数')
+    parser.add_argument('--requests', type=int, default=200, help='每个接口的请求数')
+    parser.add_argument('--login-requests', type=int, default=20, help='登录接口的请求数（密码哈希较慢）')
+    parser.add_argument('--scenarios', default='list,detail,search,tag_filter,tags,login',
+                        help='逗号分隔的接口列表')
+    parser.add_argument('--cache', action='store_true', help='启用响应缓存（默认关闭，测量数据库读取路径）')
+    parser.add_argument('--output', help='结果文件，默认输出到标准输出')
+    args = parser.parse_args()
+
+    timeout = 300 if args.cache else 0
+    # 登录限流会拒绝重复的登录请求，基准中关闭
+    with test_database(), override_settings(BLOG_CACHE_TIMEOUT=timeout, BLOG_AUTH_THROTTLES={},
+                                            ALLOWED_HOSTS=['testserver']):
+        started = time.perf_counter()
+        CorpusGenerator(seed=args.seed).generate(
+            args.posts,
+            batch_size=args.batch_size,
+            progress=lambda done: print(f'已生成 {done}/{args.posts} 篇文章', file=sys.stderr)
+        )
+        generate_seconds = time.perf_counter() - started
+
+        scenarios = Scenarios(Client(), seed=args.seed)
+        results = {}
+        for name in args.scenarios.split(','):
+            name = name.strip()
+            count = args.login_requests if name == 'login' else args.requests
+            print(f'运行 {name} ...', file=sys.stderr)
+            results[name] = run_scenario(getattr(scenarios, name), count)
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'posts': args.posts,
+                'seed': args.seed,
+                'cache': args.cache,
+                'generate_seconds': round(generate_seconds, 2),
+            },
+            'results': results,
+        }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
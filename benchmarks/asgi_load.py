@@ -0,0 +1,190 @@
+"""
+WSGI / ASGI 负载基准：在相同并发下对比文章只读接口的吞吐量和延迟
+
+在进程内直接调用 WSGIHandler（线程池模拟多线程服务器）和 ASGIHandler（事件循环中的并发任务），
+不包含网络开销，只比较框架和视图本身：
+
+    python -m benchmarks.asgi_load --posts 500 --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentile, setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from blog.bulk import PostImporter
+from blog.models import Post
+from my_blog_backend.urls import async_post_urls, router
+
+# ASGI 模式使用的路由：启用异步视图
+urlpatterns = async_post_urls + [path('api/', include(router.urls))]
+
+TAGS = ['Python', 'Django', 'Vue.js', 'SQLite', '异步', '性能']
+
+
+def create_posts(count):
+    author = User.objects.create_user('bench', 'bench@example.com', 'bench')
+    lines = (
+        json.dumps({
+            'title': f'Benchmark post {i}',
+            'content': f'Django async benchmark content {i} ' * 40,
+            'published': True,
+            'tags': [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]],
+        })
+        for i in range(count)
+    )
+    PostImporter(author).run(lines)
+
+
+def make_targets():
+    slugs = list(Post.objects.order_by('-pk').values_list('slug', flat=True)[:5])
+    targets = [('/api/posts/', ''), ('/api/posts/tags/', ''), ('/api/posts/', 'search=async')]
+    targets += [(f'/api/posts/{slug}/', '') for slug in slugs]
+    return targets
+
+
+def wsgi_environ(path_info, query):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path_info,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def asgi_scope(path_info, query):
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path_info,
+        'raw_path': path_info.encode('utf-8'),
+        'query_string': query.encode('utf-8'),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+
+
+def run_wsgi(targets, total, concurrency):
+    handler = WSGIHandler()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def start_response(status, headers):
+        if not status.startswith('200'):
+            errors.append(status)
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            path_info, query = targets[index % len(targets)]
+            start = time.perf_counter()
+            response = handler(wsgi_environ(path_info, query), start_response)
+            b''.join(response)
+            response.close()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(worker)
+    return time.perf_counter() - start, latencies, errors
+
+
+def run_asgi(targets, total, concurrency):
+    handler = ASGIHandler()
+    latencies = []
+    errors = []
+    counter = iter(range(total))
+
+    async def request(path_info, query):
+        messages = asyncio.Queue()
+        messages.put_nowait({'type': 'http.request', 'body': b'', 'more_body': False})
+
+        # 请求体之后 Django 会持续等待断开消息，直到响应完成
+        async def receive():
+            return await messages.get()
+
+        async def send(message):
+            if message['type'] == 'http.response.start' and message['status'] != 200:
+                errors.append(message['status'])
+
+        await handler(asgi_scope(path_info, query), receive, send)
+
+    async def worker():
+        for index in counter:
+            path_info, query = targets[index % len(targets)]
+            start = time.perf_counter()
+            await request(path_info, query)
+            latencies.append(time.perf_counter() - start)
+
+    async def main():
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(label, elapsed, latencies, errors):
+    latencies = sorted(latencies)
+    p50 = percentile(latencies, 50)
+    p99 = percentile(latencies, 99)
+    print(
+        f'{label:<5} requests={len(latencies):<6} rps={len(latencies) / elapsed:8.1f} '
+        f'p50={p50 * 1000:7.2f}ms p99={p99 * 1000:7.2f}ms errors={len(errors)}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=500, help='测试文章数')
+    parser.add_argument('--requests', type=int, default=2000, help='每种模式的请求数')
+    parser.add_argument('--concurrency', type=int, default=32, help='并发数')
+    parser.add_argument('--cache', action='store_true', help='启用响应缓存（默认关闭，测量数据库读取路径）')
+    args = parser.parse_args()
+
+    timeout = 300 if args.cache else 0
+    with test_database(), override_settings(BLOG_CACHE_TIMEOUT=timeout):
+        create_posts(args.posts)
+        targets = make_targets()
+
+        with override_settings(ALLOWED_HOSTS=['localhost']):
+            report('wsgi', *run_wsgi(targets, args.requests, args.concurrency))
+            with override_settings(ROOT_URLCONF='benchmarks.asgi_load'):
+                report('asgi', *run_asgi(targets, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+合成文章语料生成器
+
+生成中英文混合的文章，标签按 Zipf 分布（少数热门标签、大量长尾标签），
+正文长度按对数正态分布，创建时间分布在最近几年内。全部通过 bulk_create 批量写入，
+随后重建标签统计和全文索引（可选重建相关文章）。
+"""
+import math
+import random
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post, PostTag, RelatedPost, Tag, TagStat
+from blog.search import get_search_backend
+from blog.utils import ContentStats
+
+ZH_WORDS = [
+    '博客', '开发', '实践', '指南', '异步', '编程', '数据库', '性能', '优化', '部署',
+    '前端', '后端', '架构', '缓存', '索引', '查询', '接口', '测试', '容器', '服务',
+    '分布式', '监控', '日志', '安全', '认证', '搜索', '算法', '设计', '模式', '重构',
+]
+EN_WORDS = [
+    'python', 'django', 'rest', 'api', 'query', 'index', 'cache', 'async', 'deploy', 'vue',
+    'component', 'router', 'serializer', 'database', 'latency', 'throughput', 'profile',
+    'benchmark', 'schema', 'migration', 'token', 'search', 'ranking', 'queue', 'worker',
+]
+TAG_NAMES = [
+    'Python', 'Django', 'Vue.js', 'JavaScript', 'SQLite', 'PostgreSQL', 'Redis', 'Docker',
+    '前端', '后端', '数据库', '性能优化', '架构', '算法', '运维', '安全', '测试', '随笔',
+]
+
+# 用于登录基准的用户
+BENCH_USERNAME = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+
+def zipf_weights(count, exponent=1.1):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+class CorpusGenerator:
+    """
+    :param seed: 随机种子，相同参数生成相同的语料
+    :param tag_count: 标签总数
+    :param zh_ratio: 中文文章比例
+    :param published_ratio: 已发布文章比例
+    :param years: 创建时间分布的年数
+    """
+
+    def __init__(self, seed=0, tag_count=500, zh_ratio=0.6, published_ratio=0.9, years=3):
+        self.rng = random.Random(seed)
+        self.tags = TAG_NAMES + [f'topic-{i}' for i in range(max(0, tag_count - len(TAG_NAMES)))]
+        self.tag_weights = zipf_weights(len(self.tags))
+        self.zh_ratio = zh_ratio
+        self.published_ratio = published_ratio
+        self.span = timedelta(days=365 * years)
+        self.now = timezone.now()
+
+    def sentence(self, zh):
+        rng = self.rng
+        if zh:
+            words = rng.choices(ZH_WORDS, k=rng.randint(6, 14))
+            # 中文文章中也夹杂英文术语
+            if rng.random() < 0.3:
+                words.insert(rng.randrange(len(words)), f' {rng.choice(EN_WORDS)} ')
+            return ''.join(words) + '。'
+        words = rng.choices(EN_WORDS, k=rng.randint(8, 18))
+        return ' '.join(words).capitalize() + '. '
+
+    def body(self, zh):
+        """正文长度按对数正态分布，中位数约 1500 字符"""
+        length = min(30000, max(200, int(self.rng.lognormvariate(math.log(1500), 0.8))))
+        parts = []
+        size = 0
+        while size < length:
+            paragraph = ''.join(self.sentence(zh) for _ in range(self.rng.randint(3, 6)))
+            parts.append(paragraph)
+            size += len(paragraph)
+        return '\n\n'.join(parts)
+
+    def title(self, zh, index):
+        rng = self.rng
+        if zh:
+            return f'{rng.choice(EN_WORDS).capitalize()} {"".join(rng.sample(ZH_WORDS, 3))} {index}'
+        return f'{" ".join(rng.sample(EN_WORDS, 4)).title()} {index}'
+
+    def post_tags(self):
+        count = self.rng.choices([0, 1, 2, 3, 4], weights=[5, 30, 35, 20, 10])[0]
+        return set(self.rng.choices(self.tags, weights=self.tag_weights, k=count))
+
+    def build(self, index, author):
+        zh = self.rng.random() < self.zh_ratio
+        content = self.body(zh)
+        word_count, reading_time = ContentStats.analyze(content)
+        post = Post(
+            title=self.title(zh, index),
+            slug=f'bench-{index}',
+            content=content,
+            summary=ContentStats.generate_summary(content),
+            author=author,
+            published=self.rng.random() < self.published_ratio,
+            word_count=word_count,
+            reading_time=reading_time,
+        )
+        post.render_content()
+        post.bench_created_at = self.now - self.span * self.rng.random()
+        post.bench_tags = self.post_tags()
+        return post
+
+    def generate(self, count, batch_size=2000, authors=5, related=False, progress=None):
+        """
+        生成文章
+        :param count: 文章数
+        :param batch_size: 每批写入的文章数
+        :param authors: 作者数，第一个作者可用于登录基准
+        :param related: 是否重建相关文章
+        :param progress: 每批写入后的回调，参数为已写入的文章数
+        :return: 作者列表
+        """
+        users = [User.objects.create_user(BENCH_USERNAME, 'bench@example.com', BENCH_PASSWORD)]
+        users += User.objects.bulk_create([
+            User(username=f'author{i}', email=f'author{i}@example.com') for i in range(1, authors)
+        ])
+        Tag.objects.bulk_create([Tag(name=name) for name in self.tags], ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.values_list('name', 'id'))
+
+        for start in range(0, count, batch_size):
+            posts = [
+                self.build(index, self.rng.choice(users))
+                for index in range(start, min(count, start + batch_size))
+            ]
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+                # created_at 为 auto_now_add，写入后再更新为生成的时间
+                for post in posts:
+                    post.created_at = post.updated_at = post.bench_created_at
+                Post.objects.bulk_update(posts, ['created_at', 'updated_at'])
+                PostTag.objects.bulk_create([
+                    PostTag(post=post, tag_id=tag_ids[name])
+                    for post in posts
+                    for name in post.bench_tags
+                ])
+            if progress:
+                progress(start + len(posts))
+
+        TagStat.objects.refresh()
+        get_search_backend().rebuild(Post.objects.all(), batch_size=batch_size)
+        if related:
+            RelatedPost.objects.rebuild(batch_size=batch_size)
+        return users
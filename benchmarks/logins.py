@@ -0,0 +1,88 @@
+"""
+登录基准：测量每个 CPU 核心每秒可处理的登录请求数
+
+在单个进程中依次发送登录请求，按进程 CPU 时间计算每核吞吐量，对比：
+- success / failure：密码正确和错误的登录（关闭限流，每次请求都进行密码哈希）
+- throttled：令牌耗尽后被限流拒绝的登录（不进行密码哈希）
+以及不同 PBKDF2 迭代次数下的结果：
+
+    python -m benchmarks.logins --requests 20 --iterations 1000000,600000,260000
+"""
+import argparse
+import json
+import logging
+import time
+
+from benchmarks import percentile, setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth.models import User
+from django.test import Client
+from django.test.utils import override_settings
+
+from blog.cache import get_cache
+
+PASSWORD = 'bench-password'
+# 限流场景使用的配置：令牌很快耗尽且基本不补充
+THROTTLED = {'login': {'ip': {'capacity': 1, 'per_minute': 0.001}}}
+
+
+def run_logins(username, password, count):
+    client = Client()
+    latencies = []
+    statuses = {}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(count):
+        start = time.perf_counter()
+        response = client.post('/api/auth/login/', {'username': username, 'password': password},
+                               content_type='application/json')
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        'requests': count,
+        'status': statuses,
+        'logins_per_second': round(count / wall, 2),
+        'logins_per_cpu_second': round(count / cpu, 2) if cpu else None,
+        'latency_ms': {
+            name: round(percentile(latencies, q) * 1000, 3)
+            for name, q in (('p50', 50), ('p99', 99))
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20, help='每个场景的请求数')
+    parser.add_argument('--throttled-requests', type=int, default=2000, help='限流场景的请求数')
+    parser.add_argument('--iterations', default='', help='逗号分隔的 PBKDF2 迭代次数，默认使用当前配置')
+    args = parser.parse_args()
+
+    # 401 和 429 响应会逐条记录警告日志
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    levels = [int(value) for value in args.iterations.split(',') if value.strip()] or [None]
+    report = {'iterations': {}}
+    with test_database(), override_settings(ALLOWED_HOSTS=['testserver']):
+        for iterations in levels:
+            with override_settings(BLOG_PASSWORD_ITERATIONS=iterations, BLOG_AUTH_THROTTLES={}):
+                username = f'bench{iterations or ""}'
+                User.objects.create_user(username, f'{username}@example.com', PASSWORD)
+                report['iterations'][str(iterations or 'default')] = {
+                    'success': run_logins(username, PASSWORD, args.requests),
+                    'failure': run_logins(username, 'wrong-password', args.requests),
+                }
+
+        get_cache().clear()
+        with override_settings(BLOG_AUTH_THROTTLES=THROTTLED):
+            report['throttled'] = run_logins(username, PASSWORD, args.throttled_requests)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+拼音转换基准：对比启动时的导入开销和每个标题生成基础slug的耗时
+
+    python -m benchmarks.pinyin --titles 20000
+"""
+import argparse
+import random
+import re
+import subprocess
+import sys
+import time
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.utils.text import slugify
+
+from blog.utils import SlugGenerator, transliterate_segment
+
+WORDS = ['博客', '开发', '实践', '指南', '异步', '编程', '数据库', '性能', '优化', '部署']
+LATIN = ['Python', 'Django', 'Vue.js', 'REST', 'API', 'SQLite']
+
+
+def legacy_base_slug(title):
+    """旧实现：未编译的正则 + 整个标题调用 lazy_pinyin"""
+    from pypinyin import lazy_pinyin
+    if re.search(r'[\u4e00-\u9fff]', title):
+        base_slug = re.sub(r'[^a-zA-Z0-9\s-]', '', ' '.join(lazy_pinyin(title)))
+        return slugify(base_slug)
+    return slugify(title)
+
+
+def import_time(statement, repeat=5):
+    """在子进程中测量导入耗时，取最小值"""
+    code = (
+        'import time; start = time.perf_counter(); '
+        f'{statement}; print(time.perf_counter() - start)'
+    )
+    samples = [
+        float(subprocess.check_output([sys.executable, '-c', code], text=True))
+        for _ in range(repeat)
+    ]
+    return min(samples)
+
+
+def make_titles(count, seed=42):
+    rng = random.Random(seed)
+    return [
+        f'{rng.choice(LATIN)} {"".join(rng.sample(WORDS, 3))}'
+        for _ in range(count)
+    ]
+
+
+def measure(label, func, titles):
+    start = time.perf_counter()
+    for title in titles:
+        func(title)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<22} titles={len(titles)} per_title={elapsed / len(titles) * 1e6:.1f}us')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=20000, help='生成的标题数')
+    args = parser.parse_args()
+
+    utils_only = import_time('import blog.utils')
+    with_pinyin = import_time('import blog.utils, pypinyin; pypinyin.lazy_pinyin("博客")')
+    print(f'{"import (lazy)":<22} {utils_only * 1000:.1f}ms')
+    print(f'{"import (eager pinyin)":<22} {with_pinyin * 1000:.1f}ms')
+
+    titles = make_titles(args.titles)
+    # 预热，排除首次加载词典的开销
+    legacy_base_slug(titles[0])
+    transliterate_segment.cache_clear()
+
+    measure('legacy per-title', legacy_base_slug, titles)
+    measure('cached per-title', SlugGenerator.generate_base_slug, titles)
+    print(f'{"cache":<22} {transliterate_segment.cache_info()}')
+
+
+if __name__ == '__main__':
+    main()
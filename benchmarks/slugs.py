@@ -0,0 +1,79 @@
+"""
+slug生成基准：批量创建标题相同的文章，统计耗时和查询数
+
+    python -m benchmarks.slugs --count 2000 --legacy-count 300
+"""
+import argparse
+import re
+import time
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils.text import slugify
+
+from blog.models import Post
+from blog.utils import SlugGenerator
+
+
+# 查找已有slug的查询（不含 INSERT）
+SLUG_LOOKUP = re.compile(r'^SELECT .* WHERE .*"blog_post"\."slug" (LIKE|=)')
+
+
+def legacy_generate_unique_slug(title, model_class, instance_id=None):
+    """旧实现：逐个后缀调用 exists() 探测"""
+    base_slug = slugify(title)
+    slug = base_slug
+    counter = 1
+    while model_class.objects.filter(slug=slug).exists():
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return slug
+
+
+def run(label, count, author, title):
+    stats = {'queries': 0, 'slug_queries': 0}
+
+    def count_queries(execute, sql, params, many, context):
+        stats['queries'] += 1
+        if SLUG_LOOKUP.search(sql):
+            stats['slug_queries'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        start = time.perf_counter()
+        for _ in range(count):
+            Post.objects.create(title=title, content='x' * 120, author=author)
+        elapsed = time.perf_counter() - start
+
+    print(
+        f'{label:<8} posts={count:<6} total={elapsed:.2f}s '
+        f'per_post={elapsed / count * 1000:.2f}ms '
+        f'queries={stats["queries"]} slug_queries={stats["slug_queries"]}'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000, help='新实现创建的文章数')
+    parser.add_argument('--legacy-count', type=int, default=300, help='旧实现创建的文章数，0 表示跳过')
+    args = parser.parse_args()
+
+    with test_database():
+        author = User.objects.create_user('bench', 'bench@example.com', 'bench')
+        run('current', args.count, author, 'Colliding title')
+
+        if args.legacy_count:
+            original = SlugGenerator.generate_unique_slug
+            SlugGenerator.generate_unique_slug = staticmethod(legacy_generate_unique_slug)
+            try:
+                run('legacy', args.legacy_count, author, 'Legacy colliding title')
+            finally:
+                SlugGenerator.generate_unique_slug = original
+
+
+if __name__ == '__main__':
+    main()
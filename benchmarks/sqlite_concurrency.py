@@ -0,0 +1,150 @@
+"""
+SQLite 并发基准：对比数据库配置档在并发读写下的吞吐量、延迟和 "database is locked" 错误数
+
+每个配置档在独立子进程中运行（数据库配置在 settings 导入时确定），使用临时目录中的数据库文件。
+写线程模拟后台编辑文章（Post.save，在事务中先读后写），读线程模拟文章列表请求，
+每次操作后按请求结束的方式处理连接（CONN_MAX_AGE 为 0 时关闭连接）：
+
+    python -m benchmarks.sqlite_concurrency --posts 500 --duration 10 --writers 4 --readers 8
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks import percentile
+
+# 配置档名称 -> 环境变量
+PROFILES = {
+    'plain': {'BLOG_DB_PROFILE': 'plain'},
+    'production': {'BLOG_DB_PROFILE': 'production'},
+    'production+replica': {'BLOG_DB_PROFILE': 'production', 'BLOG_DB_READ_REPLICA': '1'},
+}
+
+
+def summarize(latencies, errors, elapsed):
+    latencies.sort()
+    return {
+        'operations': len(latencies),
+        'errors': errors,
+        'throughput_ops': round(len(latencies) / elapsed, 2),
+        'latency_ms': {
+            name: round(percentile(latencies, q) * 1000, 3)
+            for name, q in (('p50', 50), ('p99', 99), ('max', 100))
+        },
+    }
+
+
+def run_worker(args):
+    """在当前进程的数据库配置下运行并发读写，返回统计结果"""
+    from benchmarks import setup_django
+    setup_django()
+
+    from django.core.management import call_command
+    from django.db import OperationalError, close_old_connections, connection
+
+    from benchmarks.corpus import CorpusGenerator
+    from blog.models import Post
+
+    call_command('migrate', verbosity=0)
+    CorpusGenerator(seed=args.seed).generate(args.posts)
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    connection.close()
+
+    stop = threading.Event()
+    results = {'read': ([], [0]), 'write': ([], [0])}
+
+    def write(seed):
+        rng = random.Random(seed)
+        post = Post.objects.get(pk=rng.choice(post_ids))
+        post.title = f'{post.title.rsplit(" #", 1)[0]} #{rng.randrange(1000)}'
+        post.save()
+
+    def read(_):
+        posts = Post.objects.with_author().filter(published=True).order_by('-created_at', '-id')
+        list(posts[:20])
+
+    def loop(kind, operation, index):
+        latencies, errors = results[kind]
+        count = 0
+        while not stop.is_set():
+            count += 1
+            start = time.perf_counter()
+            try:
+                operation(index * 100000 + count)
+            except OperationalError:
+                errors[0] += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+            finally:
+                # 相当于 request_finished：CONN_MAX_AGE 为 0 时关闭连接，否则保留复用
+                close_old_connections()
+        connection.close()
+
+    threads = [
+        threading.Thread(target=loop, args=('write', write, i)) for i in range(args.writers)
+    ] + [
+        threading.Thread(target=loop, args=('read', read, i)) for i in range(args.readers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        kind: summarize(latencies, errors[0], elapsed)
+        for kind, (latencies, errors) in results.items()
+    }
+
+
+def run_profile(name, args):
+    with tempfile.TemporaryDirectory() as directory:
+        env = {key: value for key, value in os.environ.items() if not key.startswith('BLOG_DB_')}
+        env.update(PROFILES[name], BLOG_DB_PATH=os.path.join(directory, 'bench.sqlite3'))
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'benchmarks.sqlite_concurrency', '--worker', *sys.argv[1:]],
+            env=env, text=True
+        )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=500, help='生成的文章数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--duration', type=float, default=10, help='每个配置档的运行时间（秒）')
+    parser.add_argument('--writers', type=int, default=4, help='写线程数')
+    parser.add_argument('--readers', type=int, default=8, help='读线程数')
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='逗号分隔的配置档列表')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args)))
+        return
+
+    results = {}
+    for name in args.profiles.split(','):
+        name = name.strip()
+        print(f'运行 {name} ...', file=sys.stderr)
+        results[name] = run_profile(name, args)
+    print(json.dumps({
+        'posts': args.posts,
+        'duration': args.duration,
+        'writers': args.writers,
+        'readers': args.readers,
+        'results': results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+浏览计数基准：测量文章详情接口记录浏览次数的开销
+
+对比三种方式下详情接口的延迟和每个请求的写入次数：
+- off：不记录浏览次数
+- per_hit：每次浏览立即 UPDATE（缓冲大小为 1）
+- buffered：进程内缓冲，按默认的间隔和大小批量写入
+另外测量多线程并发调用 ViewCounter.record 的吞吐量：
+
+    python -m benchmarks.view_counts --posts 500 --requests 2000
+"""
+import argparse
+import json
+import random
+import threading
+import time
+
+from benchmarks import percentile, setup_django, test_database
+
+setup_django()
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from benchmarks.corpus import CorpusGenerator
+from blog.analytics import ViewCounter, view_counter
+from blog.models import Post
+
+MODES = {
+    'off': {'BLOG_VIEW_COUNTS': False},
+    'per_hit': {'BLOG_VIEW_COUNTS': True, 'BLOG_VIEW_FLUSH_SIZE': 1},
+    'buffered': {'BLOG_VIEW_COUNTS': True},
+}
+
+
+def run_mode(slugs, count, seed, **overrides):
+    client = Client()
+    rng = random.Random(seed)
+    latencies = []
+    writes = {'count': 0}
+
+    def count_writes(execute, sql, params, many, context):
+        if sql.startswith('UPDATE'):
+            writes['count'] += 1
+        return execute(sql, params, many, context)
+
+    view_counter.clear()
+    with override_settings(**overrides), connection.execute_wrapper(count_writes):
+        started = time.perf_counter()
+        for _ in range(count):
+            start = time.perf_counter()
+            client.get(f'/api/posts/{rng.choice(slugs)}/')
+            latencies.append(time.perf_counter() - start)
+        elapsed = time.perf_counter() - started
+        view_counter.flush()
+
+    latencies.sort()
+    return {
+        'throughput_rps': round(count / elapsed, 2),
+        'latency_ms': {
+            name: round(percentile(latencies, q) * 1000, 3)
+            for name, q in (('p50', 50), ('p99', 99), ('max', 100))
+        },
+        'updates_per_request': round(writes['count'] / count, 4),
+    }
+
+
+def record_throughput(threads, per_thread):
+    """多线程并发调用 record 的吞吐量（不写数据库）"""
+    counter = ViewCounter()
+    slugs = [f'post-{i}' for i in range(1000)]
+
+    def worker():
+        for i in range(per_thread):
+            counter.record(slugs[i % len(slugs)])
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = threads * per_thread
+    return {
+        'threads': threads,
+        'records_per_second': round(total / elapsed),
+        'ns_per_record': round(elapsed / total * 1e9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=500, help='生成的文章数')
+    parser.add_argument('--requests', type=int, default=2000, help='每种方式的请求数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    # 测量数据库路径，不使用响应缓存
+    with test_database(), override_settings(BLOG_CACHE_TIMEOUT=0, ALLOWED_HOSTS=['testserver']):
+        CorpusGenerator(seed=args.seed).generate(args.posts)
+        slugs = list(Post.objects.filter(published=True).values_list('slug', flat=True))
+        report = {
+            'posts': args.posts,
+            'requests': args.requests,
+            'flush_interval': settings.BLOG_VIEW_FLUSH_INTERVAL,
+            'flush_size': settings.BLOG_VIEW_FLUSH_SIZE,
+            'detail': {
+                name: run_mode(slugs, args.requests, args.seed, **overrides)
+                for name, overrides in MODES.items()
+            },
+            'record': [record_throughput(threads, 100000 // threads) for threads in (1, 4, 16)],
+        }
+        view_counter.clear()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
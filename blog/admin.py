@@ -1,5 +1,11 @@
 from django.contrib import admin
-from .models import Post
+from .models import Post, PostTag, Tag, TagStat
+from .search import get_search_backend
+
+class PostTagInline(admin.TabularInline):
+    model = PostTag
+    extra = 1
+    autocomplete_fields = ('tag',)
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
@@ -9,3 +15,25 @@ class PostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
     ordering = ('-created_at',)
+    inlines = (PostTagInline,)
+
+    def save_related(self, request, form, formsets, change):
+        # 内联编辑的标签在 Post.save 之后才写入，需要重新统计并更新索引
+        # 相关文章由 Post.save 安排在事务提交后计算，此时标签已写入
+        old_tag_ids = set(form.instance.post_tags.values_list('tag_id', flat=True))
+        super().save_related(request, form, formsets, change)
+        post = form.instance
+        new_tag_ids = set(post.post_tags.values_list('tag_id', flat=True))
+        TagStat.objects.refresh(old_tag_ids | new_tag_ids)
+        get_search_backend().index_post(post)
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name',)
+
+@admin.register(TagStat)
+class TagStatAdmin(admin.ModelAdmin):
+    list_display = ('tag', 'post_count', 'last_used_at')
+    ordering = ('-post_count',)
+    readonly_fields = ('tag', 'post_count', 'last_used_at')
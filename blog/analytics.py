@@ -0,0 +1,144 @@
+import atexit
+import logging
+import threading
+import time
+from asyncio import iscoroutinefunction
+from collections import Counter
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, Value, When
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    文章浏览计数缓冲：
+    - 每次浏览只在进程内累加 slug -> 次数，不写数据库
+    - 距上次写入超过 BLOG_VIEW_FLUSH_INTERVAL 秒或缓冲的浏览次数达到 BLOG_VIEW_FLUSH_SIZE 时，
+      将各文章的增量合并为一条 UPDATE 写入
+    - 多进程部署时各进程分别缓冲，写入的是增量，互不覆盖；进程退出时写入剩余的计数
+    """
+    # 每条 UPDATE 最多包含的文章数（每篇文章占用 3 个 SQL 参数）
+    batch_size = 500
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.pending_hits = 0
+        self.last_flush = time.monotonic()
+        self.recorded = 0
+        self.flushes = 0
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 10)
+
+    @property
+    def flush_size(self):
+        return getattr(settings, 'BLOG_VIEW_FLUSH_SIZE', 1000)
+
+    def record(self, slug):
+        """
+        记录一次浏览
+        :return: 是否需要写入数据库（由调用方执行 flush，异步视图中在线程中执行）
+        """
+        with self.lock:
+            self.pending[slug] += 1
+            self.pending_hits += 1
+            self.recorded += 1
+            return (
+                self.pending_hits >= self.flush_size
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            )
+
+    def flush(self):
+        """
+        将缓冲的计数写入数据库，写入失败时放回缓冲等待下次写入
+        :return: 更新的文章数
+        """
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.pending_hits = 0
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        items = list(pending.items())
+        try:
+            with transaction.atomic():
+                for start in range(0, len(items), self.batch_size):
+                    batch = items[start:start + self.batch_size]
+                    Post.objects.filter(slug__in=[slug for slug, _ in batch]).update(
+                        view_count=F('view_count') + Case(
+                            *[When(slug=slug, then=Value(count)) for slug, count in batch],
+                            default=Value(0)
+                        )
+                    )
+        except DatabaseError:
+            logger.warning('写入 %d 篇文章的浏览计数失败，等待下次写入', len(items), exc_info=True)
+            with self.lock:
+                self.pending.update(pending)
+                self.pending_hits += sum(pending.values())
+            return 0
+
+        with self.lock:
+            self.flushes += 1
+        return len(items)
+
+    def clear(self):
+        with self.lock:
+            self.pending.clear()
+            self.pending_hits = 0
+            self.recorded = self.flushes = 0
+            self.last_flush = time.monotonic()
+
+    def get_stats(self):
+        """返回浏览计数缓冲的统计"""
+        with self.lock:
+            return {
+                'recorded': self.recorded,
+                'flushes': self.flushes,
+                'pending_posts': len(self.pending),
+                'pending_views': self.pending_hits,
+            }
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
+
+
+def counted_view(view_method):
+    """
+    记录文章详情的浏览次数
+    需放在缓存和条件请求装饰器之外，缓存命中和 304 响应同样计数
+    """
+    def should_count(request, response, kwargs):
+        return (
+            getattr(settings, 'BLOG_VIEW_COUNTS', True)
+            and request.method == 'GET'
+            and response.status_code in (200, 304)
+            and kwargs.get('slug')
+        )
+
+    if iscoroutinefunction(view_method):
+        @wraps(view_method)
+        async def async_wrapper(self, request, *args, **kwargs):
+            response = await view_method(self, request, *args, **kwargs)
+            if should_count(request, response, kwargs) and view_counter.record(kwargs['slug']):
+                await sync_to_async(view_counter.flush)()
+            return response
+        return async_wrapper
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        response = view_method(self, request, *args, **kwargs)
+        if should_count(request, response, kwargs) and view_counter.record(kwargs['slug']):
+            view_counter.flush()
+        return response
+    return wrapper
@@ -0,0 +1,140 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .analytics import counted_view
+from .cache import cached_response, conditional_response
+from .models import Post
+from .streaming import get_stream_format
+from .views import PostViewSet
+
+class AsyncPostView(View):
+    """
+    文章只读接口的异步实现（列表、搜索、详情、标签），ASGI 部署时使用：
+    - 查询集、序列化器和分页规则沿用 PostViewSet，数据库读取使用异步 ORM
+    - 写操作、流式输出和非 JSON 格式仍交给同步的 PostViewSet 处理
+    """
+    # PostViewSet 中对应的 action
+    action = None
+    # 交给同步视图处理时的请求方法与 action 映射
+    sync_actions = None
+    sync_view = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        initkwargs.setdefault('sync_view', PostViewSet.as_view(initkwargs.get('sync_actions', cls.sync_actions)))
+        # 写操作转交的 PostViewSet 自行处理 CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET':
+            viewset = self.initialize_viewset(request, *args, **kwargs)
+            if (get_stream_format(viewset.request) is None
+                    and isinstance(viewset.request.accepted_renderer, JSONRenderer)):
+                return await self.get(viewset, *args, **kwargs)
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    def initialize_viewset(self, request, *args, **kwargs):
+        """创建处理本次请求的 PostViewSet 实例，并完成内容协商"""
+        viewset = PostViewSet(action=self.action, action_map=self.sync_actions)
+        viewset.args, viewset.kwargs = args, kwargs
+        viewset.headers = viewset.default_response_headers
+        viewset.request = viewset.initialize_request(request, *args, **kwargs)
+        viewset.format_kwarg = viewset.get_format_suffix(**kwargs)
+        renderer, media_type = viewset.perform_content_negotiation(viewset.request)
+        viewset.request.accepted_renderer = renderer
+        viewset.request.accepted_media_type = media_type
+        self.viewset = viewset
+        return viewset
+
+    async def get(self, viewset, *args, **kwargs):
+        request = viewset.request
+        try:
+            # 读取令牌需要查询数据库，在线程中完成认证
+            await sync_to_async(viewset.perform_authentication)(request)
+            viewset.check_permissions(request)
+            response = await getattr(self, self.action)(request, *args, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        response = viewset.finalize_response(request, response, *args, **kwargs)
+        return self.render(response)
+
+    def render(self, response):
+        """
+        提前渲染并转换为普通响应
+        否则 Django 会在线程中调用 render()，多一次线程切换
+        """
+        if not isinstance(response, Response):
+            return response
+        response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        return rendered
+
+    async def build_queryset(self, method):
+        """
+        调用 PostViewSet 的方法构建查询集
+        搜索需要先查询全文索引，此时在线程中构建
+        """
+        if self.viewset.request.query_params.get('search', '').strip():
+            return await sync_to_async(method)()
+        return method()
+
+    async def get_list_queryset(self):
+        return await self.build_queryset(self.viewset.get_list_queryset)
+
+    async def get_list_validators(self, request):
+        queryset = await self.get_list_queryset()
+        stats = await queryset.order_by().aaggregate(**self.viewset.list_validator_aggregates)
+        return self.viewset.build_list_validators(request, stats)
+
+    async def get_detail_validators(self, request, slug=None):
+        post = await self.viewset.get_queryset().filter(slug=slug).values(
+            *self.viewset.detail_validator_fields
+        ).afirst()
+        return self.viewset.build_detail_validators(post)
+
+    async def paginated_list(self, request):
+        viewset = self.viewset
+        queryset = await self.get_list_queryset()
+        page = await viewset.paginator.apaginate_queryset(queryset, request, view=viewset)
+        serializer = viewset.get_serializer(page, many=True)
+        return viewset.get_paginated_response(serializer.data)
+
+    @cached_response('list')
+    @conditional_response('get_list_validators')
+    async def list(self, request):
+        return await self.paginated_list(request)
+
+    @cached_response('published')
+    @conditional_response('get_list_validators')
+    async def published(self, request):
+        return await self.paginated_list(request)
+
+    @counted_view
+    @cached_response('detail')
+    @conditional_response('get_detail_validators')
+    async def retrieve(self, request, slug=None):
+        viewset = self.viewset
+        try:
+            post = await viewset.get_queryset().aget(slug=slug)
+        except Post.DoesNotExist:
+            raise Http404
+        viewset.check_object_permissions(request, post)
+        return Response(viewset.get_serializer(post).data)
+
+    @cached_response('tags')
+    async def tags(self, request):
+        viewset = self.viewset
+        try:
+            tags = await self.build_queryset(viewset.get_tag_queryset)
+        except ValueError:
+            return Response({'error': viewset.invalid_tag_params_message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response([viewset.tag_representation(tag) async for tag in tags])
@@ -0,0 +1,112 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import bump_generation, get_generation
+
+class TokenCache:
+    """
+    进程内的令牌缓存：令牌 -> (用户, 令牌)
+    - 超过容量时淘汰最久未使用的条目，条目在 BLOG_TOKEN_CACHE_TTL 秒后过期
+    - 每个条目记录写入时用户的版本号（保存在共享缓存中），命中时与当前版本比较；
+      登出、修改用户等操作递增版本号，所有进程中该用户的条目随即失效
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'BLOG_TOKEN_CACHE_TTL', 60)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'BLOG_TOKEN_CACHE_SIZE', 1024)
+
+    @staticmethod
+    def version_key(user_id):
+        return f'blog:auth:user:{user_id}'
+
+    def get(self, key):
+        """
+        读取缓存的认证结果
+        :return: (用户, 令牌)，未命中、已过期或用户版本已变化时返回 None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        valid = (
+            entry is not None
+            and entry[0] >= time.monotonic()
+            and entry[3] == get_generation(self.version_key(entry[1].pk))
+        )
+        with self.lock:
+            if not valid:
+                if entry is not None and self.entries.get(key) is entry:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.hits += 1
+        _, user, token, _ = entry
+        # 返回副本，避免请求之间共享同一个用户对象
+        return copy.copy(user), token
+
+    def set(self, key, user, token):
+        if not self.ttl:
+            return
+        version = get_generation(self.version_key(user.pk))
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, user, token, version)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        """使指定用户所有令牌的缓存在所有进程中失效"""
+        bump_generation(self.version_key(user_id))
+        with self.lock:
+            for key in [key for key, (_, user, _, _) in self.entries.items() if user.pk == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self):
+        """返回令牌缓存命中统计"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'size': len(self.entries),
+            }
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    带缓存的令牌认证：
+    - 命中缓存时不查询 authtoken_token 和 auth_user
+    - 令牌删除、用户修改或删除时由信号递增用户版本，使所有进程的缓存失效（见 signals.py）
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
@@ -0,0 +1,236 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Post, PostTag, Tag, TagStat
+from .serializers import PostSerializer
+from .signals import posts_bulk_saved
+from .utils import ContentStats, SlugGenerator, TagManager
+
+class PostImporter:
+    """
+    NDJSON 文章批量导入：
+    - 逐行读取，按批次写入，内存占用与文件大小无关
+    - 每行按 PostSerializer 的规则校验
+    - 已存在的slug更新原文章，否则新建
+    """
+    max_errors = 100
+
+    def __init__(self, author, batch_size=500):
+        """
+        :param author: 未指定作者或作者不存在时使用的默认作者
+        :param batch_size: 每批写入的文章数
+        """
+        self.author = author
+        self.batch_size = batch_size
+        self.stats = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+        self.authors = {author.username: author}
+
+    def add_error(self, line_number, errors):
+        self.stats['failed'] += 1
+        if len(self.stats['errors']) < self.max_errors:
+            self.stats['errors'].append({'line': line_number, 'errors': errors})
+
+    def parse_line(self, line_number, line):
+        """解析并校验一行，失败时记录错误并返回 None"""
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            return None
+
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            self.add_error(line_number, {'non_field_errors': [f'无效的JSON: {exc}']})
+            return None
+        if not isinstance(record, dict):
+            self.add_error(line_number, {'non_field_errors': ['每行必须是一个JSON对象']})
+            return None
+
+        if isinstance(record.get('tags'), list):
+            record['tags'] = ','.join(record['tags'])
+        serializer = PostSerializer(data=record)
+        if not serializer.is_valid():
+            self.add_error(line_number, serializer.errors)
+            return None
+
+        data = dict(serializer.validated_data)
+        data['line'] = line_number
+        data['author'] = record.get('author')
+        data['created_at'] = None
+        if record.get('created_at'):
+            try:
+                data['created_at'] = parse_datetime(record['created_at'])
+            except (TypeError, ValueError):
+                pass
+            if data['created_at'] is None:
+                self.add_error(line_number, {'created_at': ['无效的日期时间格式，应为 ISO 8601']})
+                return None
+        return data
+
+    def run(self, lines):
+        """
+        导入文章
+        :param lines: 可迭代的 NDJSON 行（str 或 bytes）
+        :return: 导入统计
+        """
+        batch = []
+        for line_number, line in enumerate(lines, start=1):
+            data = self.parse_line(line_number, line)
+            if data is None:
+                continue
+            batch.append(data)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        if batch:
+            self.write_batch(batch)
+        return self.stats
+
+    def resolve_authors(self, batch):
+        usernames = {data['author'] for data in batch if data['author']} - set(self.authors)
+        if usernames:
+            for user in User.objects.filter(username__in=usernames):
+                self.authors[user.username] = user
+
+    def write_batch(self, batch):
+        # 同一批次内slug重复时只保留第一条
+        seen = set()
+        records = []
+        for data in batch:
+            slug = data.get('slug')
+            if slug and slug in seen:
+                self.add_error(data['line'], {'slug': ['同一批次中slug重复']})
+                continue
+            seen.add(slug)
+            records.append(data)
+
+        self.resolve_authors(records)
+        existing = Post.objects.in_bulk(
+            [data['slug'] for data in records if data.get('slug')],
+            field_name='slug'
+        )
+
+        # 预先为没有slug的新文章批量生成slug，避开同一批次中新文章显式指定的slug
+        missing = [data for data in records if not data.get('slug')]
+        reserved = [data['slug'] for data in records if data.get('slug') and data['slug'] not in existing]
+        for data, slug in zip(missing, SlugGenerator.generate_unique_slugs(
+                [data['title'] for data in missing], Post, reserved=reserved)):
+            data['slug'] = slug
+
+        now = timezone.now()
+        created, updated, dated = [], [], []
+        for data in records:
+            post = existing.get(data['slug'])
+            if post is None:
+                post = Post(slug=data['slug'])
+                created.append(post)
+            else:
+                # bulk_update 不会自动更新 updated_at
+                post.updated_at = now
+                updated.append(post)
+
+            post.title = data['title']
+            post.content = data['content']
+            post.summary = data.get('summary') or ContentStats.generate_summary(post.content)
+            post.published = data.get('published', False)
+            post.featured_image = data.get('featured_image', '')
+            post.author = self.authors.get(data['author'], self.author)
+            post.word_count, post.reading_time = ContentStats.analyze(post.content)
+            post.render_content()
+            post.tags = data.get('tags', '')
+            if data['created_at']:
+                dated.append((post, data['created_at']))
+
+        with transaction.atomic():
+            Post.objects.bulk_create(created, batch_size=self.batch_size)
+            if updated:
+                Post.objects.bulk_update(updated, [
+                    'title', 'content', 'summary', 'published', 'featured_image',
+                    'author', 'word_count', 'reading_time', 'content_html', 'toc', 'content_hash',
+                    'updated_at',
+                ], batch_size=self.batch_size)
+
+            # bulk_create 会自动设置 created_at，需要保留导入的时间时再更新一次
+            for post, created_at in dated:
+                post.created_at = created_at
+            if dated:
+                Post.objects.bulk_update(
+                    [post for post, _ in dated], ['created_at'], batch_size=self.batch_size
+                )
+
+            posts = created + updated
+            self.write_tags(posts, updated)
+            posts_bulk_saved.send(sender=Post, posts=posts)
+
+        self.stats['created'] += len(created)
+        self.stats['updated'] += len(updated)
+
+    def write_tags(self, posts, updated):
+        """批量写入标签关联"""
+        names = {name for post in posts for name in post.tag_list}
+        Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+
+        # 被更新文章的原有标签也需要重新统计
+        affected = set(tag_ids.values())
+        if updated:
+            old_links = PostTag.objects.filter(post__in=updated)
+            affected.update(old_links.values_list('tag_id', flat=True))
+            old_links.delete()
+        PostTag.objects.bulk_create(
+            [
+                PostTag(post=post, tag_id=tag_ids[name])
+                for post in posts
+                for name in post.tag_list
+            ],
+            batch_size=self.batch_size
+        )
+        TagStat.objects.refresh(affected)
+
+
+class PostExporter:
+    """NDJSON 文章导出，使用 iterator() 分块读取"""
+
+    def __init__(self, queryset=None, chunk_size=500):
+        self.queryset = Post.objects.all() if queryset is None else queryset
+        self.chunk_size = chunk_size
+
+    def get_queryset(self):
+        return (
+            self.queryset.order_by('pk')
+            .select_related('author')
+            .prefetch_related('tag_set')
+        )
+
+    @staticmethod
+    def to_record(post):
+        return {
+            'title': post.title,
+            'slug': post.slug,
+            'content': post.content,
+            'summary': post.summary,
+            'published': post.published,
+            'featured_image': post.featured_image,
+            'tags': post.tags,
+            'author': post.author.username,
+            'created_at': post.created_at.isoformat(),
+            'updated_at': post.updated_at.isoformat(),
+        }
+
+    def iter_records(self):
+        for post in self.get_queryset().iterator(chunk_size=self.chunk_size):
+            yield self.to_record(post)
+
+    def iter_lines(self):
+        for record in self.iter_records():
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+    async def aiter_lines(self):
+        """iter_lines 的异步版本，ASGI 下使用"""
+        async for post in self.get_queryset().aiterator(chunk_size=self.chunk_size):
+            yield json.dumps(self.to_record(post), ensure_ascii=False) + '\n'
@@ -0,0 +1,236 @@
+import hashlib
+import time
+from asyncio import iscoroutinefunction
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.response import Response
+
+GENERATION_KEY = 'blog:posts:generation'
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+STATS_KEYS = {
+    'hits': 'blog:posts:cache_hits',
+    'misses': 'blog:posts:cache_misses',
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'BLOG_CACHE_ALIAS', 'default')]
+
+
+def get_generation(key=GENERATION_KEY):
+    """
+    获取当前缓存代数
+    初始值取当前时间（毫秒），缓存键被淘汰后重新初始化也不会与旧的代数重复
+    :param key: 代数的缓存键，默认为响应缓存的代数
+    """
+    cache = get_cache()
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key=GENERATION_KEY):
+    """递增缓存代数，使所有旧的缓存失效"""
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def make_key(name, request, kwargs):
+    """
+    生成响应缓存键
+    :param name: 接口名称
+    :param request: 请求
+    :param kwargs: URL 参数
+    :return: 缓存键
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+        if value != ''
+    )
+    params.extend(sorted(kwargs.items()))
+    digest = hashlib.md5(urlencode(params).encode('utf-8')).hexdigest()
+    staff = int(bool(request.user and request.user.is_staff))
+    return f'blog:posts:{get_generation()}:{name}:{staff}:{digest}'
+
+
+def record(stat):
+    cache = get_cache()
+    key = STATS_KEYS[stat]
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    """返回缓存命中统计"""
+    cache = get_cache()
+    hits = cache.get(STATS_KEYS['hits'], 0)
+    misses = cache.get(STATS_KEYS['misses'], 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+        'generation': get_generation(),
+    }
+
+
+def check_not_modified(request, headers):
+    """
+    根据验证头判断请求的条件是否满足
+    :param request: 请求
+    :param headers: 包含 ETag / Last-Modified 的字典
+    :return: 条件满足时返回 304（或 412）响应，否则返回 None
+    """
+    if not headers:
+        return None
+    response = HttpResponse()
+    for header, value in headers.items():
+        response[header] = value
+    result = get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+        response=response
+    )
+    return None if result is response else result
+
+
+def build_validator_headers(etag, last_modified):
+    headers = {}
+    if etag is not None:
+        headers['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers
+
+
+def add_headers(response, headers):
+    if response.status_code == 200:
+        for header, value in headers.items():
+            response[header] = value
+    return response
+
+
+def conditional_response(validators_method):
+    """
+    为视图提供条件请求（ETag / Last-Modified / 304）支持
+    验证值由视图方法计算，匹配时不进行序列化直接返回 304
+    异步视图的验证方法也需为异步方法
+    :param validators_method: 视图上返回 (etag, last_modified) 的方法名
+    """
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                etag, last_modified = await getattr(self, validators_method)(request, *args, **kwargs)
+                headers = build_validator_headers(etag, last_modified)
+                not_modified = check_not_modified(request, headers)
+                if not_modified is not None:
+                    return not_modified
+                return add_headers(await view_method(self, request, *args, **kwargs), headers)
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = getattr(self, validators_method)(request, *args, **kwargs)
+            headers = build_validator_headers(etag, last_modified)
+            not_modified = check_not_modified(request, headers)
+            if not_modified is not None:
+                return not_modified
+            return add_headers(view_method(self, request, *args, **kwargs), headers)
+        return wrapper
+    return decorator
+
+
+def get_cache_timeout(request):
+    """返回响应缓存有效期，不适用缓存时返回 0"""
+    if request.method != 'GET':
+        return 0
+    return getattr(settings, 'BLOG_CACHE_TIMEOUT', 300)
+
+
+def load_cached(name, request, kwargs):
+    """
+    读取缓存的响应
+    :return: (缓存键, 响应)，未命中时响应为 None
+    """
+    key = make_key(name, request, kwargs)
+    cached = get_cache().get(key)
+    if cached is None:
+        record('misses')
+        return key, None
+
+    record('hits')
+    data, headers = cached
+    response = check_not_modified(request, headers)
+    if response is None:
+        response = Response(data, headers=headers)
+    response['X-Cache'] = 'HIT'
+    return key, response
+
+
+def store_cached(key, response, timeout):
+    """缓存成功响应的数据及其验证头"""
+    if response.status_code == 200:
+        headers = {
+            header: response[header]
+            for header in VALIDATOR_HEADERS
+            if response.has_header(header)
+        }
+        get_cache().set(key, (response.data, headers), timeout)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_response(name):
+    """
+    缓存视图的响应数据及其验证头
+    缓存键包含当前代数，代数递增后旧缓存自然失效，无需扫描删除
+    异步视图中缓存读写在线程中执行，避免阻塞事件循环
+    :param name: 接口名称
+    """
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                timeout = get_cache_timeout(request)
+                if not timeout:
+                    return await view_method(self, request, *args, **kwargs)
+
+                key, response = await sync_to_async(load_cached)(name, request, kwargs)
+                if response is not None:
+                    return response
+                response = await view_method(self, request, *args, **kwargs)
+                return await sync_to_async(store_cached)(key, response, timeout)
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            timeout = get_cache_timeout(request)
+            if not timeout:
+                return view_method(self, request, *args, **kwargs)
+
+            key, response = load_cached(name, request, kwargs)
+            if response is not None:
+                return response
+            response = view_method(self, request, *args, **kwargs)
+            return store_cached(key, response, timeout)
+        return wrapper
+    return decorator
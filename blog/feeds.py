@@ -0,0 +1,144 @@
+"""
+RSS、Atom 和站点地图
+
+订阅和站点地图生成后保存在缓存中，轮询时直接返回缓存的内容（支持 ETag / Last-Modified），不查询数据库。
+文章发布、修改或删除时递增代数（见 signals.py），下次请求时重新生成。
+"""
+import hashlib
+from collections import defaultdict
+from io import StringIO
+
+from django.conf import settings
+from django.utils import feedgenerator
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .cache import bump_generation, get_cache, get_generation
+from .models import Post, PostTag
+
+GENERATION_KEY = 'blog:feeds:generation'
+
+# 单个站点地图文件最多包含的地址数（sitemaps.org 协议的上限）
+SITEMAP_LIMIT = 50000
+
+
+def site_url(path=''):
+    return getattr(settings, 'BLOG_SITE_URL', 'http://localhost:5173').rstrip('/') + path
+
+
+def post_url(slug):
+    return site_url(getattr(settings, 'BLOG_POST_PATH', '/posts/{slug}').format(slug=slug))
+
+
+def get_feed_posts():
+    """
+    读取订阅中的最新文章，只查询需要的列
+    :return: 文章字典列表，tags 为标签名列表
+    """
+    posts = list(
+        Post.objects.filter(published=True)
+        .order_by('-created_at', '-id')
+        .values('id', 'slug', 'title', 'summary', 'created_at', 'updated_at', 'author__username')
+        [:getattr(settings, 'BLOG_FEED_SIZE', 50)]
+    )
+    tags = defaultdict(list)
+    rows = (
+        PostTag.objects.filter(post_id__in=[post['id'] for post in posts])
+        .order_by('tag__name')
+        .values_list('post_id', 'tag__name')
+    )
+    for post_id, name in rows:
+        tags[post_id].append(name)
+    for post in posts:
+        post['tags'] = tags[post['id']]
+    return posts
+
+
+def build_feed(feed_class, feed_path):
+    posts = get_feed_posts()
+    feed = feed_class(
+        title=getattr(settings, 'BLOG_FEED_TITLE', 'Blog'),
+        link=site_url('/'),
+        description=getattr(settings, 'BLOG_FEED_DESCRIPTION', ''),
+        feed_url=site_url(feed_path),
+        language=settings.LANGUAGE_CODE,
+    )
+    for post in posts:
+        link = post_url(post['slug'])
+        feed.add_item(
+            title=post['title'],
+            link=link,
+            description=post['summary'],
+            unique_id=link,
+            unique_id_is_permalink=True,
+            pubdate=post['created_at'],
+            updateddate=post['updated_at'],
+            author_name=post['author__username'],
+            categories=post['tags'],
+        )
+    last_modified = max((post['updated_at'] for post in posts), default=None)
+    return feed.writeString('utf-8').encode('utf-8'), last_modified
+
+
+def build_rss():
+    return build_feed(feedgenerator.Rss201rev2Feed, '/feed.xml')
+
+
+def build_atom():
+    return build_feed(feedgenerator.Atom1Feed, '/atom.xml')
+
+
+def build_sitemap():
+    """按更新时间倒序列出已发布的文章，超过 SITEMAP_LIMIT 时只包含最近更新的文章"""
+    rows = (
+        Post.objects.filter(published=True)
+        .order_by('-updated_at', '-id')
+        .values_list('slug', 'updated_at')[:SITEMAP_LIMIT]
+    )
+    output = StringIO()
+    xml = SimplerXMLGenerator(output, 'utf-8')
+    xml.startDocument()
+    xml.startElement('urlset', {'xmlns': 'http://www.sitemaps.org/schemas/sitemap/0.9'})
+    last_modified = None
+    for slug, updated_at in rows.iterator(chunk_size=2000):
+        last_modified = last_modified or updated_at
+        xml.startElement('url', {})
+        xml.addQuickElement('loc', post_url(slug))
+        xml.addQuickElement('lastmod', updated_at.isoformat(timespec='seconds'))
+        xml.endElement('url')
+    xml.endElement('urlset')
+    xml.endDocument()
+    return output.getvalue().encode('utf-8'), last_modified
+
+
+FEEDS = {
+    'rss': ('application/rss+xml; charset=utf-8', build_rss),
+    'atom': ('application/atom+xml; charset=utf-8', build_atom),
+    'sitemap': ('application/xml; charset=utf-8', build_sitemap),
+}
+
+
+def get_feed(name):
+    """
+    读取缓存的订阅，不存在时生成
+    缓存键包含代数，生成期间文章发生变化时结果保存在旧的代数下，不会被之后的请求读到
+    :param name: FEEDS 中的名称
+    :return: {'body', 'content_type', 'etag', 'last_modified'}
+    """
+    cache = get_cache()
+    key = f'blog:feeds:{get_generation(GENERATION_KEY)}:{name}'
+    artifact = cache.get(key)
+    if artifact is None:
+        content_type, build = FEEDS[name]
+        body, last_modified = build()
+        artifact = {
+            'body': body,
+            'content_type': content_type,
+            'etag': hashlib.md5(body).hexdigest(),
+            'last_modified': last_modified,
+        }
+        cache.set(key, artifact, timeout=None)
+    return artifact
+
+
+def invalidate_feeds():
+    bump_generation(GENERATION_KEY)
@@ -0,0 +1,25 @@
+from rest_framework import filters
+
+from .search import get_search_backend
+
+class FullTextSearchFilter(filters.BaseFilterBackend):
+    """
+    全文搜索过滤器：
+    - 通过 search 参数在全文索引中检索
+    - 未指定 ordering 参数时按相关度排序
+    """
+    search_param = 'search'
+    ordering_param = 'ordering'
+
+    def get_search_query(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if not query:
+            return queryset
+
+        queryset = get_search_backend().search(queryset, query)
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    迭代次数由 BLOG_PASSWORD_ITERATIONS 配置（为空时使用 Django 的默认值）
+    算法名称不变，已有的密码哈希仍可验证，迭代次数不同的哈希在用户下次登录时按新的次数重新生成
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'BLOG_PASSWORD_ITERATIONS', None) or super().iterations
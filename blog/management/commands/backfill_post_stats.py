@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.utils import ContentStats
+
+class Command(BaseCommand):
+    help = '批量回填文章的字数、阅读时间和摘要'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批更新的文章数')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.order_by('pk').only('pk', 'content', 'summary')
+
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+
+            for post in batch:
+                if not post.summary:
+                    post.summary = ContentStats.generate_summary(post.content)
+                post.word_count, post.reading_time = ContentStats.analyze(post.content)
+
+            with transaction.atomic():
+                Post.objects.bulk_update(batch, ['summary', 'word_count', 'reading_time'])
+
+            updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'已更新 {updated} 篇文章')
+
+        self.stdout.write(self.style.SUCCESS(f'回填完成，共 {updated} 篇文章'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.bulk import PostExporter
+from blog.models import Post
+
+class Command(BaseCommand):
+    help = '将文章导出为 NDJSON（每行一篇）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='输出文件路径，- 表示标准输出')
+        parser.add_argument('--chunk-size', type=int, default=500, help='每次从数据库读取的文章数')
+        parser.add_argument('--published-only', action='store_true', help='只导出已发布的文章')
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['published_only']:
+            queryset = queryset.filter(published=True)
+        exporter = PostExporter(queryset, chunk_size=options['chunk_size'])
+
+        if options['output'] == '-':
+            for line in exporter.iter_lines():
+                self.stdout.write(line, ending='')
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(exporter.iter_lines())
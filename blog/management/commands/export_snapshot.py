@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.snapshot import SnapshotExporter
+
+class Command(BaseCommand):
+    help = '将已发布文章的详情、列表页、标签列表和标签文章列表导出为静态 JSON 文件，只重写内容与上次快照不同的文章'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='输出目录')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='生成进程数，1 表示在当前进程中生成')
+        parser.add_argument('--page-size', type=int, default=None, help='每页文章数，默认与接口相同')
+        parser.add_argument('--base-url', default='', help='翻页链接的前缀，如 https://cdn.example.com/snapshot')
+        parser.add_argument('--full', action='store_true', help='忽略上次的快照，重写全部文章')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        exporter = SnapshotExporter(
+            options['output'],
+            base_url=options['base_url'],
+            page_size=options['page_size'],
+            full=options['full'],
+        )
+
+        if workers > 1:
+            # 子进程各自建立数据库连接，不继承父进程的连接
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+                stats = exporter.export(executor.map)
+        else:
+            stats = exporter.export()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"导出完成：{stats['posts']} 篇文章，重写 {stats['details_written']} 篇；"
+            f"{stats['pages']} 个列表页，重写 {stats['pages_written']} 个；删除 {stats['deleted']} 个文件"
+        ))
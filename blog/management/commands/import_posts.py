@@ -0,0 +1,33 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.bulk import PostImporter
+
+class Command(BaseCommand):
+    help = '从 NDJSON 文件批量导入文章（每行一篇），已存在的slug会被更新'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON 文件路径，- 表示标准输入')
+        parser.add_argument('--author', required=True, help='默认作者的用户名')
+        parser.add_argument('--batch-size', type=int, default=500, help='每批写入的文章数')
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['author'])
+        except User.DoesNotExist:
+            raise CommandError(f"用户 {options['author']} 不存在")
+
+        importer = PostImporter(author, batch_size=options['batch_size'])
+        if options['path'] == '-':
+            stats = importer.run(sys.stdin)
+        else:
+            with open(options['path'], encoding='utf-8') as lines:
+                stats = importer.run(lines)
+
+        for error in stats['errors']:
+            self.stderr.write(f"第 {error['line']} 行: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"新建 {stats['created']} 篇，更新 {stats['updated']} 篇，失败 {stats['failed']} 行"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import RelatedPost
+
+class Command(BaseCommand):
+    help = '重建相关文章索引（MinHash 签名、LSH 分桶和相关文章）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批读取和写入的行数')
+
+    def handle(self, *args, **options):
+        count = RelatedPost.objects.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'已为 {count} 篇文章计算相关文章'))
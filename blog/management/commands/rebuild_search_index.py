@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import get_search_backend
+
+class Command(BaseCommand):
+    help = '重建文章全文索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批读取的文章数')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        count = backend.rebuild(Post.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'已使用 {type(backend).__name__} 索引 {count} 篇文章'
+        ))
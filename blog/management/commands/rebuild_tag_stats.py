@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import TagStat
+
+class Command(BaseCommand):
+    help = '按已发布文章重新计算标签统计'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = TagStat.objects.refresh()
+        self.stdout.write(self.style.SUCCESS(f'已重新统计 {count} 个标签'))
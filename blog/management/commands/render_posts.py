@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from blog.cache import bump_generation
+from blog.models import Post
+from blog.rendering import content_hash, render_markdown
+
+class Command(BaseCommand):
+    help = '重新渲染内容哈希已过期（内容或渲染器版本变化）的文章，可使用多个进程并行渲染'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='每批读取和写入的文章数')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='渲染进程数，1 表示在当前进程中渲染')
+        parser.add_argument('--force', action='store_true', help='重新渲染全部文章')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        workers = options['workers']
+        queryset = Post.objects.order_by('pk').only('pk', 'content', 'content_hash')
+
+        executor = None
+        if workers > 1:
+            # 子进程只执行纯 Python 渲染，不继承数据库连接
+            connections.close_all()
+            executor = ProcessPoolExecutor(max_workers=workers)
+
+        rendered = 0
+        checked = 0
+        last_pk = 0
+        try:
+            while True:
+                batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                checked += len(batch)
+
+                stale = [
+                    post for post in batch
+                    if options['force'] or post.content_hash != content_hash(post.content)
+                ]
+                if not stale:
+                    continue
+
+                contents = [post.content for post in stale]
+                if executor is None:
+                    results = map(render_markdown, contents)
+                else:
+                    results = executor.map(render_markdown, contents, chunksize=max(1, len(stale) // workers))
+                for post, result in zip(stale, results):
+                    for field, value in result.items():
+                        setattr(post, field, value)
+
+                with transaction.atomic():
+                    Post.objects.bulk_update(stale, ['content_html', 'toc', 'content_hash'])
+                rendered += len(stale)
+                self.stdout.write(f'已检查 {checked} 篇文章，重新渲染 {rendered} 篇')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if rendered:
+            # 重新渲染不修改 updated_at，需要清除响应缓存
+            bump_generation()
+        self.stdout.write(self.style.SUCCESS(f'渲染完成，共重新渲染 {rendered} 篇文章'))
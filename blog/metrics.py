@@ -0,0 +1,256 @@
+import random
+import threading
+import time
+from asyncio import iscoroutinefunction
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.renderers import BaseRenderer
+
+# 当前请求的指标，通过上下文变量传递到异步视图的数据库线程中
+current_metrics = ContextVar('blog_request_metrics', default=None)
+
+# 各指标的直方图分桶上界
+HISTOGRAMS = {
+    'duration': ('blog_request_duration_seconds', '请求耗时（秒）',
+                 (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)),
+    'queries': ('blog_db_queries', '每个请求的SQL查询数',
+                (0, 1, 2, 3, 5, 10, 20, 50, 100)),
+    'sql_time': ('blog_db_time_seconds', '每个请求的SQL耗时（秒）',
+                 (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)),
+    'serialize_time': ('blog_serialize_time_seconds', '每个请求的序列化和渲染耗时（秒）',
+                       (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5)),
+    'size': ('blog_response_size_bytes', '响应体大小（字节）',
+             (256, 1024, 4096, 16384, 65536, 262144, 1048576)),
+}
+
+
+class RequestMetrics:
+    """单个请求的指标"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.render_start = None
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def snapshot(self):
+        cumulative = []
+        total = 0
+        for bound, count in zip(list(self.bounds) + ['+Inf'], self.buckets):
+            total += count
+            cumulative.append((bound, total))
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': cumulative,
+        }
+
+
+class MetricsRegistry:
+    """进程内按路由汇总的指标直方图"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+
+    def observe(self, route, values):
+        with self.lock:
+            histograms = self.routes.get(route)
+            if histograms is None:
+                histograms = self.routes[route] = {
+                    name: Histogram(bounds) for name, (_, _, bounds) in HISTOGRAMS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                route: {name: histogram.snapshot() for name, histogram in histograms.items()}
+                for route, histograms in sorted(self.routes.items())
+            }
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    """数据库执行包装器：为正在采样的请求统计查询数和耗时"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_time += time.perf_counter() - start
+
+
+def install_wrapper(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def install_on_new_connection(sender, connection, **kwargs):
+    install_wrapper(connection)
+
+
+@receiver(request_started)
+def install_on_existing_connections(sender, **kwargs):
+    """
+    数据库连接按线程创建，启用指标前已存在的连接也需要安装包装器
+    ASGI 下该信号在数据库所在的线程中处理
+    """
+    for connection in connections.all(initialized_only=True):
+        install_wrapper(connection)
+
+
+@contextmanager
+def timer(name):
+    """为当前请求累计一段代码的耗时，name 为 RequestMetrics 的属性名"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(metrics, name, getattr(metrics, name) + time.perf_counter() - start)
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <unmatched>'
+    return f'{request.method} {match.url_name or match.route}'
+
+
+class MetricsMiddleware:
+    """
+    请求指标中间件：
+    - 按 BLOG_METRICS_SAMPLE_RATE 采样，记录查询数、SQL耗时、序列化耗时和响应大小
+    - 采样的请求附带 Server-Timing 响应头，并按路由汇总到直方图
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def sample(self):
+        rate = getattr(settings, 'BLOG_METRICS_SAMPLE_RATE', 1.0)
+        return rate >= 1 or random.random() < rate
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sample():
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.sample():
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        # DRF 的响应在视图返回后才渲染，渲染耗时通过渲染后回调计算
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.render_start = time.perf_counter()
+
+            def rendered(response):
+                metrics.serialize_time += time.perf_counter() - metrics.render_start
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.start
+        values = {
+            'duration': duration,
+            'queries': metrics.queries,
+            'sql_time': metrics.sql_time,
+            'serialize_time': metrics.serialize_time,
+        }
+        if not response.streaming:
+            values['size'] = len(response.content)
+        registry.observe(get_route(request), values)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serialize_time * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ])
+        return response
+
+
+class PrometheusRenderer(BaseRenderer):
+    """将指标快照渲染为 Prometheus 文本格式"""
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        routes = data.get('routes', {}) if isinstance(data, dict) else {}
+        lines = []
+        for name, (metric, description, _) in HISTOGRAMS.items():
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} histogram')
+            for route, histograms in routes.items():
+                histogram = histograms[name]
+                label = route.replace('\\', '\\\\').replace('"', '\\"')
+                for bound, count in histogram['buckets']:
+                    lines.append(f'{metric}_bucket{{route="{label}",le="{bound}"}} {count}')
+                lines.append(f'{metric}_sum{{route="{label}"}} {histogram["sum"]}')
+                lines.append(f'{metric}_count{{route="{label}"}} {histogram["count"]}')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
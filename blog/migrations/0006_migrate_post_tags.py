@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:50
+
+from django.db import migrations
+
+
+def split_tags(tags_str):
+    return sorted(set(tag.strip() for tag in tags_str.split(',') if tag.strip()))
+
+
+def forwards(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Tag = apps.get_model('blog', 'Tag')
+    PostTag = apps.get_model('blog', 'PostTag')
+
+    post_tags = {
+        post_id: split_tags(tags)
+        for post_id, tags in Post.objects.exclude(tags='').values_list('id', 'tags')
+    }
+    names = {name for tags in post_tags.values() for name in tags}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'id'))
+
+    PostTag.objects.bulk_create(
+        [
+            PostTag(post_id=post_id, tag_id=tag_ids[name])
+            for post_id, tags in post_tags.items()
+            for name in tags
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def backwards(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostTag = apps.get_model('blog', 'PostTag')
+
+    post_tags = {}
+    for post_id, name in PostTag.objects.order_by('tag__name').values_list('post_id', 'tag__name'):
+        post_tags.setdefault(post_id, []).append(name)
+    for post_id, tags in post_tags.items():
+        Post.objects.filter(id=post_id).update(tags=','.join(tags))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_tag_posttag'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+import re
+
+from django.db import migrations
+
+# 迁移时的分词规则（blog.search.tokenize 的副本），之后修改分词规则不影响本迁移，
+# 修改后执行 rebuild_search_index 重建索引
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fff]+|[^\W_]+')
+
+
+def tokenize(text):
+    from pypinyin import lazy_pinyin
+
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        chunk = match.group()
+        if not CJK_PATTERN.fullmatch(chunk):
+            tokens.append(chunk)
+            continue
+
+        if len(chunk) == 1:
+            grams = [chunk]
+        else:
+            grams = [chunk[i:i + 2] for i in range(len(chunk) - 1)]
+        tokens.extend(grams)
+
+        pinyin = lazy_pinyin(chunk)
+        if len(pinyin) == 1:
+            tokens.extend(pinyin)
+        else:
+            tokens.extend(pinyin[i] + pinyin[i + 1] for i in range(len(pinyin) - 1))
+    return tokens
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_fts USING fts5('
+            "title, tags, summary, content, tokenize = 'unicode61')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE blog_post_search ('
+            'post_id bigint PRIMARY KEY REFERENCES blog_post (id) '
+            'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX blog_post_search_document_idx '
+            'ON blog_post_search USING GIN (document)'
+        )
+    else:
+        return
+
+    Post = apps.get_model('blog', 'Post')
+    PostTag = apps.get_model('blog', 'PostTag')
+    post_tags = {}
+    for post_id, name in PostTag.objects.values_list('post_id', 'tag__name'):
+        post_tags.setdefault(post_id, []).append(name)
+
+    for post in Post.objects.iterator(chunk_size=500):
+        fields = [
+            ' '.join(tokenize(post.title)),
+            ' '.join(tokenize(' '.join(sorted(post_tags.get(post.id, []))))),
+            ' '.join(tokenize(post.summary)),
+            ' '.join(tokenize(post.content)),
+        ]
+        if vendor == 'sqlite':
+            schema_editor.execute(
+                'INSERT INTO blog_post_fts (rowid, title, tags, summary, content) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [post.id] + fields
+            )
+        else:
+            schema_editor.execute(
+                'INSERT INTO blog_post_search (post_id, document) VALUES (%s, '
+                "setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'C') || "
+                "setweight(to_tsvector('simple', %s), 'D'))",
+                [post.id] + fields
+            )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_remove_post_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
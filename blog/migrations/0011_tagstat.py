@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def populate_tag_stats(apps, schema_editor):
+    Tag = apps.get_model('blog', 'Tag')
+    PostTag = apps.get_model('blog', 'PostTag')
+    TagStat = apps.get_model('blog', 'TagStat')
+
+    counts = {
+        row['tag_id']: row
+        for row in PostTag.objects.filter(post__published=True).values('tag_id').annotate(
+            post_count=Count('post_id'),
+            last_used_at=Max('post__updated_at')
+        )
+    }
+    TagStat.objects.bulk_create(
+        [
+            TagStat(
+                tag_id=tag_id,
+                post_count=counts.get(tag_id, {}).get('post_count', 0),
+                last_used_at=counts.get(tag_id, {}).get('last_used_at')
+            )
+            for tag_id in Tag.objects.values_list('id', flat=True)
+        ],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagStat',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stat', serialize=False, to='blog.tag', verbose_name='标签')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='已发布文章数')),
+                ('last_used_at', models.DateTimeField(blank=True, null=True, verbose_name='最后使用时间')),
+            ],
+            options={
+                'verbose_name': '标签统计',
+                'verbose_name_plural': '标签统计',
+                'indexes': [models.Index(fields=['-post_count'], name='blog_tagsta_post_co_0620eb_idx')],
+            },
+        ),
+        migrations.RunPython(populate_tag_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_tagstat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSignature',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='blog.post', verbose_name='文章')),
+                ('minhash', models.JSONField(verbose_name='MinHash签名')),
+            ],
+            options={
+                'verbose_name': '文章签名',
+                'verbose_name_plural': '文章签名',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostSignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.BigIntegerField(verbose_name='分段哈希')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_bands', to='blog.post', verbose_name='文章')),
+            ],
+            options={
+                'verbose_name': '签名分桶',
+                'verbose_name_plural': '签名分桶',
+                'indexes': [models.Index(fields=['hash'], name='blog_postsi_hash_277926_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='相关度')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='blog.post', verbose_name='文章')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='blog.post', verbose_name='相关文章')),
+            ],
+            options={
+                'verbose_name': '相关文章',
+                'verbose_name_plural': '相关文章',
+                'indexes': [models.Index(fields=['post', '-score'], name='blog_relate_post_id_890554_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'related'), name='unique_related_post')],
+            },
+        ),
+    ]
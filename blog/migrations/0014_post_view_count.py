@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_content_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='浏览次数'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['view_count', 'id'], name='blog_post_view_co_df6694_idx'),
+        ),
+    ]
@@ -1,6 +1,71 @@
-from django.db import models
+import heapq
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Coalesce, Greatest, RowNumber
+from django.utils import timezone
 from django.contrib.auth.models import User
-from .utils import SlugGenerator, TagManager
+from .utils import ContentStats, SlugGenerator, TagManager, chunked
+from .cache import bump_generation
+from .search import get_search_backend
+from .related import MinHasher, document_tokens, score
+from .rendering import content_hash, render_markdown
+
+class PostQuerySet(models.QuerySet):
+    def with_author(self):
+        """
+        预加载作者并在SQL中注解作者的文章总数，
+        避免序列化列表时逐条查询作者及其文章数
+        """
+        author_posts = (
+            Post.objects.order_by()
+            .filter(author=OuterRef('author'))
+            .values('author')
+            .annotate(count=Count('id'))
+            .values('count')
+        )
+        return self.select_related('author').annotate(
+            author_posts_count=Coalesce(
+                Subquery(author_posts, output_field=IntegerField()), 0
+            )
+        )
+
+    def with_tags(self):
+        """预加载标签，避免序列化时逐条查询"""
+        return self.prefetch_related('tag_set')
+
+    def filter_tags(self, names, match_all=False):
+        """
+        按标签精确筛选文章
+        :param names: 标签名列表
+        :param match_all: True 时要求包含全部标签，否则包含任一标签即可
+        """
+        names = set(names)
+        if not names:
+            return self
+        post_ids = PostTag.objects.filter(tag__name__in=names).values('post')
+        if match_all:
+            post_ids = (
+                post_ids.annotate(matched=Count('tag', distinct=True))
+                .filter(matched=len(names))
+                .values('post')
+            )
+        return self.filter(id__in=post_ids)
+
+class Tag(models.Model):
+    # 与原 Post.tags 字段的长度一致，旧数据中的单个长标签迁移时不会超长
+    name = models.CharField(max_length=200, unique=True, verbose_name='名称')
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = '标签'
+        verbose_name_plural = '标签'
+
+    def __str__(self):
+        return self.name
 
 class Post(models.Model):
     title = models.CharField(max_length=200, verbose_name='标题')
@@ -17,45 +82,595 @@ class Post(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
     published = models.BooleanField(default=False, verbose_name='是否发布')
     featured_image = models.URLField(blank=True, verbose_name='特色图片')
-    tags = models.CharField(max_length=200, blank=True, verbose_name='标签')
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='字数')
+    reading_time = models.PositiveIntegerField(default=1, editable=False, verbose_name='阅读时间（分钟）')
+    content_html = models.TextField(blank=True, editable=False, verbose_name='渲染后的内容')
+    toc = models.JSONField(default=list, blank=True, editable=False, verbose_name='目录')
+    content_hash = models.CharField(max_length=64, blank=True, editable=False, verbose_name='内容哈希')
+    # 由浏览计数缓冲批量更新（见 analytics.py），保存文章时不写入该字段
+    view_count = models.PositiveIntegerField(default=0, editable=False, verbose_name='浏览次数')
+    tag_set = models.ManyToManyField(
+        Tag,
+        through='PostTag',
+        related_name='posts',
+        blank=True,
+        verbose_name='标签'
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    # slug冲突时的最大重试次数
+    SLUG_RETRIES = 5
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = '文章'
         verbose_name_plural = '文章'
         indexes = [
-            models.Index(fields=['created_at']),
+            # 复合索引用于按 (排序字段, id) 的键集分页
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['title', 'id']),
             models.Index(fields=['slug']),
             models.Index(fields=['published']),
+            # 按浏览次数排序（最多浏览）
+            models.Index(fields=['view_count', 'id']),
         ]
 
+    def __init__(self, *args, **kwargs):
+        self._pending_tags = None
+        super().__init__(*args, **kwargs)
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        # 生成slug
-        if not self.slug and self.title:
-            self.slug = SlugGenerator.generate_unique_slug(
-                self.title,
-                Post,
-                self.id
-            )
-        
-        # 标准化标签
-        if self.tags:
-            self.tags = TagManager.normalize_tags(self.tags)
-            
-        super().save(*args, **kwargs)
+        # 浏览次数只由计数缓冲增量更新，避免用读取时的旧值覆盖期间写入的计数
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'view_count' and field.attname not in deferred
+            ]
+
+        # 文章、标签和索引在同一事务中写入
+        with transaction.atomic():
+            # 保存前已发布文章的标签，用于计算标签统计的变化
+            old_tag_ids = set() if self._state.adding else self.get_published_tag_ids()
+
+            # 生成摘要并统计字数
+            if not self.summary:
+                self.summary = ContentStats.generate_summary(self.content)
+            self.word_count, self.reading_time = ContentStats.analyze(self.content)
+            self.render_content()
+
+            # 自动生成的slug可能被并发写入抢占，冲突时重新生成并重试
+            auto_slug = not self.slug and bool(self.title)
+            for attempt in range(self.SLUG_RETRIES):
+                if auto_slug:
+                    self.slug = SlugGenerator.generate_unique_slug(
+                        self.title,
+                        Post,
+                        self.id
+                    )
+                try:
+                    with transaction.atomic():
+                        super().save(*args, **kwargs)
+                    break
+                except IntegrityError:
+                    if not auto_slug or attempt == self.SLUG_RETRIES - 1:
+                        raise
+
+            # 同步标签
+            if self._pending_tags is not None:
+                self.set_tags(self._pending_tags)
+
+            # 增量更新标签统计
+            new_tag_ids = self.get_published_tag_ids()
+            TagStat.objects.apply_changes(
+                added=new_tag_ids - old_tag_ids,
+                removed=old_tag_ids - new_tag_ids,
+                touched=new_tag_ids
+            )
+
+            # 更新全文索引；相关文章计算量较大，在事务提交后更新，不延长写事务
+            get_search_backend().index_post(self)
+            transaction.on_commit(partial(RelatedPost.objects.index_posts, [self.pk]))
+
+    def render_content(self):
+        """
+        内容或渲染器版本变化时重新渲染 HTML 和目录
+        :return: 是否重新渲染
+        """
+        if self.content_hash == content_hash(self.content):
+            return False
+        for field, value in render_markdown(self.content).items():
+            setattr(self, field, value)
+        return True
+
+    def get_published_tag_ids(self):
+        """返回数据库中该文章作为已发布文章关联的标签ID"""
+        return set(
+            PostTag.objects.filter(post_id=self.pk, post__published=True)
+            .values_list('tag_id', flat=True)
+        )
+
+    def set_tags(self, names):
+        """
+        将文章标签替换为给定的标签列表
+        :param names: 标签名列表
+        """
+        names = TagManager.parse_tags(names)
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in names],
+            ignore_conflicts=True
+        )
+        tag_ids = set(
+            Tag.objects.filter(name__in=names).values_list('id', flat=True)
+        )
+        current_ids = set(self.post_tags.values_list('tag_id', flat=True))
+
+        self.post_tags.exclude(tag_id__in=tag_ids).delete()
+        PostTag.objects.bulk_create([
+            PostTag(post=self, tag_id=tag_id)
+            for tag_id in tag_ids - current_ids
+        ])
+
+        self._pending_tags = None
+        if hasattr(self, '_prefetched_objects_cache'):
+            self._prefetched_objects_cache.pop('tag_set', None)
+
+    @property
+    def tags(self):
+        """返回逗号分隔的标签字符串"""
+        return ','.join(self.tag_list)
+
+    @tags.setter
+    def tags(self, value):
+        # 保存时同步到标签表
+        self._pending_tags = TagManager.parse_tags(value)
 
     @property
     def tag_list(self):
         """返回标签列表"""
-        return [tag.strip() for tag in self.tags.split(',')] if self.tags else []
+        if self._pending_tags is not None:
+            return self._pending_tags
+        if self.pk is None:
+            return []
+        return [tag.name for tag in self.tag_set.all()]
+
+class PostTag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='文章'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='标签'
+    )
+
+    class Meta:
+        verbose_name = '文章标签'
+        verbose_name_plural = '文章标签'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='unique_post_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'post']),
+        ]
+
+class TagStatManager(models.Manager):
+    def apply_changes(self, added=(), removed=(), touched=()):
+        """
+        增量更新标签统计
+        :param added: 已发布文章数加一的标签ID
+        :param removed: 已发布文章数减一的标签ID
+        :param touched: 需要更新最后使用时间的标签ID
+        """
+        added, removed, touched = set(added), set(removed), set(touched)
+        if added:
+            self.bulk_create(
+                [TagStat(tag_id=tag_id) for tag_id in added],
+                ignore_conflicts=True
+            )
+            self.filter(tag_id__in=added).update(post_count=F('post_count') + 1)
+        if removed:
+            self.filter(tag_id__in=removed).update(
+                post_count=Greatest(F('post_count') - 1, 0)
+            )
+        if touched:
+            self.filter(tag_id__in=touched).update(last_used_at=timezone.now())
+
+    def refresh(self, tag_ids=None):
+        """
+        按已发布文章重新计算标签统计
+        :param tag_ids: 需要重新计算的标签ID，None 表示全部标签
+        """
+        post_tags = PostTag.objects.filter(post__published=True)
+        tags = Tag.objects.all()
+        if tag_ids is not None:
+            post_tags = post_tags.filter(tag_id__in=tag_ids)
+            tags = tags.filter(id__in=tag_ids)
+
+        counts = {
+            row['tag_id']: row
+            for row in post_tags.values('tag_id').annotate(
+                post_count=Count('post_id'),
+                last_used_at=Max('post__updated_at')
+            )
+        }
+        stats = [
+            TagStat(
+                tag_id=tag_id,
+                post_count=counts.get(tag_id, {}).get('post_count', 0),
+                last_used_at=counts.get(tag_id, {}).get('last_used_at')
+            )
+            for tag_id in tags.values_list('id', flat=True)
+        ]
+        self.bulk_create(
+            stats,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['tag'],
+            update_fields=['post_count', 'last_used_at']
+        )
+        return len(stats)
+
+class TagStat(models.Model):
+    tag = models.OneToOneField(
+        Tag,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stat',
+        verbose_name='标签'
+    )
+    post_count = models.PositiveIntegerField(default=0, verbose_name='已发布文章数')
+    last_used_at = models.DateTimeField(null=True, blank=True, verbose_name='最后使用时间')
+
+    objects = TagStatManager()
+
+    class Meta:
+        verbose_name = '标签统计'
+        verbose_name_plural = '标签统计'
+        indexes = [
+            models.Index(fields=['-post_count']),
+        ]
+
+    def __str__(self):
+        return f'{self.tag_id}: {self.post_count}'
+
+class PostSignature(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='signature',
+        verbose_name='文章'
+    )
+    minhash = models.JSONField(verbose_name='MinHash签名')
+
+    class Meta:
+        verbose_name = '文章签名'
+        verbose_name_plural = '文章签名'
+
+class PostSignatureBand(models.Model):
+    """MinHash 签名的 LSH 分桶，哈希值相同的文章互为相关文章的候选"""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='signature_bands',
+        verbose_name='文章'
+    )
+    hash = models.BigIntegerField(verbose_name='分段哈希')
+
+    class Meta:
+        verbose_name = '签名分桶'
+        verbose_name_plural = '签名分桶'
+        indexes = [
+            models.Index(fields=['hash']),
+        ]
+
+class RelatedPostManager(models.Manager):
+    @property
+    def limit(self):
+        """每篇文章保存的相关文章数"""
+        return getattr(settings, 'BLOG_RELATED_POSTS', 10)
 
     @property
-    def reading_time(self):
-        """估算阅读时间（分钟）"""
-        words_per_minute = 200  # 假设平均阅读速度
-        word_count = len(self.content.split())
-        return max(1, round(word_count / words_per_minute))
-        
\ No newline at end of file
+    def max_candidates(self):
+        """按共同标签查找候选时每个标签最多取的文章数"""
+        return getattr(settings, 'BLOG_RELATED_MAX_CANDIDATES', 500)
+
+    # 每批增量更新的文章数（每篇文章 32 个分段哈希，控制分桶查询的参数数量）
+    batch_size = 200
+    # 按ID列表查询时每条查询最多包含的ID数
+    query_chunk_size = 900
+
+    def remove_posts(self, post_ids):
+        """
+        从相关文章索引中移除文章
+        :return: 相关列表中原本包含这些文章的其他文章ID
+        """
+        affected = set(
+            self.filter(related_id__in=post_ids).exclude(post_id__in=post_ids).values_list('post_id', flat=True)
+        )
+        PostSignature.objects.filter(post_id__in=post_ids).delete()
+        PostSignatureBand.objects.filter(post_id__in=post_ids).delete()
+        self.filter(Q(post_id__in=post_ids) | Q(related_id__in=post_ids)).delete()
+        return affected
+
+    def get_tags(self, post_ids):
+        """返回 文章ID -> 标签ID集合"""
+        tags = defaultdict(set)
+        for chunk in chunked(list(post_ids), self.query_chunk_size):
+            for post_id, tag_id in PostTag.objects.filter(post_id__in=chunk).values_list('post_id', 'tag_id'):
+                tags[post_id].add(tag_id)
+        return tags
+
+    def find_candidates(self, signatures, tags):
+        """
+        通过 LSH 分桶和共同标签为一批文章查找候选，分桶和标签各用一条查询
+        :param signatures: 文章ID -> MinHash 签名
+        :param tags: 文章ID -> 标签ID集合
+        :return: 文章ID -> 候选文章ID集合（不含自身）
+        """
+        hasher = MinHasher()
+        post_hashes = {
+            post_id: [value for _, value in hasher.band_hashes(signature)]
+            for post_id, signature in signatures.items() if signature is not None
+        }
+        buckets = defaultdict(set)
+        hashes = {value for values in post_hashes.values() for value in values}
+        if hashes:
+            rows = PostSignatureBand.objects.filter(hash__in=hashes).values_list('hash', 'post_id')
+            for value, post_id in rows:
+                buckets[value].add(post_id)
+
+        # 每个标签只取最新的 max_candidates 篇已发布文章（多取一篇以排除自身）
+        tag_posts = defaultdict(list)
+        tag_ids = set().union(*tags.values())
+        if tag_ids:
+            rows = (
+                PostTag.objects.filter(tag_id__in=tag_ids, post__published=True)
+                .annotate(rank=Window(RowNumber(), partition_by=F('tag_id'), order_by=F('post_id').desc()))
+                .filter(rank__lte=self.max_candidates + 1)
+                .values_list('tag_id', 'post_id')
+            )
+            for tag_id, post_id in rows:
+                tag_posts[tag_id].append(post_id)
+
+        candidates = {}
+        for post_id in signatures:
+            found = set()
+            for value in post_hashes.get(post_id, ()):
+                found.update(buckets[value])
+            for tag_id in tags[post_id]:
+                found.update(tag_posts[tag_id])
+            found.discard(post_id)
+            candidates[post_id] = found
+        return candidates
+
+    def score_posts(self, signatures, tags):
+        """
+        计算一批文章与各自候选的相关度
+        :return: 文章ID -> {候选文章ID: 相关度}，只包含相关度大于 0 的候选
+        """
+        candidates = self.find_candidates(signatures, tags)
+        others = set().union(*candidates.values()) - set(signatures)
+        other_signatures = dict(signatures)
+        for chunk in chunked(list(others), self.query_chunk_size):
+            other_signatures.update(
+                PostSignature.objects.filter(post_id__in=chunk).values_list('post_id', 'minhash')
+            )
+        other_tags = self.get_tags(others)
+
+        scores = {}
+        for post_id, found in candidates.items():
+            scores[post_id] = {}
+            for other in found:
+                value = score(
+                    signatures[post_id], other_signatures.get(other),
+                    tags[post_id], tags[other] if other in signatures else other_tags[other]
+                )
+                if value > 0:
+                    scores[post_id][other] = value
+        return scores
+
+    def index_posts(self, post_ids):
+        """
+        增量更新一批文章的签名和相关文章，在文章写入的事务提交后执行（见 Post.save 和 signals.py）：
+        - 每批文章一次计算签名，通过 LSH 分桶和共同标签查找候选，只与候选计算相关度
+        - 同时把文章加入候选文章的相关列表，超出数量的条目被淘汰
+        - 未发布（或已删除）的文章从索引中移除；原本列出这些文章的其他文章重新补足相关列表
+        :param post_ids: 文章ID
+        """
+        post_ids = list(post_ids)
+        for chunk in chunked(post_ids, self.batch_size):
+            with transaction.atomic():
+                self.index_batch(chunk)
+        # 在文章写入的事务之后执行，需要再次使相关文章的响应缓存失效
+        if post_ids:
+            bump_generation()
+
+    def index_batch(self, post_ids):
+        affected = self.remove_posts(post_ids)
+        hasher = MinHasher()
+        posts = Post.objects.filter(pk__in=post_ids, published=True).only('id', 'title', 'summary', 'content')
+        signatures = {post.pk: hasher.signature(document_tokens(post)) for post in posts}
+        PostSignature.objects.bulk_create([
+            PostSignature(post_id=post_id, minhash=signature)
+            for post_id, signature in signatures.items() if signature is not None
+        ])
+        PostSignatureBand.objects.bulk_create([
+            PostSignatureBand(post_id=post_id, hash=value)
+            for post_id, signature in signatures.items() if signature is not None
+            for _, value in hasher.band_hashes(signature)
+        ], batch_size=self.query_chunk_size)
+
+        scores = self.score_posts(signatures, self.get_tags(signatures))
+        rows = {}
+        incoming = defaultdict(dict)
+        for post_id, others in scores.items():
+            for other, value in heapq.nlargest(self.limit, others.items(), key=lambda item: item[1]):
+                rows[post_id, other] = value
+            for other, value in others.items():
+                # 批次内的文章互为候选，已在各自的列表中计算
+                if other not in signatures:
+                    incoming[other][post_id] = value
+
+        # 只有候选文章的列表未满或相关度高于其当前最低值时才加入，避免写入随即被淘汰的条目
+        current = {}
+        for chunk in chunked(list(incoming), self.query_chunk_size):
+            current.update(
+                (row['post_id'], (row['count'], row['lowest']))
+                for row in self.filter(post_id__in=chunk).values('post_id')
+                .annotate(count=Count('id'), lowest=Min('score'))
+            )
+        for other, values in incoming.items():
+            count, lowest = current.get(other, (0, 0))
+            for post_id, value in heapq.nlargest(self.limit, values.items(), key=lambda item: item[1]):
+                if count < self.limit or value > lowest:
+                    rows[other, post_id] = value
+        self.bulk_create(
+            [RelatedPost(post_id=post_id, related_id=other, score=value) for (post_id, other), value in rows.items()],
+            batch_size=self.query_chunk_size
+        )
+        self.trim({post_id for post_id, _ in rows})
+        self.refill(affected)
+
+    def refill(self, post_ids):
+        """
+        重新计算文章自身的相关列表（不修改其他文章的列表），
+        用于相关文章被取消发布或删除后补足列表
+        :param post_ids: 文章ID，未发布的文章被忽略
+        """
+        post_ids = list(post_ids)
+        for chunk in chunked(post_ids, self.batch_size):
+            with transaction.atomic():
+                signatures = {}
+                for post_id, signature in PostSignature.objects.filter(
+                        post_id__in=chunk, post__published=True).values_list('post_id', 'minhash'):
+                    signatures[post_id] = signature
+                scores = self.score_posts(signatures, self.get_tags(signatures))
+                self.filter(post_id__in=chunk).delete()
+                self.bulk_create([
+                    RelatedPost(post_id=post_id, related_id=other, score=value)
+                    for post_id, others in scores.items()
+                    for other, value in heapq.nlargest(self.limit, others.items(), key=lambda item: item[1])
+                ], batch_size=self.query_chunk_size)
+        if post_ids:
+            bump_generation()
+
+    def trim(self, post_ids):
+        """只保留各文章相关度最高的条目"""
+        extra = []
+        for chunk in chunked(list(post_ids), self.query_chunk_size):
+            counts = defaultdict(int)
+            rows = self.filter(post_id__in=chunk).order_by('post_id', '-score').values_list('id', 'post_id')
+            for row_id, post_id in rows:
+                counts[post_id] += 1
+                if counts[post_id] > self.limit:
+                    extra.append(row_id)
+        for chunk in chunked(extra, self.query_chunk_size):
+            self.filter(id__in=chunk).delete()
+
+    def rebuild(self, batch_size=500):
+        """
+        重建所有已发布文章的签名和相关文章
+        :param batch_size: 每批读取和写入的行数
+        :return: 已索引的文章数
+        """
+        hasher = MinHasher()
+        posts = Post.objects.filter(published=True).only('id', 'title', 'summary', 'content')
+        signatures = {
+            post.pk: hasher.signature(document_tokens(post))
+            for post in posts.iterator(chunk_size=batch_size)
+        }
+
+        tags = defaultdict(set)
+        tag_posts = defaultdict(list)
+        for post_id, tag_id in (PostTag.objects.filter(post__published=True)
+                                .order_by('-post_id').values_list('post_id', 'tag_id')):
+            tags[post_id].add(tag_id)
+            tag_posts[tag_id].append(post_id)
+
+        post_hashes = {}
+        buckets = defaultdict(list)
+        for post_id, signature in signatures.items():
+            if signature is not None:
+                post_hashes[post_id] = [value for _, value in hasher.band_hashes(signature)]
+                for value in post_hashes[post_id]:
+                    buckets[value].append(post_id)
+
+        related = []
+        for post_id, signature in signatures.items():
+            candidates = set()
+            for value in post_hashes.get(post_id, ()):
+                candidates.update(buckets[value])
+            for tag_id in tags[post_id]:
+                candidates.update(tag_posts[tag_id][:self.max_candidates])
+            candidates.discard(post_id)
+
+            scored = (
+                (score(signature, signatures[other], tags[post_id], tags[other]), other)
+                for other in candidates
+            )
+            related.extend(
+                RelatedPost(post_id=post_id, related_id=other, score=value)
+                for value, other in heapq.nlargest(self.limit, scored)
+                if value > 0
+            )
+
+        with transaction.atomic():
+            PostSignature.objects.all().delete()
+            PostSignatureBand.objects.all().delete()
+            self.all().delete()
+            PostSignature.objects.bulk_create(
+                [
+                    PostSignature(post_id=post_id, minhash=signature)
+                    for post_id, signature in signatures.items()
+                    if signature is not None
+                ],
+                batch_size=batch_size
+            )
+            PostSignatureBand.objects.bulk_create(
+                [
+                    PostSignatureBand(post_id=post_id, hash=value)
+                    for post_id, hashes in post_hashes.items()
+                    for value in hashes
+                ],
+                batch_size=batch_size
+            )
+            self.bulk_create(related, batch_size=batch_size)
+        return len(signatures)
+
+class RelatedPost(models.Model):
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_entries',
+        verbose_name='文章'
+    )
+    related = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_from',
+        verbose_name='相关文章'
+    )
+    score = models.FloatField(verbose_name='相关度')
+
+    objects = RelatedPostManager()
+
+    class Meta:
+        verbose_name = '相关文章'
+        verbose_name_plural = '相关文章'
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score']),
+        ]
@@ -0,0 +1,147 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    键集（游标）分页：
+    - 按查询集的首个排序字段加主键定位下一页，深翻页不需要 OFFSET
+    - 游标中保存上一页边界记录的排序值和主键
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = '无效的游标'
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 20
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if requested > 0:
+            return min(requested, self.max_page_size)
+        return page_size
+
+    def get_ordering(self, queryset):
+        """返回 (排序字段, 是否降序)，取查询集的首个排序字段"""
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        field = ordering[0] if ordering and isinstance(ordering[0], str) else '-pk'
+        if field.startswith('-'):
+            return field[1:], True
+        return field, False
+
+    def get_field(self, queryset):
+        """返回排序字段（模型字段或注解的输出字段）"""
+        if self.field in queryset.query.annotations:
+            return queryset.query.annotations[self.field].output_field
+        if self.field == 'pk':
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(self.field)
+
+    def decode_cursor(self, request, queryset):
+        """
+        解析游标，排序值按排序字段的类型转换
+        :raise NotFound: 游标格式或排序值无效
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            value = self.get_field(queryset).to_python(cursor['v'])
+            if value is None:
+                raise ValueError
+            return value, int(cursor['id']), bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse):
+        value = getattr(obj, self.field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps({'v': value, 'id': obj.pk, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_page_queryset(self, queryset, request):
+        """返回当前页（多取一条用于判断是否还有下一页）的查询集，不执行查询"""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.field, descending = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request, queryset)
+        self.cursor = cursor
+        reverse = bool(cursor and cursor[2])
+
+        # 向前翻页时反转比较方向和排序方向
+        forward_descending = descending != reverse
+        prefix = '-' if forward_descending else ''
+        if cursor:
+            value, pk, _ = cursor
+            lookup = 'lt' if forward_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': value}) |
+                Q(**{self.field: value, f'pk__{lookup}': pk})
+            )
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """根据查询结果确定当前页和前后翻页状态"""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.cursor and self.cursor[2]:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset 的异步版本，使用异步 ORM 读取当前页"""
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([obj async for obj in queryset.aiterator(chunk_size=self.page_size + 1)])
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -1,5 +1,22 @@
+from django.contrib.auth.models import User
 from rest_framework import permissions
 
+def is_current_staff(user):
+    """
+    按数据库中的当前状态判断是否为管理员
+    请求的用户对象可能来自令牌缓存，取消管理员权限后不能等缓存过期
+    """
+    if not (user and user.is_authenticated and user.is_staff):
+        return False
+    return User.objects.filter(pk=user.pk, is_staff=True, is_active=True).exists()
+
+class IsStaffUser(permissions.BasePermission):
+    """
+    管理员权限：按数据库中当前的 is_staff 判断
+    """
+    def has_permission(self, request, view):
+        return is_current_staff(request.user)
+
 class IsAdminUserOrReadOnly(permissions.BasePermission):
     """
     自定义权限类：
@@ -9,7 +26,7 @@ class IsAdminUserOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return request.user and request.user.is_staff
+        return is_current_staff(request.user)
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
     """
@@ -0,0 +1,95 @@
+import hashlib
+import random
+
+from .search import tokenize
+
+# MinHash 使用的梅森素数及签名取值范围
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# 相关度中正文相似度和标签重合度的权重
+TEXT_WEIGHT = 0.6
+TAG_WEIGHT = 0.4
+
+
+def stable_hash(value, signed=False):
+    """跨进程稳定的64位哈希（内置 hash() 每个进程随机化）"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=signed)
+
+
+def document_tokens(post):
+    """
+    返回文章标题、摘要和内容的索引词集合
+    中文按二元词切分（见 search.tokenize），不附加拼音
+    """
+    return set(tokenize(' '.join([post.title, post.summary, post.content]), with_pinyin=False))
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """
+    MinHash 签名及 LSH 分桶：
+    - 两篇文章签名中相同位置取值相等的比例近似于索引词集合的 Jaccard 相似度
+    - 签名按 bands 段分桶，任一段完全相同的文章作为候选，查找候选不需要扫描全部文章
+    """
+    num_perm = 64
+    bands = 32
+
+    def __init__(self, seed=1):
+        rng = random.Random(seed)
+        self.perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(self.num_perm)
+        ]
+        self.rows = self.num_perm // self.bands
+
+    def signature(self, tokens):
+        """
+        计算索引词集合的 MinHash 签名
+        :param tokens: 索引词集合
+        :return: 长度为 num_perm 的整数列表，没有索引词时返回 None
+        """
+        values = [stable_hash(token) for token in tokens]
+        if not values:
+            return None
+        return [
+            min((a * value + b) % MERSENNE_PRIME for value in values) & MAX_HASH
+            for a, b in self.perms
+        ]
+
+    def band_hashes(self, signature):
+        """返回签名各段的 (段号, 哈希值)"""
+        return [
+            (band, stable_hash(f'{band}:' + ','.join(
+                map(str, signature[band * self.rows:(band + 1) * self.rows])
+            ), signed=True))
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(a, b):
+        """估计两个签名对应集合的 Jaccard 相似度"""
+        if not a or not b:
+            return 0.0
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def score(signature_a, signature_b, tags_a, tags_b):
+    """
+    计算两篇文章的相关度
+    :param signature_a: 文章A的 MinHash 签名
+    :param signature_b: 文章B的 MinHash 签名
+    :param tags_a: 文章A的标签集合
+    :param tags_b: 文章B的标签集合
+    :return: 0 到 1 之间的相关度
+    """
+    return (
+        TEXT_WEIGHT * MinHasher.similarity(signature_a, signature_b)
+        + TAG_WEIGHT * jaccard(set(tags_a), set(tags_b))
+    )
@@ -0,0 +1,348 @@
+"""
+Markdown 渲染：将文章内容转换为 HTML 并生成目录
+
+支持 ATX 标题、段落、强调、删除线、行内代码、围栏代码块、缩进代码块、引用、
+有序和无序列表（可嵌套）、表格、分隔线、链接、图片和尖括号自动链接。
+
+输出是安全的 HTML：内容中的原始 HTML 一律转义，链接和图片只允许 http、https、mailto
+和相对地址，因此渲染结果可以直接插入页面而不需要再做过滤。
+"""
+import hashlib
+import re
+from html import escape, unescape
+
+# 渲染规则变化时递增，所有文章的内容哈希随之变化，由 render_posts 命令重新渲染
+RENDERER_VERSION = 2
+
+SAFE_URL_SCHEMES = {'http', 'https', 'mailto'}
+
+FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*([\w+#.-]*)[^`]*$')
+HEADING = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+RULE = re.compile(r'^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$')
+QUOTE = re.compile(r'^ {0,3}> ?(.*)$')
+LIST_ITEM = re.compile(r'^( {0,3})([-*+]|\d{1,9}[.)])(?:[ \t]+(.*))?$')
+INDENTED_CODE = re.compile(r'^(?: {4}|\t)(.*)$')
+TABLE_DELIMITER = re.compile(r'^ {0,3}\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+
+PLACEHOLDER = re.compile(r'\x00(\d+)\x00')
+CODE_SPAN = re.compile(r'(`+)(.+?)(?<!`)\1(?!`)', re.S)
+ESCAPED_CHAR = re.compile(r'\\([\\`*_{}\[\]()#+\-.!|~>])')
+# 链接地址允许一层配对的括号，如 https://example.com/a_(b)
+LINK_URL = r'((?:[^\s()]|\([^\s()]*\))+)'
+IMAGE = re.compile(r'!\[([^\]]*)\]\(\s*' + LINK_URL + r'(?:\s+&quot;(.*?)&quot;)?\s*\)')
+LINK = re.compile(r'\[([^\]]+)\]\(\s*' + LINK_URL + r'(?:\s+&quot;(.*?)&quot;)?\s*\)')
+AUTOLINK = re.compile(r'&lt;((?:https?|mailto):[^\s<>]+?)&gt;')
+STRONG = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+EMPHASIS = re.compile(r'\*(?=[^\s*])(.+?)(?<=[^\s*])\*|(?<!\w)_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)')
+STRIKETHROUGH = re.compile(r'~~(?=\S)(.+?)(?<=\S)~~')
+HARD_BREAK = re.compile(r'(?: {2,}|\\)\n')
+TAG = re.compile(r'<[^>]*>')
+
+
+def content_hash(content):
+    """内容和渲染器版本的哈希，用于判断渲染结果是否需要更新"""
+    return hashlib.sha256(f'{RENDERER_VERSION}\n{content}'.encode('utf-8')).hexdigest()
+
+
+def is_safe_url(url):
+    """只允许白名单中的协议和相对地址（浏览器会忽略地址中的空白和控制字符）"""
+    normalized = re.sub(r'[\x00-\x20\x7f]+', '', url).lower()
+    match = re.match(r'([a-z][a-z0-9+.-]*):', normalized)
+    return match is None or match.group(1) in SAFE_URL_SCHEMES
+
+
+def heading_slug(text):
+    """根据标题文本生成锚点，保留中文等 Unicode 字符"""
+    return re.sub(r'[^\w]+', '-', text.lower()).strip('-_') or 'section'
+
+
+def split_row(line):
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return [cell.strip() for cell in re.split(r'(?<!\\)\|', line)]
+
+
+def dedent(line, width):
+    """去掉行首最多 width 个空格"""
+    stripped = line.lstrip(' ')
+    return line[min(width, len(line) - len(stripped)):]
+
+
+class MarkdownRenderer:
+    """
+    单次渲染的状态（目录和已使用的锚点），每篇文章使用新的实例：
+        html, toc = MarkdownRenderer().render(content)
+    """
+
+    def __init__(self):
+        self.toc = []
+        self.used_ids = {}
+
+    def render(self, content):
+        """
+        :param content: Markdown 文本
+        :return: (HTML, 目录)，目录为 [{'level', 'id', 'title'}]，按标题在文中的顺序排列
+        """
+        content = content.replace('\r\n', '\n').replace('\r', '\n').replace('\x00', '')
+        return self.render_blocks(content.split('\n')), self.toc
+
+    def render_blocks(self, lines, tight=False):
+        """
+        渲染块级元素
+        :param tight: 紧凑列表项中的段落不加 <p>
+        """
+        output = []
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                i += 1
+                continue
+
+            fence = FENCE.match(line)
+            if fence:
+                i = self.code_block(lines, i, fence, output)
+            elif HEADING.match(line):
+                output.append(self.heading(HEADING.match(line)))
+                i += 1
+            elif RULE.match(line):
+                output.append('<hr>')
+                i += 1
+            elif QUOTE.match(line):
+                i = self.blockquote(lines, i, output)
+            elif LIST_ITEM.match(line):
+                i = self.list_block(lines, i, output)
+            elif INDENTED_CODE.match(line):
+                i = self.indented_code(lines, i, output)
+            elif self.is_table(lines, i):
+                i = self.table(lines, i, output)
+            else:
+                i = self.paragraph(lines, i, output, tight)
+        return '\n'.join(output)
+
+    def starts_block(self, lines, i):
+        """该行是否开始新的块（用于结束段落）"""
+        line = lines[i]
+        return bool(
+            not line.strip() or FENCE.match(line) or HEADING.match(line) or RULE.match(line)
+            or QUOTE.match(line) or LIST_ITEM.match(line) or self.is_table(lines, i)
+        )
+
+    @staticmethod
+    def is_table(lines, i):
+        return (
+            '|' in lines[i] and i + 1 < len(lines) and TABLE_DELIMITER.match(lines[i + 1])
+            and '|' in lines[i + 1]
+        )
+
+    def code_block(self, lines, i, fence, output):
+        marker, language = fence.group(1), fence.group(2)
+        code = []
+        i += 1
+        while i < len(lines):
+            if re.match(rf' {{0,3}}{re.escape(marker[0])}{{{len(marker)},}}[ \t]*$', lines[i]):
+                i += 1
+                break
+            code.append(lines[i])
+            i += 1
+        attrs = f' class="language-{escape(language)}"' if language else ''
+        output.append(f'<pre><code{attrs}>{escape(chr(10).join(code))}</code></pre>')
+        return i
+
+    def indented_code(self, lines, i, output):
+        code = []
+        while i < len(lines) and (INDENTED_CODE.match(lines[i]) or not lines[i].strip()):
+            code.append(INDENTED_CODE.match(lines[i]).group(1) if lines[i].strip() else '')
+            i += 1
+        while code and not code[-1]:
+            code.pop()
+        output.append(f'<pre><code>{escape(chr(10).join(code))}</code></pre>')
+        return i
+
+    def heading(self, match):
+        level = len(match.group(1))
+        html = self.render_inline(match.group(2) or '')
+        title = unescape(TAG.sub('', html)).strip()
+
+        # 重复的标题添加数字后缀
+        slug = heading_slug(title)
+        count = self.used_ids.get(slug, 0)
+        self.used_ids[slug] = count + 1
+        anchor = f'{slug}-{count}' if count else slug
+
+        self.toc.append({'level': level, 'id': anchor, 'title': title})
+        return (
+            f'<h{level} id="{escape(anchor)}">{html}'
+            f'<a class="heading-anchor" href="#{escape(anchor)}" aria-hidden="true">#</a></h{level}>'
+        )
+
+    def blockquote(self, lines, i, output):
+        quoted = []
+        while i < len(lines):
+            match = QUOTE.match(lines[i])
+            if match:
+                quoted.append(match.group(1))
+            elif lines[i].strip() and quoted and quoted[-1].strip() and not self.starts_block(lines, i):
+                # 段落的延续行可以省略 >
+                quoted.append(lines[i])
+            else:
+                break
+            i += 1
+        output.append(f'<blockquote>\n{self.render_blocks(quoted)}\n</blockquote>')
+        return i
+
+    def list_block(self, lines, i, output):
+        first = LIST_ITEM.match(lines[i])
+        ordered = first.group(2)[0].isdigit()
+        items = []
+        loose = False
+        width = 0
+        while i < len(lines):
+            line = lines[i]
+            match = LIST_ITEM.match(line)
+            # 缩进达到上一项内容起始位置的列表项属于嵌套列表
+            if (match and match.group(2)[0].isdigit() == ordered and (not items or len(match.group(1)) < width)
+                    and not RULE.match(line)):
+                content = match.group(3) or ''
+                width = len(match.group(1)) + len(match.group(2)) + 1
+                items.append([content])
+            elif not line.strip():
+                # 空行后仍有缩进内容或同类列表项时列表继续，此时为宽松列表
+                j = i + 1
+                while j < len(lines) and not lines[j].strip():
+                    j += 1
+                following = LIST_ITEM.match(lines[j]) if j < len(lines) else None
+                if j < len(lines) and (
+                    lines[j].startswith(' ' * width)
+                    or (following and following.group(2)[0].isdigit() == ordered)
+                ):
+                    loose = True
+                    items[-1].append('')
+                else:
+                    break
+            elif line.startswith(' ' * min(width, 2)):
+                items[-1].append(dedent(line, width))
+            elif items[-1][-1].strip() and not self.starts_block(lines, i):
+                items[-1].append(line)
+            else:
+                break
+            i += 1
+
+        tag = 'ol' if ordered else 'ul'
+        start = int(first.group(2)[:-1]) if ordered else 1
+        attrs = f' start="{start}"' if start != 1 else ''
+        rendered = [f'<li>{self.render_blocks(item, tight=not loose)}</li>' for item in items]
+        output.append(f'<{tag}{attrs}>\n' + '\n'.join(rendered) + f'\n</{tag}>')
+        return i
+
+    def table(self, lines, i, output):
+        header = split_row(lines[i])
+        aligns = []
+        for cell in split_row(lines[i + 1]):
+            if cell.startswith(':') and cell.endswith(':'):
+                aligns.append('center')
+            elif cell.endswith(':'):
+                aligns.append('right')
+            elif cell.startswith(':'):
+                aligns.append('left')
+            else:
+                aligns.append(None)
+        i += 2
+
+        rows = []
+        while i < len(lines) and lines[i].strip() and '|' in lines[i]:
+            rows.append(split_row(lines[i]))
+            i += 1
+
+        def cells(row, tag):
+            result = []
+            for index in range(len(header)):
+                align = aligns[index] if index < len(aligns) else None
+                attrs = f' style="text-align: {align}"' if align else ''
+                text = row[index] if index < len(row) else ''
+                result.append(f'<{tag}{attrs}>{self.render_inline(text)}</{tag}>')
+            return '<tr>' + ''.join(result) + '</tr>'
+
+        body = ''.join(cells(row, 'td') for row in rows)
+        output.append(
+            f'<table>\n<thead>{cells(header, "th")}</thead>\n'
+            + (f'<tbody>{body}</tbody>\n' if body else '') + '</table>'
+        )
+        return i
+
+    def paragraph(self, lines, i, output, tight):
+        text = [lines[i].strip()]
+        i += 1
+        while i < len(lines) and not self.starts_block(lines, i):
+            text.append(lines[i].lstrip())
+            i += 1
+        # 保留行尾空格，用于识别硬换行
+        html = self.render_inline('\n'.join(text).rstrip())
+        output.append(html if tight else f'<p>{html}</p>')
+        return i
+
+    def render_inline(self, text):
+        """渲染行内元素，代码片段、链接地址等先替换为占位符，避免被后续规则修改"""
+        stash = []
+        # 各占位符对应的原文，链接地址、标题和图片说明按原文处理
+        sources = []
+
+        def keep(html, source=''):
+            stash.append(html)
+            sources.append(source)
+            return f'\x00{len(stash) - 1}\x00'
+
+        def plain(value):
+            """将已转义、含占位符的文本还原为原文"""
+            return PLACEHOLDER.sub(lambda m: sources[int(m.group(1))], unescape(value or ''))
+
+        text = CODE_SPAN.sub(lambda m: keep(f'<code>{escape(m.group(2).strip())}</code>', m.group(0)), text)
+        text = ESCAPED_CHAR.sub(lambda m: keep(escape(m.group(1)), m.group(1)), text)
+        text = escape(text)
+
+        def image(match):
+            alt, url, title = escape(plain(match.group(1))), plain(match.group(2)), escape(plain(match.group(3)))
+            if not is_safe_url(url):
+                return alt
+            title_attr = f' title="{title}"' if title else ''
+            return keep(f'<img src="{escape(url)}" alt="{alt}"{title_attr} loading="lazy">')
+
+        def link(match):
+            label, url, title = match.group(1), plain(match.group(2)), escape(plain(match.group(3)))
+            if not is_safe_url(url):
+                return label
+            return keep(self.link_tag(url, title)) + label + keep('</a>')
+
+        def autolink(match):
+            url = plain(match.group(1))
+            label = url[len('mailto:'):] if url.startswith('mailto:') else url
+            return keep(self.link_tag(url)) + escape(label) + keep('</a>')
+
+        text = IMAGE.sub(image, text)
+        text = LINK.sub(link, text)
+        text = AUTOLINK.sub(autolink, text)
+        text = STRONG.sub(lambda m: f'<strong>{m.group(2)}</strong>', text)
+        text = EMPHASIS.sub(lambda m: f'<em>{m.group(1) or m.group(2)}</em>', text)
+        text = STRIKETHROUGH.sub(lambda m: f'<del>{m.group(1)}</del>', text)
+        text = HARD_BREAK.sub('<br>\n', text)
+        return PLACEHOLDER.sub(lambda m: stash[int(m.group(1))], text)
+
+    @staticmethod
+    def link_tag(url, title=None):
+        title_attr = f' title="{title}"' if title else ''
+        # 站外链接不传递权重，也不允许目标页面访问 window.opener
+        rel = ' rel="nofollow noopener"' if re.match(r'https?://', url, re.I) else ''
+        return f'<a href="{escape(url)}"{title_attr}{rel}>'
+
+
+def render_markdown(content):
+    """
+    渲染文章内容
+    :param content: Markdown 文本
+    :return: {'content_html', 'toc', 'content_hash'}，可直接赋值给 Post 的同名字段
+    """
+    html, toc = MarkdownRenderer().render(content)
+    return {'content_html': html, 'toc': toc, 'content_hash': content_hash(content)}
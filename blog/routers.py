@@ -0,0 +1,25 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class ReadReplicaRouter:
+    """
+    读写分离：读查询使用只读连接 replica，写操作和迁移使用 default
+    - default 处于事务中时读查询也使用 default，保证事务内能读到尚未提交的修改
+    - replica 与 default 是同一个数据库文件，WAL 模式下读到的总是已提交的最新数据
+    """
+    replica = 'replica'
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self.replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 两个别名指向同一个数据库
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,379 @@
+import html
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .utils import transliterate
+
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fff]+|[^\W_]+')
+# 拼音音节（声母 + 韵母，ü 写作 v，与 lazy_pinyin 的输出一致），用于切分连写的拼音搜索词
+PINYIN_SYLLABLE_PATTERN = re.compile(
+    r'(?:zh|ch|sh|[bpmfdtnlgkhjqxrzcsyw])?'
+    r'(?:iang|iong|uang|ang|eng|ing|ong|ian|iao|uai|uan|van|ai|ei|ao|ou|an|en|er|in|un|vn'
+    r'|ia|ie|iu|ua|uo|ui|ue|ve|a|o|e|i|u|v)'
+)
+# 按拼音切分的搜索词的最大长度，更长的词不作为拼音处理
+MAX_PINYIN_LENGTH = 60
+
+# 各字段在相关度排序中的权重
+FIELD_WEIGHTS = {
+    'title': 10.0,
+    'tags': 5.0,
+    'summary': 3.0,
+    'content': 1.0,
+}
+
+
+def tokenize(text, with_pinyin=True):
+    """
+    将文本切分为索引词
+    英文和数字按单词切分并转为小写；中文按相邻两字（bigram）切分，
+    并附加对应的拼音，使拼音也能检索到中文内容
+    :param text: 原始文本
+    :param with_pinyin: 是否附加中文的拼音词
+    :return: 索引词列表
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        chunk = match.group()
+        if not CJK_PATTERN.fullmatch(chunk):
+            tokens.append(chunk)
+            continue
+
+        if len(chunk) == 1:
+            grams = [chunk]
+        else:
+            grams = [chunk[i:i + 2] for i in range(len(chunk) - 1)]
+        tokens.extend(grams)
+
+        if with_pinyin:
+            pinyin = transliterate(chunk)
+            if len(pinyin) == 1:
+                tokens.extend(pinyin)
+            else:
+                tokens.extend(pinyin[i] + pinyin[i + 1] for i in range(len(pinyin) - 1))
+    return tokens
+
+
+@lru_cache(maxsize=1024)
+def split_pinyin(word):
+    """
+    将连写的拼音切分为音节，优先使用较长的音节，无法切分时回退
+    各后缀的结果会被缓存，回退不会重复切分
+    :param word: 小写的拼音，如 shujuku
+    :return: 音节元组，如 ('shu', 'ju', 'ku')；不是拼音时返回 None
+    """
+    if not word:
+        return ()
+    # 最长的音节为 6 个字母，如 zhuang
+    for end in range(min(len(word), 6), 0, -1):
+        if PINYIN_SYLLABLE_PATTERN.fullmatch(word, 0, end):
+            rest = split_pinyin(word[end:])
+            if rest is not None:
+                return (word[:end],) + rest
+    return None
+
+
+def pinyin_phrase(token):
+    """
+    索引中的拼音为相邻两个音节连写的词，如 数据库 索引为 shuju juku；
+    三个及以上音节的拼音搜索词切分为同样的词，作为短语检索
+    :param token: 搜索词中的非中文词
+    :return: 连写的相邻音节列表，不是三个及以上音节的拼音时返回 None
+    """
+    if len(token) > MAX_PINYIN_LENGTH:
+        return None
+    syllables = split_pinyin(token)
+    if not syllables or len(syllables) < 3:
+        return None
+    return [syllables[i] + syllables[i + 1] for i in range(len(syllables) - 1)]
+
+
+def build_document(post):
+    """
+    生成文章各字段的索引文本
+    :param post: 文章实例
+    :return: 字段名到索引文本的映射
+    """
+    return {
+        'title': ' '.join(tokenize(post.title)),
+        'tags': ' '.join(tokenize(' '.join(post.tag_list))),
+        'summary': ' '.join(tokenize(post.summary)),
+        'content': ' '.join(tokenize(post.content)),
+    }
+
+
+def highlight(text, query, length=160):
+    """
+    截取包含搜索词的片段并用 <mark> 标记命中位置
+    :param text: 原始文本
+    :param query: 搜索词
+    :param length: 片段长度
+    :return: 经过 HTML 转义的片段
+    """
+    terms = sorted(set(query.split()), key=len, reverse=True)
+    if not terms or not text:
+        return html.escape(text[:length])
+
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - length // 4) if match else 0
+    fragment = text[start:start + length]
+
+    parts = []
+    position = 0
+    for hit in pattern.finditer(fragment):
+        parts.append(html.escape(fragment[position:hit.start()]))
+        parts.append(f'<mark>{html.escape(hit.group())}</mark>')
+        position = hit.end()
+    parts.append(html.escape(fragment[position:]))
+
+    snippet = ''.join(parts)
+    if start > 0:
+        snippet = '...' + snippet
+    if start + length < len(text):
+        snippet += '...'
+    return snippet
+
+
+class SearchRank(Func):
+    """文章的相关度，由搜索后端生成引用当前行文章ID的相关子查询"""
+    output_field = FloatField()
+
+    def __init__(self, backend, query):
+        super().__init__(F('pk'))
+        self.backend = backend
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # 文章ID列按查询中的实际别名编译，作为子查询使用时同样有效
+        post_id, params = compiler.compile(self.source_expressions[0])
+        sql, rank_params = self.backend.rank_sql(self.query, post_id)
+        return sql, [*rank_params, *params]
+
+
+class BaseSearchBackend:
+    """搜索后端基类"""
+
+    def index_post(self, post):
+        """写入或更新文章的索引"""
+        raise NotImplementedError
+
+    def remove_post(self, post_id):
+        """删除文章的索引"""
+        raise NotImplementedError
+
+    def clear(self):
+        """清空索引"""
+        raise NotImplementedError
+
+    def match_sql(self, query):
+        """
+        生成匹配文章ID的子查询
+        :param query: 搜索词
+        :return: (SQL, 参数)，搜索词中没有可检索的词时返回 None
+        """
+        raise NotImplementedError
+
+    def rank_sql(self, query, post_id):
+        """
+        生成单篇文章相关度的子查询
+        :param query: 搜索词
+        :param post_id: 外层查询中文章ID列的 SQL
+        :return: (SQL, 参数)
+        """
+        raise NotImplementedError
+
+    def rebuild(self, queryset, batch_size=500):
+        """
+        重建索引
+        :param queryset: 需要索引的文章查询集
+        :param batch_size: 每批读取的文章数
+        :return: 已索引的文章数
+        """
+        self.clear()
+        count = 0
+        for post in queryset.with_tags().iterator(chunk_size=batch_size):
+            self.index_post(post)
+            count += 1
+        return count
+
+    def search(self, queryset, query):
+        """
+        筛选匹配的文章并注解相关度 search_rank
+        索引检索作为子查询与查询集的可见性等条件在同一条 SQL 中执行，只对符合条件的文章计算相关度
+        :param queryset: 文章查询集
+        :param query: 搜索词
+        :return: 查询集
+        """
+        match = self.match_sql(query)
+        if match is None:
+            # 保留 search_rank 注解，以便按相关度排序
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+        return queryset.filter(pk__in=RawSQL(*match)).annotate(search_rank=SearchRank(self, query))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """基于 SQLite FTS5 的搜索后端，rowid 即文章ID"""
+
+    table = 'blog_post_fts'
+
+    def index_post(self, post):
+        document = build_document(post)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, tags, summary, content) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [post.pk, document['title'], document['tags'],
+                 document['summary'], document['content']]
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [post_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def build_match(self, query):
+        terms = []
+        for token in tokenize(query, with_pinyin=False):
+            term = '"%s"' % token.replace('"', '""')
+            # 单个汉字只能匹配以其开头的二元词
+            if CJK_PATTERN.fullmatch(token) and len(token) == 1:
+                term += '*'
+            elif phrase := pinyin_phrase(token):
+                term = '(%s OR "%s")' % (term, ' '.join(phrase))
+            terms.append(term)
+        return ' AND '.join(terms)
+
+    def match_sql(self, query):
+        match = self.build_match(query)
+        if not match:
+            return None
+        return f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match]
+
+    def rank_sql(self, query, post_id):
+        # 在相关子查询中直接 MATCH 会对每一行重新检索整个索引；
+        # 物化的 CTE 只检索一次，之后按 rowid 读取各行的相关度
+        materialized = 'MATERIALIZED ' if connection.Database.sqlite_version_info >= (3, 35) else ''
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in ('title', 'tags', 'summary', 'content'))
+        return (
+            f'(WITH ranks AS {materialized}(SELECT rowid, -bm25({self.table}, {weights}) AS rank '
+            f'FROM {self.table} WHERE {self.table} MATCH %s) '
+            f'SELECT rank FROM ranks WHERE rowid = {post_id})',
+            [self.build_match(query)]
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """基于 PostgreSQL tsvector 和 GIN 索引的搜索后端"""
+
+    table = 'blog_post_search'
+    weight_labels = {'title': 'A', 'tags': 'B', 'summary': 'C', 'content': 'D'}
+
+    def index_post(self, post):
+        document = build_document(post)
+        vector = ' || '.join(
+            f"setweight(to_tsvector('simple', %s), '{label}')"
+            for label in self.weight_labels.values()
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (post_id, document) VALUES (%s, {vector}) '
+                'ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document',
+                [post.pk] + [document[field] for field in self.weight_labels]
+            )
+
+    def remove_post(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE post_id = %s', [post_id])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+
+    def build_tsquery(self, query):
+        # tsquery 中的特殊字符已被分词过程去除
+        terms = []
+        for token in tokenize(query, with_pinyin=False):
+            term = f"'{token}'"
+            if CJK_PATTERN.fullmatch(token) and len(token) == 1:
+                term += ':*'
+            elif phrase := pinyin_phrase(token):
+                term = '(%s | %s)' % (term, ' <-> '.join(f"'{gram}'" for gram in phrase))
+            terms.append(term)
+        return ' & '.join(terms)
+
+    def match_sql(self, query):
+        tsquery = self.build_tsquery(query)
+        if not tsquery:
+            return None
+        return f"SELECT post_id FROM {self.table} WHERE document @@ to_tsquery('simple', %s)", [tsquery]
+
+    def rank_sql(self, query, post_id):
+        # ts_rank 的权重顺序为 D, C, B, A
+        weights = '{%s}' % ', '.join(
+            str(FIELD_WEIGHTS[field] / FIELD_WEIGHTS['title'])
+            for field in reversed(list(self.weight_labels))
+        )
+        return (
+            f"(SELECT ts_rank(%s::float4[], document, to_tsquery('simple', %s)) "
+            f'FROM {self.table} WHERE post_id = {post_id})',
+            [weights, self.build_tsquery(query)]
+        )
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """不依赖全文索引的后备实现，适用于其他数据库"""
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, queryset, batch_size=500):
+        return 0
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(summary__icontains=query)
+        ).annotate(
+            search_rank=Case(
+                When(title__icontains=query, then=Value(FIELD_WEIGHTS['title'])),
+                When(summary__icontains=query, then=Value(FIELD_WEIGHTS['summary'])),
+                default=Value(FIELD_WEIGHTS['content']),
+                output_field=FloatField()
+            )
+        )
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    获取搜索后端
+    优先使用 settings.BLOG_SEARCH_BACKEND，否则按数据库类型选择
+    """
+    backend_path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
@@ -1,40 +1,99 @@
 from rest_framework import serializers
-from .models import Post
+from .models import Post, Tag
+from .utils import TagManager
+from .search import highlight
+from .metrics import timer
 from django.contrib.auth.models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """将序列化耗时计入当前请求的指标（见 metrics.py）"""
+    @property
+    def data(self):
+        with timer('serialize_time'):
+            return super().data
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     posts_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'is_staff', 'posts_count']
+        # 管理员权限只能在后台设置，注册等接口不能写入
+        read_only_fields = ['is_staff']
+        list_serializer_class = TimedListSerializer
         extra_kwargs = {
             'password': {'write_only': True},
             'email': {'required': True}
         }
 
     def get_posts_count(self, obj):
-        return obj.posts.count()
+        # 列表查询会预先注解文章数（见 PostQuerySet.with_author）
+        posts_count = getattr(obj, 'posts_count', None)
+        if posts_count is None:
+            posts_count = obj.posts.count()
+        return posts_count
 
     def validate_email(self, value):
         if not value:
             raise serializers.ValidationError("邮箱地址不能为空")
         return value.lower()
 
-class PostSerializer(serializers.ModelSerializer):
+class RegisterSerializer(UserSerializer):
+    """注册序列化器，创建用户时只进行一次密码哈希和一次写入"""
+    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['password']
+
+    def create(self, validated_data):
+        return User.objects.create_user(**validated_data)
+
+class DynamicFieldsMixin:
+    """
+    支持稀疏字段集：
+    - 通过 fields 参数只输出指定的字段
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+class PostSerializer(TimedSerializerMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     slug = serializers.SlugField(required=False)
+    tags = serializers.CharField(required=False, allow_blank=True, max_length=200)
     tag_list = serializers.ListField(read_only=True)
-    reading_time = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Post
         fields = [
-            'id', 'title', 'slug', 'content', 'summary', 
+            'id', 'title', 'slug', 'content', 'content_html', 'toc', 'summary', 
             'author', 'created_at', 'updated_at', 'published', 
-            'featured_image', 'tags', 'tag_list', 'reading_time'
+            'featured_image', 'tags', 'tag_list', 'word_count', 'reading_time', 'view_count'
+        ]
+        read_only_fields = [
+            'content_html', 'toc', 'created_at', 'updated_at', 'word_count', 'reading_time', 'view_count'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        list_serializer_class = TimedListSerializer
+
+    def to_representation(self, instance):
+        # 将查询集上注解的作者文章数传递给嵌套的作者序列化器
+        author_posts_count = getattr(instance, 'author_posts_count', None)
+        if author_posts_count is not None:
+            instance.author.posts_count = author_posts_count
+        data = super().to_representation(instance)
+
+        # 搜索时附加高亮片段
+        search_query = self.context.get('search_query')
+        if search_query:
+            data['snippet'] = highlight(instance.content or instance.summary, search_query)
+        return data
 
     def validate_title(self, value):
         if len(value) < 5:
@@ -46,14 +105,23 @@ class PostSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("文章内容不能少于100个字符")
         return value
 
+    def validate_tags(self, value):
+        max_length = Tag._meta.get_field('name').max_length
+        for tag in TagManager.parse_tags(value):
+            if len(tag) > max_length:
+                raise serializers.ValidationError(f"单个标签长度不能超过{max_length}个字符")
+        return value
+
     def validate_summary(self, value):
         if value and len(value) > 500:
             raise serializers.ValidationError("摘要长度不能超过500个字符")
         return value
 
-    def create(self, validated_data):
-        # 如果没有提供摘要，自动生成
-        if not validated_data.get('summary'):
-            content = validated_data.get('content', '')
-            validated_data['summary'] = content[:200] + '...' if len(content) > 200 else content
-        return super().create(validated_data) 
\ No newline at end of file
+class PostListSerializer(PostSerializer):
+    """文章列表序列化器，不包含完整内容、渲染后的内容和目录"""
+
+    class Meta(PostSerializer.Meta):
+        fields = [
+            field for field in PostSerializer.Meta.fields
+            if field not in ('content', 'content_html', 'toc')
+        ]
@@ -0,0 +1,94 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cache import bump_generation
+from .feeds import invalidate_feeds
+from .models import Post, PostTag, RelatedPost, Tag, TagStat
+from .search import get_search_backend
+
+# 批量写入（bulk_create / bulk_update）不会触发 post_save，由调用方在写入后发送
+# 参数：posts 为已写入的文章列表，标签可通过 tag_list 读取
+posts_bulk_saved = Signal()
+
+@receiver(posts_bulk_saved, sender=Post)
+def index_bulk_saved_posts(sender, posts, **kwargs):
+    """批量写入后更新全文索引，事务提交后按批更新相关文章"""
+    backend = get_search_backend()
+    for post in posts:
+        backend.index_post(post)
+    post_ids = [post.pk for post in posts]
+    transaction.on_commit(lambda: RelatedPost.objects.index_posts(post_ids))
+
+@receiver(pre_delete, sender=Post)
+def decrement_tag_stats(sender, instance, **kwargs):
+    """删除已发布文章前减少其标签的文章数（关联行会被级联删除）"""
+    TagStat.objects.apply_changes(removed=instance.get_published_tag_ids())
+
+@receiver(pre_delete, sender=Post)
+def refill_related_posts(sender, instance, **kwargs):
+    """删除文章后（事务提交后）补足原本列出该文章的其他文章的相关列表"""
+    affected = list(RelatedPost.objects.filter(related_id=instance.pk).values_list('post_id', flat=True))
+    if affected:
+        transaction.on_commit(lambda: RelatedPost.objects.refill(affected))
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search_index(sender, instance, **kwargs):
+    """文章删除后同步删除全文索引"""
+    get_search_backend().remove_post(instance.pk)
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(posts_bulk_saved, sender=Post)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=PostTag)
+@receiver(post_delete, sender=PostTag)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_response_cache(sender, update_fields=None, **kwargs):
+    """
+    数据变更后使响应缓存失效
+    立即递增一次以便当前请求读到最新数据，提交后再递增一次，
+    丢弃事务提交前被其他请求缓存的旧数据
+    """
+    # 登录只更新 last_login，不影响接口输出
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(posts_bulk_saved, sender=Post)
+def invalidate_feed_cache(sender, **kwargs):
+    """
+    文章发布、修改或删除后使订阅和站点地图失效，下次请求时重新生成
+    与响应缓存相同，提交后再失效一次
+    """
+    invalidate_feeds()
+    transaction.on_commit(invalidate_feeds)
+
+def invalidate_user_tokens(user_id):
+    """
+    使用户令牌的认证缓存在所有进程中失效
+    与响应缓存相同，提交后再失效一次，丢弃事务提交前被其他请求缓存的旧结果
+    """
+    token_cache.invalidate_user(user_id)
+    transaction.on_commit(lambda: token_cache.invalidate_user(user_id))
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """令牌删除（如登出）后立即使认证缓存失效"""
+    invalidate_user_tokens(instance.user_id)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """用户修改（如修改密码、权限变更）或删除后使其令牌的认证缓存失效"""
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate_user_tokens(instance.pk)
@@ -0,0 +1,220 @@
+"""
+静态快照：将已发布文章的只读接口预先渲染为 JSON 文件，流量高峰时由静态文件服务器或 CDN 直接提供
+
+目录结构（链接以 base_url 为前缀）：
+    posts/<slug>.json               文章详情，与 GET /api/posts/<slug>/ 相同
+    posts/page/<n>.json             文章列表，与 GET /api/posts/ 的结果相同，next / previous 指向相邻的页面文件
+    tags.json                       标签列表，与 GET /api/posts/tags/ 相同
+    tags/<标签名>/page/<n>.json     标签下的文章列表，标签名经过 URL 编码（. 和 .. 编码为 %2E 和 %2E%2E）
+    manifest.json                   各文章详情的内容哈希及已生成的页面，用于增量更新
+"""
+import hashlib
+import json
+import os
+from itertools import groupby
+from pathlib import Path
+from urllib.parse import quote
+
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from .models import Post, PostTag, TagStat
+from .serializers import PostSerializer
+
+MANIFEST = 'manifest.json'
+# 只出现在文章详情中的字段，其余字段与列表项相同
+DETAIL_ONLY_FIELDS = ('content', 'content_html', 'toc')
+
+
+def write_file(path, content):
+    """
+    写入文件，内容不变时不重写（保留修改时间，便于 CDN 和 rsync 增量同步）
+    先写临时文件再替换，读取方不会读到写了一半的文件
+    :return: 是否写入
+    """
+    if path.exists() and path.read_bytes() == content:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(path.name + '.tmp')
+    temp.write_bytes(content)
+    os.replace(temp, path)
+    return True
+
+
+def tag_directory(name):
+    """
+    标签页所在的目录名：URL 编码后的标签名
+    . 和 .. 编码后不变，会指向上级目录，改为 %2E 和 %2E%2E
+    """
+    quoted = quote(name, safe='')
+    if quoted in ('.', '..'):
+        quoted = quoted.replace('.', '%2E')
+    return quoted
+
+
+def get_posts(ids):
+    """按 ids 的顺序读取已发布的文章，查询方式与接口相同"""
+    posts = Post.objects.with_author().with_tags().filter(published=True, pk__in=ids)
+    by_id = {post.pk: post for post in posts}
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def run_job(root, job):
+    """
+    执行一项快照任务（可在工作进程中执行）：序列化一组文章，
+    写入内容哈希与上次快照不同的详情文件，并返回列表项，由主进程组合为列表页
+    详情中的渲染内容、作者文章数、浏览次数等变化时不会更新 updated_at，因此按序列化结果判断是否变化
+    :param root: 输出目录
+    :param job: (文章ID列表, {slug: 上次快照的内容哈希})
+    :return: [(文章ID, slug, 内容哈希, 列表项, 是否重写)]
+    """
+    ids, previous = job
+    renderer = JSONRenderer()
+    results = []
+    for item in PostSerializer(get_posts(ids), many=True).data:
+        content = renderer.render(item)
+        digest = hashlib.sha256(content).hexdigest()
+        written = digest != previous.get(item['slug'])
+        if written:
+            write_file(root / 'posts' / f"{item['slug']}.json", content)
+        list_item = {key: value for key, value in item.items() if key not in DETAIL_ONLY_FIELDS}
+        results.append((item['id'], item['slug'], digest, list_item, written))
+    return results
+
+
+class SnapshotExporter:
+    """
+    生成静态快照：
+    - 文章详情只重写内容哈希与上次快照不同的文章，已删除或取消发布的文章删除其文件
+    - 列表页和标签页每次由各文章的列表项重新组合，内容不变的文件不重写
+    """
+    # 每项任务包含的文章数
+    chunk_size = 100
+
+    def __init__(self, root, base_url='', page_size=None, full=False):
+        """
+        :param root: 输出目录
+        :param base_url: 翻页链接的前缀，如 https://cdn.example.com/snapshot
+        :param page_size: 每页文章数，默认与接口相同
+        :param full: 忽略上次的快照，重新生成全部文章
+        """
+        self.root = Path(root)
+        self.base_url = base_url.rstrip('/')
+        self.page_size = page_size or api_settings.PAGE_SIZE or 20
+        self.full = full
+        self.stats = {'posts': 0, 'details_written': 0, 'pages': 0, 'pages_written': 0, 'deleted': 0}
+
+    def load_manifest(self):
+        path = self.root / MANIFEST
+        if self.full or not path.exists():
+            return {'posts': {}, 'pages': []}
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def chunks(self, rows, previous):
+        """将 (文章ID, slug) 按 chunk_size 分组为任务，附带各文章上次快照的内容哈希"""
+        jobs = []
+        for start in range(0, len(rows), self.chunk_size):
+            chunk = rows[start:start + self.chunk_size]
+            jobs.append((
+                [pk for pk, _ in chunk],
+                {slug: previous[slug] for _, slug in chunk if slug in previous},
+            ))
+        return jobs
+
+    def get_listings(self, post_ids):
+        """
+        :return: [(目录前缀, 有序的文章ID列表)]，包括全部文章和各标签的文章，顺序与列表接口相同
+        """
+        listings = [('posts', post_ids)]
+        tagged = (
+            PostTag.objects.filter(post__published=True)
+            .order_by('tag__name', '-post__created_at', '-post_id')
+            .values_list('tag__name', 'post_id')
+        )
+        for name, group in groupby(tagged.iterator(), key=lambda row: row[0]):
+            listings.append((f'tags/{tag_directory(name)}', [post_id for _, post_id in group]))
+        return listings
+
+    def write_pages(self, prefix, ids, items):
+        """
+        将有序的文章ID切分为列表页并写入，没有文章时仍生成空的第一页
+        :return: 生成的页面路径
+        """
+        pages = [ids[start:start + self.page_size] for start in range(0, len(ids), self.page_size)] or [[]]
+        renderer = JSONRenderer()
+        paths = []
+        for number, page_ids in enumerate(pages, start=1):
+            data = {
+                'next': f'{self.base_url}/{prefix}/page/{number + 1}.json' if number < len(pages) else None,
+                'previous': f'{self.base_url}/{prefix}/page/{number - 1}.json' if number > 1 else None,
+                'results': [items[pk] for pk in page_ids if pk in items],
+            }
+            path = f'{prefix}/page/{number}.json'
+            self.stats['pages_written'] += write_file(self.root / path, renderer.render(data))
+            paths.append(path)
+        return paths
+
+    def write_tags(self):
+        """写入标签列表，与标签接口不带参数时的结果相同"""
+        from .views import PostViewSet
+
+        tags = TagStat.objects.filter(post_count__gte=1).values(
+            'last_used_at', name=F('tag__name'), count=F('post_count')
+        ).order_by('name')
+        data = [PostViewSet.tag_representation(tag) for tag in tags]
+        write_file(self.root / 'tags.json', JSONRenderer().render(data))
+
+    def remove(self, paths):
+        for path in paths:
+            try:
+                (self.root / path).unlink()
+                self.stats['deleted'] += 1
+            except FileNotFoundError:
+                pass
+
+    def export(self, map_jobs=map):
+        """
+        生成快照
+        :param map_jobs: 执行任务的 map 函数，如 ProcessPoolExecutor.map，函数参数为 (输出目录, 任务)
+        :return: 统计信息
+        """
+        manifest = self.load_manifest()
+        rows = list(
+            Post.objects.filter(published=True)
+            .order_by('-created_at', '-id')
+            .values_list('id', 'slug')
+        )
+        post_ids = [pk for pk, _ in rows]
+        previous = manifest['posts']
+
+        # 详情和列表项在工作进程中生成
+        jobs = self.chunks(rows, previous)
+        items = {}
+        posts = {}
+        for results in map_jobs(run_job, [self.root] * len(jobs), jobs):
+            for pk, slug, digest, item, written in results:
+                items[pk] = item
+                posts[slug] = digest
+                self.stats['details_written'] += written
+
+        pages = []
+        for prefix, ids in self.get_listings(post_ids):
+            pages += self.write_pages(prefix, ids, items)
+        self.write_tags()
+
+        # 删除已删除或取消发布的文章以及不再存在的列表页
+        current = set(pages)
+        self.remove([f'posts/{slug}.json' for slug in previous if slug not in posts])
+        self.remove([path for path in manifest['pages'] if path not in current])
+
+        self.stats['posts'] = len(rows)
+        self.stats['pages'] = len(pages)
+        write_file(self.root / MANIFEST, json.dumps({
+            'generated_at': timezone.now().isoformat(),
+            'page_size': self.page_size,
+            'posts': posts,
+            'pages': sorted(current),
+        }, ensure_ascii=False, indent=2).encode('utf-8'))
+        return self.stats
@@ -0,0 +1,141 @@
+import json
+from functools import wraps
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': NDJSON_CONTENT_TYPE,
+}
+
+
+class NDJSONRenderer(BaseRenderer):
+    """NDJSON 渲染器，列表每项一行"""
+    media_type = NDJSON_CONTENT_TYPE
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict) and 'results' in data:
+            data = data['results']
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(dumps(row) + '\n' for row in rows).encode('utf-8')
+
+
+def get_stream_format(request):
+    """
+    判断请求是否要求流式输出
+    - ?stream=1 / ?stream=json：流式输出 JSON 数组
+    - ?stream=ndjson 或 Accept: application/x-ndjson：流式输出 NDJSON
+    :return: 'json'、'ndjson' 或 None
+    """
+    stream = request.query_params.get('stream', '').lower()
+    if stream in ('1', 'true', 'json'):
+        return 'json'
+    if stream == 'ndjson' or NDJSON_CONTENT_TYPE in request.META.get('HTTP_ACCEPT', ''):
+        return 'ndjson'
+    return None
+
+
+def is_asgi_request(request):
+    """
+    请求是否由 ASGI 服务器处理
+    ASGI 下 Django 会先把同步迭代器整个读入列表再发送，流式响应需使用异步迭代器
+    """
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def dumps(data):
+    return json.dumps(
+        data,
+        cls=JSONEncoder,
+        ensure_ascii=not api_settings.UNICODE_JSON,
+        separators=(',', ':')
+    )
+
+
+def iter_serialized(queryset, serializer, stream_format, chunk_size=500):
+    """
+    分块读取查询集并逐行序列化
+    每读取一块输出一次，内存占用只与块大小有关
+    :param queryset: 查询集
+    :param serializer: 用于序列化单行的序列化器实例
+    :param stream_format: 'json' 或 'ndjson'
+    :param chunk_size: 每块的行数
+    """
+    if stream_format == 'json':
+        yield '['
+
+    chunk = []
+    first = True
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(dumps(serializer.to_representation(obj)))
+        if len(chunk) >= chunk_size:
+            yield render_chunk(chunk, stream_format, first)
+            chunk = []
+            first = False
+    if chunk:
+        yield render_chunk(chunk, stream_format, first)
+
+    if stream_format == 'json':
+        yield ']'
+
+
+async def aiter_serialized(queryset, serializer, stream_format, chunk_size=500):
+    """iter_serialized 的异步版本，使用 aiterator() 分块读取，ASGI 下逐块发送"""
+    if stream_format == 'json':
+        yield '['
+
+    chunk = []
+    first = True
+    async for obj in queryset.aiterator(chunk_size=chunk_size):
+        chunk.append(dumps(serializer.to_representation(obj)))
+        if len(chunk) >= chunk_size:
+            yield render_chunk(chunk, stream_format, first)
+            chunk = []
+            first = False
+    if chunk:
+        yield render_chunk(chunk, stream_format, first)
+
+    if stream_format == 'json':
+        yield ']'
+
+
+def render_chunk(rows, stream_format, first):
+    if stream_format == 'ndjson':
+        return '\n'.join(rows) + '\n'
+    return ('' if first else ',') + ','.join(rows)
+
+
+def streaming_response(view_method):
+    """
+    为列表视图提供可选的流式输出
+    视图需提供 get_list_queryset() 返回待输出的查询集
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        stream_format = get_stream_format(request)
+        if stream_format is None:
+            response = view_method(self, request, *args, **kwargs)
+        else:
+            iterate = aiter_serialized if is_asgi_request(request) else iter_serialized
+            response = StreamingHttpResponse(
+                iterate(
+                    self.get_list_queryset(),
+                    self.get_serializer(),
+                    stream_format,
+                    chunk_size=getattr(self, 'stream_chunk_size', 500)
+                ),
+                content_type=STREAM_FORMATS[stream_format]
+            )
+        patch_vary_headers(response, ['Accept'])
+        return response
+    return wrapper
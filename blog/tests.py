@@ -1,3 +1,1510 @@
-from django.test import TestCase
+import json
+import tempfile
+from base64 import urlsafe_b64encode
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .analytics import view_counter
+from .authentication import TokenCache, token_cache
+from .bulk import PostExporter, PostImporter
+from .cache import get_cache
+from . import rendering
+from .metrics import registry
+from .models import Post, RelatedPost, Tag, TagStat
+from .rendering import render_markdown
+from .routers import ReadReplicaRouter
+from .utils import SlugGenerator, transliterate_segment
+from .views import PostViewSet
+from my_blog_backend.urls import async_post_urls, router
+
+# AsyncPostViewTests 使用的路由：启用文章只读接口的异步视图
+urlpatterns = async_post_urls + [path('api/', include(router.urls))]
+
+
+
+def tearDownModule():
+    # 丢弃测试中缓冲的浏览计数，避免进程退出时写入开发数据库
+    view_counter.clear()
+
+def make_posts(author, count, published=True, prefix='Post'):
+    return [
+        Post.objects.create(
+            title=f'{prefix} {i}',
+            content='x' * 120,
+            author=author,
+            published=published,
+        )
+        for i in range(count)
+    ]
+
+
+class PostListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        self.other = User.objects.create_user('other', 'other@example.com', 'pass')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_independent_of_page_size(self):
+        make_posts(self.staff, 2)
+        make_posts(self.other, 1, prefix='Other')
+        small = self.count_queries('/api/posts/')
+
+        make_posts(self.staff, 20, prefix='More')
+        make_posts(self.other, 10, prefix='Extra')
+        self.assertEqual(self.count_queries('/api/posts/'), small)
+        self.assertEqual(self.count_queries('/api/posts/published/'), small)
+
+    def test_drafts_query_count_independent_of_page_size(self):
+        self.client.force_authenticate(self.staff)
+        make_posts(self.staff, 2, published=False)
+        small = self.count_queries('/api/posts/drafts/')
+
+        make_posts(self.staff, 20, published=False, prefix='Draft')
+        self.assertEqual(self.count_queries('/api/posts/drafts/'), small)
+
+    def test_author_posts_count_includes_all_posts(self):
+        make_posts(self.staff, 3)
+        make_posts(self.staff, 2, published=False, prefix='Draft')
+        response = self.client.get('/api/posts/')
+        self.assertEqual(len(response.data['results']), 3)
+        for item in response.data['results']:
+            self.assertEqual(item['author']['posts_count'], 5)
+
+
+class TagTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass', is_staff=True)
+        self.go = Post.objects.create(title='Go post', content='x' * 120, author=self.author,
+                                      published=True, tags='Go')
+        self.django = Post.objects.create(title='Django post', content='x' * 120, author=self.author,
+                                          published=True, tags='Django, Python')
+        self.both = Post.objects.create(title='Both post', content='x' * 120, author=self.author,
+                                        published=True, tags=['Python', 'Go', 'Go'])
+
+    def slugs(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return {item['slug'] for item in response.data['results']}
+
+    def test_tags_are_normalized(self):
+        self.assertEqual(self.both.tags, 'Go,Python')
+        self.assertEqual(Post.objects.get(pk=self.django.pk).tag_list, ['Django', 'Python'])
+
+    def test_filter_is_exact(self):
+        self.assertEqual(self.slugs('/api/posts/?tags=Go'), {self.go.slug, self.both.slug})
+
+    def test_filter_any_and_all(self):
+        self.assertEqual(self.slugs('/api/posts/?tags=Go,Django'),
+                         {self.go.slug, self.django.slug, self.both.slug})
+        self.assertEqual(self.slugs('/api/posts/?tags=Go,Python&tag_match=all'), {self.both.slug})
+
+    def test_update_replaces_tags(self):
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(f'/api/posts/{self.both.slug}/', {'tags': 'Rust,Go'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['tags'], 'Go,Rust')
+        self.assertEqual(response.data['tag_list'], ['Go', 'Rust'])
+
+    def test_long_tags(self):
+        # 原 Post.tags 字段允许单个标签达到 200 个字符
+        self.client.force_authenticate(self.author)
+        long_tag = '长' * 120
+        response = self.client.patch(f'/api/posts/{self.go.slug}/', {'tags': long_tag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Post.objects.get(pk=self.go.pk).tag_list, [long_tag])
+
+        response = self.client.patch(f'/api/posts/{self.go.slug}/', {'tags': 'x' * 201})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('tags', response.data)
+
+    def tag_counts(self, url='/api/posts/tags/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [(item['name'], item['count']) for item in response.data]
+
+    def stat_counts(self):
+        return dict(TagStat.objects.filter(post_count__gt=0).values_list('tag__name', 'post_count'))
+
+    def test_tags_endpoint(self):
+        Post.objects.create(title='Draft post', content='x' * 120, author=self.author, tags='Secret')
+        self.assertEqual(self.tag_counts(), [('Django', 1), ('Go', 2), ('Python', 2)])
+        self.assertIsNotNone(self.client.get('/api/posts/tags/').data[0]['last_used_at'])
+
+    def test_tags_endpoint_params(self):
+        self.assertEqual(self.tag_counts('/api/posts/tags/?sort=count'),
+                         [('Go', 2), ('Python', 2), ('Django', 1)])
+        self.assertEqual(self.tag_counts('/api/posts/tags/?min_count=2'), [('Go', 2), ('Python', 2)])
+        self.assertEqual(self.tag_counts('/api/posts/tags/?sort=count&top=1'), [('Go', 2)])
+        self.assertEqual(self.client.get('/api/posts/tags/?top=x').status_code, 400)
+
+    def test_tags_endpoint_with_filters(self):
+        self.assertEqual(self.tag_counts('/api/posts/tags/?tags=Django'), [('Django', 1), ('Python', 1)])
+
+    def test_tags_endpoint_reads_stats(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/posts/tags/?sort=count')
+
+    def test_stats_follow_publish_and_tag_changes(self):
+        self.assertEqual(self.stat_counts(), {'Django': 1, 'Go': 2, 'Python': 2})
+
+        self.go.published = False
+        self.go.save()
+        self.assertEqual(self.stat_counts(), {'Django': 1, 'Go': 1, 'Python': 2})
+
+        self.both.tags = 'Rust'
+        self.both.save()
+        self.assertEqual(self.stat_counts(), {'Django': 1, 'Python': 1, 'Rust': 1})
+
+        self.django.delete()
+        self.assertEqual(self.stat_counts(), {'Rust': 1})
+
+    def test_stats_follow_bulk_import(self):
+        lines = [json.dumps({'title': 'Go post', 'slug': self.go.slug, 'content': 'x' * 120,
+                             'published': True, 'tags': ['Rust']})]
+        PostImporter(self.author).run(lines)
+        self.assertEqual(self.stat_counts(), {'Django': 1, 'Go': 1, 'Python': 2, 'Rust': 1})
+
+    def test_rebuild_tag_stats_command(self):
+        TagStat.objects.all().delete()
+        call_command('rebuild_tag_stats', stdout=StringIO())
+        self.assertEqual(self.stat_counts(), {'Django': 1, 'Go': 2, 'Python': 2})
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.title_hit = Post.objects.create(title='Django search guide', content='Body text ' * 20,
+                                             author=self.author, published=True)
+        self.body_hit = Post.objects.create(title='Another post', content='Filler text ' * 20 + 'We mention django once.',
+                                            summary='Plain summary', author=self.author, published=True)
+        self.chinese = Post.objects.create(title='现代化博客开发实践', content='使用 Vue.js 构建博客系统' * 10,
+                                           author=self.author, published=True, tags='后端')
+        self.miss = Post.objects.create(title='Unrelated', content='Nothing here ' * 20,
+                                        author=self.author, published=True)
+
+    def search(self, query):
+        response = self.client.get('/api/posts/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_ranked_by_relevance(self):
+        data = self.search('django')
+        self.assertEqual([item['slug'] for item in data], [self.title_hit.slug, self.body_hit.slug])
+
+    def test_snippet_highlights_match(self):
+        data = self.search('django')
+        self.assertIn('<mark>django</mark>', data[1]['snippet'])
+
+    def test_chinese_and_pinyin(self):
+        self.assertEqual([item['slug'] for item in self.search('博客系统')], [self.chinese.slug])
+        self.assertEqual([item['slug'] for item in self.search('boke')], [self.chinese.slug])
+        self.assertEqual([item['slug'] for item in self.search('后端')], [self.chinese.slug])
+
+    def test_pinyin_of_three_or_more_syllables(self):
+        post = Post.objects.create(title='数据库索引优化', content='Body text ' * 20,
+                                   author=self.author, published=True)
+        for query in ('shujuku', 'shujukusuoyin', 'shuju', '数据库'):
+            self.assertEqual([item['slug'] for item in self.search(query)], [post.slug], query)
+        # 音节需相邻
+        self.assertEqual(self.search('shukusuo'), [])
+        self.assertEqual(self.search('shu' * 100), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.miss.title = 'Now about Django'
+        self.miss.save()
+        self.assertIn(self.miss.slug, [item['slug'] for item in self.search('django')])
+
+        self.title_hit.delete()
+        self.assertNotIn(self.title_hit.slug, [item['slug'] for item in self.search('django')])
+
+    def test_no_matches(self):
+        self.assertEqual(self.search('nothingmatches'), [])
+
+    def test_drafts_do_not_hide_published_matches(self):
+        # 排名更高的草稿不占用匿名用户的搜索结果
+        for i in range(6):
+            Post.objects.create(title=f'Zebra zebra draft {i}', content='zebra ' * 30, author=self.author)
+        post = Post.objects.create(title='Published', content='Filler ' * 20 + 'one zebra',
+                                   author=self.author, published=True)
+        self.assertEqual([item['slug'] for item in self.search('zebra')], [post.slug])
+
+        staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        self.client.force_authenticate(staff)
+        data = self.search('zebra')
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data[-1]['slug'], post.slug)
+
+    def test_search_in_subquery_and_pages(self):
+        # 搜索条件作为标签统计的子查询
+        response = self.client.get('/api/posts/tags/', {'search': '博客'})
+        self.assertEqual([tag['name'] for tag in response.data], ['后端'])
+
+        # 按相关度翻页
+        response = self.client.get('/api/posts/', {'search': 'django', 'page_size': 1})
+        self.assertEqual(response.data['results'][0]['slug'], self.title_hit.slug)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['slug'] for item in response.data['results']], [self.body_hit.slug])
+        self.assertIsNone(response.data['next'])
+
+
+class ContentStatsTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+
+    def test_counts_cjk_characters(self):
+        post = Post.objects.create(title='中文文章', content='博' * 800 + ' hello world',
+                                   author=self.author)
+        self.assertEqual(post.word_count, 802)
+        self.assertEqual(post.reading_time, 2)
+
+    def test_summary_generated_on_update(self):
+        post = Post.objects.create(title='Summary post', content='a' * 300, author=self.author)
+        self.assertEqual(post.summary, 'a' * 200 + '...')
+
+        post.content = 'short content'
+        post.summary = ''
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.summary, 'short content')
+        self.assertEqual(post.word_count, 2)
+
+    def test_backfill_command(self):
+        post = Post.objects.create(title='Backfill post', content='word ' * 400, author=self.author)
+        Post.objects.filter(pk=post.pk).update(word_count=0, reading_time=1, summary='')
+
+        call_command('backfill_post_stats', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.word_count, 400)
+        self.assertEqual(post.reading_time, 2)
+        self.assertTrue(post.summary)
+
+
+class PostFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.post = Post.objects.create(title='Fields post', content='Full body ' * 20,
+                                        author=self.author, published=True)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        return response.data, '"blog_post"."content"' in sql
+
+    def test_list_omits_content(self):
+        data, content_read = self.get('/api/posts/')
+        self.assertNotIn('content', data['results'][0])
+        self.assertIn('summary', data['results'][0])
+        self.assertFalse(content_read)
+
+    def test_detail_keeps_content(self):
+        data, content_read = self.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(data['content'], self.post.content)
+        self.assertTrue(content_read)
+
+    def test_sparse_fieldset(self):
+        data, content_read = self.get('/api/posts/published/', {'fields': 'title,slug'})
+        self.assertEqual(set(data['results'][0]), {'title', 'slug'})
+        self.assertFalse(content_read)
+
+        data, content_read = self.get('/api/posts/', {'fields': 'slug,content'})
+        self.assertEqual(set(data['results'][0]), {'slug', 'content'})
+        self.assertTrue(content_read)
+
+
+class RenderingTests(TestCase):
+    CONTENT = (
+        '# 简介\n\n正文 **加粗** 和 `code`。<script>alert(1)</script>\n\n'
+        '[链接](https://example.com) [危险](javascript:alert) ![图](/a.png)\n\n'
+        '## 简介\n\n- 第一项\n- 第二项\n\n```python\nprint("<x>")\n```\n'
+    )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.post = Post.objects.create(title='Rendered post', content=self.CONTENT,
+                                        author=self.author, published=True)
+
+    def test_render_markdown(self):
+        result = render_markdown(self.CONTENT)
+        html = result['content_html']
+        self.assertIn('<strong>加粗</strong>', html)
+        self.assertIn('<code class="language-python">print(&quot;&lt;x&gt;&quot;)</code>', html)
+        self.assertIn('<li>第一项</li>', html)
+        self.assertIn('<a href="https://example.com" rel="nofollow noopener">链接</a>', html)
+        # 原始 HTML 被转义，不安全的链接只保留文本
+        self.assertNotIn('<script>', html)
+        self.assertNotIn('javascript:', html)
+        self.assertEqual(result['toc'], [
+            {'level': 1, 'id': '简介', 'title': '简介'},
+            {'level': 2, 'id': '简介-1', 'title': '简介'},
+        ])
+        self.assertIn('<h2 id="简介-1">', html)
+
+    def test_links_with_stashed_text_and_parentheses(self):
+        def inline(text):
+            html = render_markdown(text)['content_html']
+            self.assertNotIn('\x00', html)
+            return html
+
+        self.assertEqual(inline('[x](\\(http://a)'), '<p><a href="(http://a">x</a></p>')
+        self.assertIn('title="a`b`c"', inline('![x](http://x "a`b`c")'))
+        self.assertEqual(inline('[a](http://x/(y))'),
+                         '<p><a href="http://x/(y)" rel="nofollow noopener">a</a></p>')
+        self.assertEqual(inline('[x](javascript:alert(1))'), '<p>x</p>')
+        # 转义的字符还原后再检查协议
+        self.assertEqual(inline('[x](javascript:alert\\(1\\))'), '<p>x</p>')
+        self.assertEqual(inline('a\x000\x00b `c`'), '<p>a0b <code>c</code></p>')
+        self.assertEqual(inline('<http://a/\\_b>'),
+                         '<p><a href="http://a/_b" rel="nofollow noopener">http://a/_b</a></p>')
+
+    def test_save_renders_only_changed_content(self):
+        self.assertEqual(self.post.toc[0]['id'], '简介')
+        with mock.patch('blog.models.render_markdown', wraps=render_markdown) as render:
+            self.post.title = 'Renamed post'
+            self.post.save()
+            render.assert_not_called()
+
+            self.post.content = self.CONTENT + '\n### 新章节'
+            self.post.save()
+            render.assert_called_once()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.toc[-1]['title'], '新章节')
+
+    def test_detail_and_list_fields(self):
+        response = self.client.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(response.data['content_html'], self.post.content_html)
+        self.assertEqual(response.data['toc'], self.post.toc)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/posts/')
+        self.assertNotIn('content_html', response.data['results'][0])
+        self.assertNotIn('content_html', ' '.join(query['sql'] for query in ctx.captured_queries))
+
+        response = self.client.get('/api/posts/', {'fields': 'slug,toc'})
+        self.assertEqual(response.data['results'][0], {'slug': self.post.slug, 'toc': self.post.toc})
+
+    def test_render_command_updates_stale_posts(self):
+        etag = self.client.get(f'/api/posts/{self.post.slug}/')['ETag']
+        Post.objects.filter(pk=self.post.pk).update(content_html='', content_hash='')
+        for workers in (1, 2):
+            output = StringIO()
+            call_command('render_posts', workers=workers, stdout=output)
+            self.assertIn('共重新渲染 1 篇文章' if workers == 1 else '共重新渲染 0 篇文章', output.getvalue())
+        self.post.refresh_from_db()
+        self.assertIn('<h1 id="简介">', self.post.content_html)
+
+        # 渲染器升级后全部文章过期
+        with mock.patch('blog.rendering.RENDERER_VERSION', rendering.RENDERER_VERSION + 1):
+            output = StringIO()
+            call_command('render_posts', workers=2, stdout=output)
+            self.assertIn('共重新渲染 1 篇文章', output.getvalue())
+            self.assertNotEqual(self.client.get(f'/api/posts/{self.post.slug}/')['ETag'], etag)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.posts = make_posts(self.author, 7)
+        # 制造相同的创建时间，验证以 id 作为次序键
+        Post.objects.filter(pk__in=[p.pk for p in self.posts[2:5]]).update(
+            created_at=self.posts[2].created_at
+        )
+
+    def walk(self, url, params, link='next'):
+        slugs = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            slugs.extend(item['slug'] for item in response.data['results'])
+            if not response.data[link]:
+                return slugs, response
+            response = self.client.get(response.data[link])
+
+    def test_walks_every_post_once(self):
+        expected = list(Post.objects.order_by('-created_at', '-id').values_list('slug', flat=True))
+        slugs, _ = self.walk('/api/posts/', {'page_size': 2})
+        self.assertEqual(slugs, expected)
+
+    def test_other_orderings(self):
+        for ordering in ('title', '-updated_at'):
+            field = ordering.lstrip('-')
+            prefix = '-' if ordering.startswith('-') else ''
+            expected = list(Post.objects.order_by(ordering, f'{prefix}id').values_list('slug', flat=True))
+            slugs, _ = self.walk('/api/posts/', {'page_size': 3, 'ordering': ordering})
+            self.assertEqual(slugs, expected, field)
+
+    def test_previous_link(self):
+        slugs, last_page = self.walk('/api/posts/', {'page_size': 3})
+        response = self.client.get(last_page.data['previous'])
+        self.assertEqual([item['slug'] for item in response.data['results']], slugs[3:6])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/posts/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_value_of_wrong_type(self):
+        def encode(payload):
+            return urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+        # 默认按创建时间、搜索时按相关度排序，排序值无法转换时返回 404
+        for params in ({}, {'search': 'post'}):
+            for value in ('abc', None, [1]):
+                response = self.client.get('/api/posts/', {'cursor': encode({'v': value, 'id': 1}), **params})
+                self.assertEqual(response.status_code, 404, (params, value))
+
+        cursor = encode({'v': 'abc', 'id': 1})
+        self.assertEqual(self.client.get('/api/posts/', {'cursor': cursor, 'ordering': 'title'}).status_code, 200)
+        cursor = encode({'v': None, 'id': 1})
+        self.assertEqual(self.client.get('/api/posts/', {'cursor': cursor, 'ordering': 'title'}).status_code, 404)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        self.post = Post.objects.create(title='Cached post', content='x' * 120,
+                                        author=self.staff, published=True, tags='Cache')
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.client.get('/api/posts/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/posts/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['slug'], self.post.slug)
+
+        # 参数顺序不影响缓存键
+        self.client.get('/api/posts/', {'tags': 'Cache', 'page_size': 5})
+        response = self.client.get('/api/posts/?page_size=5&tags=Cache')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_invalidated_by_post_changes(self):
+        self.client.get(f'/api/posts/{self.post.slug}/')
+        self.client.get('/api/posts/tags/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.title = 'Renamed post'
+            self.post.tags = 'Fresh'
+            self.post.save()
+
+        response = self.client.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['title'], 'Renamed post')
+        tags = self.client.get('/api/posts/tags/').data
+        self.assertEqual([tag['name'] for tag in tags], ['Fresh'])
+
+    def test_invalidated_by_user_changes(self):
+        self.client.get(f'/api/posts/{self.post.slug}/')
+        self.staff.username = 'renamed'
+        self.staff.save()
+        response = self.client.get(f'/api/posts/{self.post.slug}/')
+        self.assertEqual(response.data['author']['username'], 'renamed')
+
+    def test_staff_and_anonymous_cached_separately(self):
+        Post.objects.create(title='Draft post', content='x' * 120, author=self.staff)
+        self.assertEqual(len(self.client.get('/api/posts/').data['results']), 1)
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(len(self.client.get('/api/posts/').data['results']), 2)
+
+    def test_file_based_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            caches = {'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}
+            with override_settings(CACHES=caches):
+                self.client.get('/api/posts/')
+                self.assertEqual(self.client.get('/api/posts/')['X-Cache'], 'HIT')
+                self.post.save()
+                self.assertEqual(self.client.get('/api/posts/')['X-Cache'], 'MISS')
+
+    def test_stats(self):
+        self.client.get('/api/posts/')
+        self.client.get('/api/posts/')
+        self.client.force_authenticate(self.staff)
+        stats = self.client.get('/api/posts/cache_stats/').data
+        self.assertGreaterEqual(stats['hits'], 1)
+        self.assertGreaterEqual(stats['misses'], 1)
+
+
+@override_settings(BLOG_CACHE_TIMEOUT=0)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.post = Post.objects.create(title='Conditional post', content='x' * 120,
+                                        author=self.author, published=True)
+        self.url = f'/api/posts/{self.post.slug}/'
+
+    def test_detail_etag(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.post.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_follows_aggregate(self):
+        etag = self.client.get('/api/posts/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # 删除文章后文章数变化
+        Post.objects.create(title='Second post', content='x' * 120, author=self.author, published=True)
+        etag = self.client.get('/api/posts/')['ETag']
+        Post.objects.filter(slug='second-post').delete()
+        response = self.client.get('/api/posts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_response_replays_validators(self):
+        with self.settings(BLOG_CACHE_TIMEOUT=300):
+            etag = self.client.get(self.url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['X-Cache'], 'HIT')
+
+
+class SlugGeneratorTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+
+    def create(self, title):
+        return Post.objects.create(title=title, content='x' * 120, author=self.author)
+
+    def test_sequential_suffixes_in_one_query(self):
+        slugs = [self.create('Same title').slug for _ in range(4)]
+        self.assertEqual(slugs, ['same-title', 'same-title-1', 'same-title-2', 'same-title-3'])
+
+        with self.assertNumQueries(1):
+            slug = SlugGenerator.generate_unique_slug('Same title', Post)
+        self.assertEqual(slug, 'same-title-4')
+
+    def test_ignores_other_prefixed_slugs(self):
+        self.create('Same title')
+        self.create('Same title extended')
+        Post.objects.create(title='Manual', slug='same-title-9x', content='x' * 120, author=self.author)
+        self.assertEqual(SlugGenerator.generate_unique_slug('Same title', Post), 'same-title-1')
+
+    def test_numeric_title_does_not_move_suffix(self):
+        self.create('Foo')
+        self.create('Foo 2024')
+        self.create('Foobar')
+        self.create('Poster')
+        self.assertEqual(SlugGenerator.generate_unique_slug('Foo', Post), 'foo-1')
+        self.assertEqual(SlugGenerator.generate_unique_slugs(['Foo', 'Foo', 'Post'], Post),
+                         ['foo-1', 'foo-2', 'post'])
+        # 只读取基础slug本身及其数字后缀形式
+        candidates = Post.objects.filter(SlugGenerator.candidates_query('foo')).values_list('slug', flat=True)
+        self.assertEqual(set(candidates), {'foo', 'foo-2024'})
+        Post.objects.create(title='Manual', slug='foo-1', content='x' * 120, author=self.author)
+        self.assertEqual(SlugGenerator.generate_unique_slug('Foo', Post), 'foo-2')
+
+    def test_reuses_free_base_slug(self):
+        Post.objects.create(title='Gap', slug='gap-title-3', content='x' * 120, author=self.author)
+        self.assertEqual(SlugGenerator.generate_unique_slug('Gap title', Post), 'gap-title')
+
+    def test_excludes_current_instance(self):
+        post = self.create('Same title')
+        self.assertEqual(SlugGenerator.generate_unique_slug('Same title', Post, post.id), 'same-title')
+
+    def test_retries_on_concurrent_collision(self):
+        self.create('Race title')
+        # 模拟并发：第一次生成的slug已被其他请求占用
+        generate = SlugGenerator.generate_unique_slug
+        results = iter(['race-title', None])
+
+        def racing(title, model_class, instance_id=None):
+            return next(results) or generate(title, model_class, instance_id)
+
+        with mock.patch.object(SlugGenerator, 'generate_unique_slug', side_effect=racing):
+            post = self.create('Race title')
+        self.assertEqual(post.slug, 'race-title-1')
+
+    def test_batch_generation(self):
+        self.create('Same title')
+        titles = ['Same title', 'Same title', '现代化博客', 'Other title', '现代化博客', '!!!']
+        with self.assertNumQueries(1):
+            slugs = SlugGenerator.generate_unique_slugs(titles, Post)
+        self.assertEqual(slugs[:5], [
+            'same-title-1', 'same-title-2', 'xian-dai-hua-bo-ke', 'other-title', 'xian-dai-hua-bo-ke-1',
+        ])
+        self.assertEqual(len(slugs[5]), 8)
+
+    def test_pinyin_segments_are_cached(self):
+        transliterate_segment.cache_clear()
+        SlugGenerator.generate_base_slug('Python 异步编程')
+        SlugGenerator.generate_base_slug('Go 异步编程')
+        self.assertEqual(transliterate_segment.cache_info().hits, 1)
+
+
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        self.other = User.objects.create_user('other', 'other@example.com', 'pass')
+
+    def ndjson(self, records):
+        return '\n'.join(json.dumps(record, ensure_ascii=False) for record in records) + '\n'
+
+    def record(self, title, **extra):
+        return dict({'title': title, 'content': '内容' * 60, 'published': True}, **extra)
+
+    def test_import_creates_and_updates_in_batches(self):
+        existing = Post.objects.create(title='Existing post', content='x' * 120, author=self.staff, tags='Old')
+        records = [
+            self.record('Same title', tags='Go, Django'),
+            self.record('Same title', tags=['Go']),
+            self.record('现代化博客', author='other', created_at='2020-01-02T03:04:05+00:00'),
+            self.record('Updated title', slug=existing.slug, tags='New'),
+            {'title': 'bad'},
+            'not json',
+        ]
+        body = self.ndjson(records[:5]) + records[5] + '\n'
+
+        importer = PostImporter(self.staff, batch_size=2)
+        stats = importer.run(body.splitlines())
+        self.assertEqual((stats['created'], stats['updated'], stats['failed']), (3, 1, 2))
+        self.assertEqual([error['line'] for error in stats['errors']], [5, 6])
+
+        self.assertEqual(
+            list(Post.objects.filter(title='Same title').order_by('slug').values_list('slug', flat=True)),
+            ['same-title', 'same-title-1']
+        )
+        self.assertEqual(Post.objects.get(slug='same-title').tags, 'Django,Go')
+        chinese = Post.objects.get(slug='xian-dai-hua-bo-ke')
+        self.assertEqual(chinese.author, self.other)
+        self.assertEqual(chinese.created_at.year, 2020)
+        self.assertEqual(chinese.word_count, 120)
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.title, existing.tags), ('Updated title', 'New'))
+        self.assertEqual(self.client.get('/api/posts/', {'search': '博客'}).data['results'][0]['slug'],
+                         chinese.slug)
+
+    def test_generated_slugs_avoid_explicit_slugs_in_batch(self):
+        records = [self.record('Hello World', slug='hello-world'), self.record('Hello World')]
+        stats = PostImporter(self.staff).run(self.ndjson(records).splitlines())
+        self.assertEqual((stats['created'], stats['failed']), (2, 0))
+        self.assertEqual(sorted(Post.objects.values_list('slug', flat=True)), ['hello-world', 'hello-world-1'])
+
+    def test_invalid_created_at_is_reported(self):
+        records = [
+            self.record('Bad month', created_at='2024-13-45T00:00:00'),
+            self.record('Bad type', created_at=12345),
+            self.record('Not a date', created_at='yesterday'),
+            self.record('Valid date', created_at='2024-01-02T03:04:05+00:00'),
+        ]
+        stats = PostImporter(self.staff).run(self.ndjson(records).splitlines())
+        self.assertEqual((stats['created'], stats['failed']), (1, 3))
+        self.assertEqual([list(error['errors']) for error in stats['errors']], [['created_at']] * 3)
+
+    def test_export_round_trip(self):
+        Post.objects.create(title='Export post', content='x' * 120, author=self.other, tags='A,B', published=True)
+        lines = list(PostExporter().iter_lines())
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual((record['author'], record['tags']), ('other', 'A,B'))
+
+        Post.objects.all().delete()
+        stats = PostImporter(self.staff).run(lines)
+        self.assertEqual(stats['created'], 1)
+        post = Post.objects.get()
+        self.assertEqual((post.slug, post.author, post.tags), ('export-post', self.other, 'A,B'))
+
+    def test_bulk_endpoint(self):
+        self.client.force_authenticate(self.staff)
+        body = self.ndjson([self.record('Endpoint post')])
+        response = self.client.post('/api/posts/bulk/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+
+        response = self.client.get('/api/posts/bulk/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(json.loads(lines[0])['slug'], 'endpoint-post')
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get('/api/posts/bulk/').status_code, 403)
+
+    def test_commands(self):
+        with tempfile.NamedTemporaryFile('w+', suffix='.ndjson', encoding='utf-8') as handle:
+            handle.write(self.ndjson([self.record('Command post')]))
+            handle.flush()
+            call_command('import_posts', handle.name, author='staff', stdout=StringIO())
+        self.assertTrue(Post.objects.filter(slug='command-post').exists())
+
+        output = StringIO()
+        call_command('export_posts', stdout=output)
+        self.assertEqual(json.loads(output.getvalue())['slug'], 'command-post')
+
+
+class StreamingListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        make_posts(self.staff, 5)
+        make_posts(self.staff, 2, published=False, prefix='Draft')
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_stream_json_array(self):
+        with mock.patch('blog.views.PostViewSet.stream_chunk_size', 2):
+            body = self.read(self.client.get('/api/posts/', {'stream': '1'}))
+        data = json.loads(body)
+        self.assertEqual([item['title'] for item in data], [f'Post {i}' for i in range(4, -1, -1)])
+        self.assertNotIn('content', data[0])
+
+    def test_stream_ndjson_by_accept_header(self):
+        response = self.client.get('/api/posts/published/', {'fields': 'slug'},
+                                   HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(set(rows[0]), {'slug'})
+
+    def test_stream_drafts_for_staff(self):
+        self.client.force_authenticate(self.staff)
+        body = self.read(self.client.get('/api/posts/drafts/', {'stream': 'ndjson'}))
+        self.assertEqual(len(body.splitlines()), 2)
+
+    def test_empty_stream(self):
+        body = self.read(self.client.get('/api/posts/', {'stream': '1', 'tags': 'missing'}))
+        self.assertEqual(json.loads(body), [])
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        dates = {
+            'Jan A': ('2025-01-05T10:00:00Z', 'Go'),
+            'Jan B': ('2025-01-31T23:30:00Z', 'Go,Python'),
+            'Mar': ('2025-03-15T23:59:00Z', 'Python'),
+            'Next year': ('2026-02-01T00:00:00Z', ''),
+        }
+        self.posts = {}
+        for title, (created_at, tags) in dates.items():
+            post = Post.objects.create(title=title, content='x' * 120, author=self.author,
+                                       published=True, tags=tags)
+            Post.objects.filter(pk=post.pk).update(created_at=created_at)
+            self.posts[title] = post
+        Post.objects.create(title='Draft', content='x' * 120, author=self.author)
+
+    def test_archive(self):
+        response = self.client.get('/api/posts/archive/')
+        self.assertEqual(response.data, [
+            {'year': 2026, 'count': 1, 'months': [{'month': 2, 'count': 1}]},
+            {'year': 2025, 'count': 3, 'months': [{'month': 3, 'count': 1}, {'month': 1, 'count': 2}]},
+        ])
+
+    def test_archive_by_tag(self):
+        response = self.client.get('/api/posts/archive/', {'by_tag': '1', 'start_date': '2025-01-01',
+                                                           'end_date': '2025-12-31'})
+        self.assertEqual(response.data, [{'year': 2025, 'count': 3, 'months': [
+            {'month': 3, 'count': 1, 'tags': {'Python': 1}},
+            {'month': 1, 'count': 2, 'tags': {'Go': 2, 'Python': 1}},
+        ]}])
+
+    def test_archive_uses_single_aggregate(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/posts/archive/', {'tags': 'Go'})
+
+    def test_end_date_includes_whole_day(self):
+        response = self.client.get('/api/posts/', {'start_date': '2025-01-31', 'end_date': '2025-03-15'})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Mar', 'Jan B'])
+
+    @override_settings(TIME_ZONE='Asia/Shanghai')
+    def test_date_range_uses_current_timezone(self):
+        # 2025-01-31 23:30 UTC 是上海时间 2 月 1 日
+        response = self.client.get('/api/posts/', {'start_date': '2025-02-01', 'end_date': '2025-02-01'})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Jan B'])
+
+    def test_invalid_dates_are_ignored(self):
+        response = self.client.get('/api/posts/', {'start_date': '2025-02-30', 'end_date': 'soon'})
+        self.assertEqual(len(response.data['results']), 4)
+
+
+@override_settings(BLOG_CACHE_TIMEOUT=0)
+class RelatedPostTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.vue = self.create('Vue.js 博客前端开发', '使用 Vue.js 构建博客系统的前端页面和组件。' * 5, 'Vue.js,前端')
+        self.vue_more = self.create('Vue.js 组件开发实践', '使用 Vue.js 构建博客系统的组件和页面路由。' * 5, 'Vue.js')
+        self.django = self.create('Django REST API', 'Serializers, viewsets and routers in Django REST framework. ' * 5, 'Django')
+
+    def create(self, title, content, tags, published=True):
+        # 相关文章在事务提交后更新
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(title=title, content=content, tags=tags,
+                                       author=self.author, published=published)
+
+    def related(self, post):
+        response = self.client.get(f'/api/posts/{post.slug}/related/')
+        self.assertEqual(response.status_code, 200)
+        return [item['slug'] for item in response.data]
+
+    def test_related_by_content_and_tags(self):
+        response = self.client.get(f'/api/posts/{self.vue.slug}/related/')
+        self.assertEqual(response.data[0]['slug'], self.vue_more.slug)
+        self.assertGreater(response.data[0]['similarity'], 0)
+        self.assertNotIn('content', response.data[0])
+        self.assertNotIn(self.django.slug, self.related(self.vue))
+
+    def test_incremental_update(self):
+        newer = self.create('Django ORM 查询优化', 'Django REST framework viewsets and routers. ' * 5, 'Django')
+        self.assertEqual(self.related(self.django), [newer.slug])
+
+        newer.published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            newer.save()
+        self.assertEqual(self.related(self.django), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vue_more.delete()
+        self.assertEqual(self.related(self.vue), [])
+
+    def test_update_runs_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            post = Post.objects.create(title='Vue.js 路由', content='使用 Vue.js 构建博客系统的页面路由。' * 5,
+                                       tags='Vue.js', author=self.author, published=True)
+        # 写事务中不计算相关文章
+        self.assertFalse(RelatedPost.objects.filter(post=post).exists())
+        for callback in callbacks:
+            callback()
+        self.assertIn(self.vue.slug, self.related(post))
+
+    def test_bulk_import_indexed_in_one_pass(self):
+        lines = [
+            json.dumps({'title': f'Vue.js 组件开发 {i}', 'content': '使用 Vue.js 构建博客系统的组件。' * 5,
+                        'tags': 'Vue.js', 'published': True}, ensure_ascii=False)
+            for i in range(5)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                PostImporter(self.author).run(lines)
+        band_lookups = [
+            query for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "blog_postsignatureband"' in query['sql']
+        ]
+        self.assertEqual(len(band_lookups), 1)
+        imported = Post.objects.get(title='Vue.js 组件开发 0')
+        self.assertEqual(RelatedPost.objects.filter(post=imported).count(), 6)
+
+    @override_settings(BLOG_RELATED_POSTS=1)
+    def test_unpublish_and_delete_refill_lists(self):
+        third = self.create('Vue.js 博客前端组件', '使用 Vue.js 构建博客系统的前端页面和组件。' * 4, 'Vue.js,前端')
+        fourth = self.create('Vue.js 博客前端页面', '使用 Vue.js 构建博客系统的前端页面。' * 5, 'Vue.js,前端')
+        first = self.related(self.vue)
+        self.assertEqual(len(first), 1)
+
+        # 列表中的文章取消发布后补上下一篇，而不是等待全量重建
+        post = Post.objects.get(slug=first[0])
+        post.published = False
+        with self.captureOnCommitCallbacks(execute=True):
+            post.save()
+        second = self.related(self.vue)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(second, first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.get(slug=second[0]).delete()
+        third_pick = self.related(self.vue)
+        self.assertEqual(len(third_pick), 1)
+        self.assertNotIn(third_pick[0], first + second)
+        self.assertIn(third_pick[0], [third.slug, fourth.slug, self.vue_more.slug])
+
+    def test_admin_add_and_change(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        self.client.force_login(admin)
+        tag = Tag.objects.get(name='Vue.js')
+        data = {
+            'title': 'Vue.js 博客前端路由', 'slug': 'vue-router',
+            'content': '使用 Vue.js 构建博客系统的前端页面和组件。' * 5,
+            'summary': '', 'author': self.author.pk, 'published': 'on', 'featured_image': '',
+            'post_tags-TOTAL_FORMS': '1', 'post_tags-INITIAL_FORMS': '0',
+            'post_tags-0-tag': tag.pk,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/blog/post/add/', data)
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get(slug='vue-router')
+        self.assertEqual(post.tag_list, ['Vue.js'])
+        self.assertIn(self.vue.slug, self.related(post))
+
+        # 修改时去掉标签，相关文章随之更新
+        data.update({
+            'title': 'Django REST API 路由', 'content': 'Serializers, viewsets and routers in Django REST framework. ' * 5,
+            'post_tags-INITIAL_FORMS': '1', 'post_tags-0-id': post.post_tags.get().pk,
+            'post_tags-0-post': post.pk, 'post_tags-0-DELETE': 'on',
+        })
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/admin/blog/post/{post.pk}/change/', data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Post.objects.get(pk=post.pk).tag_list, [])
+        self.assertEqual(self.related(post), [self.django.slug])
+
+    def test_drafts_are_not_indexed(self):
+        draft = self.create('Vue.js 博客前端开发草稿', '使用 Vue.js 构建博客系统的前端页面和组件。' * 5,
+                            'Vue.js', published=False)
+        self.assertNotIn(draft.slug, self.related(self.vue))
+
+    def test_lookup_is_indexed_read(self):
+        with self.assertNumQueries(3):
+            self.client.get(f'/api/posts/{self.vue.slug}/related/')
+        self.assertEqual(self.client.get('/api/posts/missing/related/').status_code, 404)
+
+    def test_limit(self):
+        with override_settings(BLOG_RELATED_POSTS=1):
+            self.create('Vue.js 前端开发', '使用 Vue.js 构建博客系统的前端页面。' * 5, 'Vue.js,前端')
+            self.assertEqual(RelatedPost.objects.filter(post=self.vue).count(), 1)
+
+    def test_rebuild_command(self):
+        expected = self.related(self.vue)
+        RelatedPost.objects.all().delete()
+        call_command('rebuild_related_posts', stdout=StringIO())
+        self.assertEqual(self.related(self.vue), expected)
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        token_cache.clear()
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        self.token = Token.objects.create(user=self.staff)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cached_lookup_skips_token_query(self):
+        self.client.get('/api/auth/user_info/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/auth/user_info/')
+        self.assertEqual(response.data['username'], 'staff')
+        self.assertFalse(any('authtoken_token' in query['sql'] for query in queries))
+        self.assertEqual(token_cache.get_stats()['hits'], 1)
+
+    def test_logout_invalidates(self):
+        self.client.get('/api/auth/user_info/')
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/user_info/').status_code, 401)
+
+    def test_token_delete_invalidates(self):
+        self.client.get('/api/auth/user_info/')
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/auth/user_info/').status_code, 401)
+
+    def test_change_password_invalidates(self):
+        self.client.get('/api/auth/user_info/')
+        response = self.client.post('/api/auth/change_password/',
+                                    {'old_password': 'pass', 'new_password': 'new-pass-123'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_cache.get_stats()['size'], 0)
+
+    def test_invalidation_reaches_other_workers(self):
+        # 其他进程中的缓存：信号只能清除本进程的条目，依靠共享缓存中的用户版本失效
+        other = TokenCache()
+        other.set(self.token.key, self.staff, self.token)
+        self.assertIsNotNone(other.get(self.token.key))
+
+        self.client.post('/api/auth/logout/')
+        self.assertIsNone(other.get(self.token.key))
+
+        token = Token.objects.create(user=self.staff)
+        other.set(token.key, self.staff, token)
+        self.staff.is_staff = False
+        self.staff.save()
+        self.assertIsNone(other.get(token.key))
+
+    def test_staff_endpoints_use_current_is_staff(self):
+        self.assertEqual(self.client.get('/api/posts/drafts/').status_code, 200)
+        # 模拟其他进程取消管理员权限：不触发本进程的信号，缓存中仍是管理员
+        User.objects.filter(pk=self.staff.pk).update(is_staff=False)
+        self.assertEqual(self.client.get('/api/posts/drafts/').status_code, 403)
+        self.assertEqual(self.client.post('/api/posts/', {'title': 'x', 'content': 'y'}).status_code, 403)
+
+    def test_stats_endpoint(self):
+        self.client.get('/api/posts/cache_stats/')
+        stats = self.client.get('/api/posts/cache_stats/').data['token_auth']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    @override_settings(BLOG_TOKEN_CACHE_SIZE=2)
+    def test_lru_eviction(self):
+        cache = TokenCache()
+        for key in ('a', 'b'):
+            cache.set(key, self.staff, None)
+        cache.get('a')
+        cache.set('c', self.staff, None)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_expiry(self):
+        cache = TokenCache()
+        cache.set('a', self.staff, None)
+        with mock.patch('blog.authentication.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get('a'))
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.client = APIClient()
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        make_posts(self.staff, 3)
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/posts/')
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        self.assertIn('serialize;dur=', timing)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/posts/')
+        self.client.get('/api/posts/tags/')
+        self.assertEqual(self.client.get('/api/_metrics/').status_code, 401)
+
+        self.client.force_authenticate(self.staff)
+        routes = self.client.get('/api/_metrics/').data['routes']
+        self.assertEqual(routes['GET post-list']['duration']['count'], 1)
+        self.assertGreater(routes['GET post-list']['queries']['sum'], 0)
+        self.assertGreater(routes['GET post-list']['size']['sum'], 0)
+        self.assertIn('GET post-tags', routes)
+
+    def test_prometheus_export(self):
+        self.client.get('/api/posts/')
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/_metrics/', {'format': 'prometheus'})
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode('utf-8')
+        self.assertIn('# TYPE blog_request_duration_seconds histogram', body)
+        self.assertIn('blog_db_queries_count{route="GET post-list"} 1', body)
+        self.assertIn('blog_response_size_bytes_bucket{route="GET post-list",le="+Inf"} 1', body)
+
+    @override_settings(BLOG_METRICS_SAMPLE_RATE=0)
+    def test_sampling(self):
+        response = self.client.get('/api/posts/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(registry.snapshot(), {})
+
+
+@override_settings(ROOT_URLCONF='blog.tests')
+class AsyncPostViewTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', 'staff@example.com', 'pass', is_staff=True)
+        self.token = Token.objects.create(user=self.staff)
+        self.posts = make_posts(self.staff, 5)
+        Post.objects.filter(pk=self.posts[0].pk).update(content='Async django content ' * 10)
+        self.posts[0].tags = 'Django'
+        self.posts[0].save()
+        make_posts(self.staff, 2, published=False, prefix='Draft')
+        self.auth = {'Authorization': f'Token {self.token.key}'}
+
+    async def get(self, url, data=None, headers=None):
+        response = await self.async_client.get(url, data, headers=headers)
+        return response, json.loads(response.content) if response.content else None
+
+    async def test_list_matches_sync_view(self):
+        with mock.patch.object(PostViewSet, 'list', side_effect=AssertionError):
+            response, data = await self.get('/api/posts/', {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([item['title'] for item in data['results']], ['Post 4', 'Post 3'])
+        self.assertNotIn('content', data['results'][0])
+
+        response, next_page = await self.get(data['next'])
+        self.assertEqual([item['title'] for item in next_page['results']], ['Post 2', 'Post 1'])
+
+    async def test_drafts_visible_to_staff_only(self):
+        _, data = await self.get('/api/posts/')
+        self.assertEqual(len(data['results']), 5)
+        _, data = await self.get('/api/posts/', headers=self.auth)
+        self.assertEqual(len(data['results']), 7)
+        _, data = await self.get('/api/posts/published/', headers=self.auth)
+        self.assertEqual(len(data['results']), 5)
+
+    async def test_search(self):
+        _, data = await self.get('/api/posts/', {'search': 'django'})
+        self.assertEqual([item['slug'] for item in data['results']], [self.posts[0].slug])
+
+    async def read_chunks(self, response):
+        # 异步迭代器逐块发送；同步迭代器在 ASGI 下会被整个读入内存后才发送
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        return [chunk.decode('utf-8') async for chunk in response.streaming_content]
+
+    async def test_stream_sent_chunk_by_chunk(self):
+        with mock.patch.object(PostViewSet, 'stream_chunk_size', 2):
+            response = await self.async_client.get('/api/posts/', {'stream': 'ndjson'})
+            chunks = await self.read_chunks(response)
+        self.assertEqual([len(chunk.splitlines()) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(json.loads(chunks[0].splitlines()[0])['title'], 'Post 4')
+
+        response = await self.async_client.get('/api/posts/bulk/', {'batch_size': 3}, headers=self.auth)
+        chunks = await self.read_chunks(response)
+        self.assertEqual(len(chunks), 7)
+        self.assertEqual(json.loads(chunks[0])['tags'], 'Django')
+
+    async def test_detail_and_conditional_get(self):
+        response, data = await self.get(f'/api/posts/{self.posts[0].slug}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['tag_list'], ['Django'])
+        self.assertIn('content', data)
+
+        response, _ = await self.get(f'/api/posts/{self.posts[0].slug}/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        response, _ = await self.get('/api/posts/missing/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_tags(self):
+        _, data = await self.get('/api/posts/tags/')
+        self.assertEqual([(tag['name'], tag['count']) for tag in data], [('Django', 1)])
+        response, _ = await self.get('/api/posts/tags/', {'top': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_other_requests_use_sync_view(self):
+        response, data = await self.get('/api/posts/drafts/', headers=self.auth)
+        self.assertEqual(len(data['results']), 2)
+
+        response = await self.async_client.post(
+            '/api/posts/', {'title': 'Created', 'content': 'x' * 120},
+            content_type='application/json', headers=self.auth
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = await self.async_client.get('/api/posts/', {'stream': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+    async def test_metrics_count_async_queries(self):
+        response, _ = await self.get('/api/posts/')
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+
+class DatabaseTuningTests(TestCase):
+    @skipUnless(settings.BLOG_DB_PROFILE == 'production', '仅 production 配置档设置连接参数')
+    def test_connection_pragmas(self):
+        with connection.cursor() as cursor:
+            for name in ('busy_timeout', 'cache_size'):
+                cursor.execute(f'PRAGMA {name}')
+                self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS[name])
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
+
+    def test_read_replica_router(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'blog'))
+        # TestCase 的每个测试都在事务中运行，先退出到事务外判断
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(router.db_for_read(Post), 'replica')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Post), 'default')
+
+
+@override_settings(BLOG_VIEW_FLUSH_SIZE=3, BLOG_VIEW_FLUSH_INTERVAL=3600)
+class ViewCountTests(TestCase):
+    def setUp(self):
+        view_counter.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.posts = make_posts(self.author, 3)
+        self.url = f'/api/posts/{self.posts[0].slug}/'
+
+    def tearDown(self):
+        view_counter.clear()
+
+    def view_count(self, post):
+        return Post.objects.get(pk=post.pk).view_count
+
+    def test_views_are_buffered_and_flushed_in_one_update(self):
+        etag = self.client.get(self.url)['ETag']
+        # 缓存命中和 304 响应同样计数
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.view_count(self.posts[0]), 0)
+        self.assertEqual(view_counter.get_stats()['pending_views'], 2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(f'/api/posts/{self.posts[1].slug}/')
+        updates = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.view_count(self.posts[0]), 2)
+        self.assertEqual(self.view_count(self.posts[1]), 1)
+        self.assertEqual(view_counter.get_stats()['pending_views'], 0)
+
+    def test_missing_post_not_counted(self):
+        self.assertEqual(self.client.get('/api/posts/missing/').status_code, 404)
+        self.assertEqual(view_counter.get_stats()['recorded'], 0)
+
+    def test_save_keeps_flushed_views(self):
+        post = Post.objects.get(pk=self.posts[0].pk)
+        for _ in range(3):
+            self.client.get(self.url)
+        post.title = 'Renamed post'
+        post.save()
+        self.assertEqual(self.view_count(post), 3)
+
+    def test_most_viewed(self):
+        for post, views in zip(self.posts, (1, 5, 3)):
+            Post.objects.filter(pk=post.pk).update(view_count=views)
+        data = self.client.get('/api/posts/most-viewed/', {'limit': 2}).data
+        self.assertEqual([item['slug'] for item in data], [self.posts[1].slug, self.posts[2].slug])
+        self.assertEqual(data[0]['view_count'], 5)
+        self.assertNotIn('content', data[0])
+
+
+@override_settings(BLOG_PASSWORD_ITERATIONS=1000)
+class AuthTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'correct-password')
+
+    def login(self, username='alice', password='wrong-password', **extra):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password},
+                                format='json', **extra)
+
+    def test_register_writes_user_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/auth/register/', {
+                'username': 'bob', 'email': 'Bob@example.com', 'password': 'secret-password',
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('password', response.data['user'])
+        sql = [query['sql'] for query in ctx.captured_queries]
+        self.assertEqual(len([q for q in sql if q.startswith('INSERT INTO "auth_user"')]), 1)
+        self.assertFalse([q for q in sql if q.startswith('UPDATE "auth_user"')])
+        self.assertTrue(User.objects.get(username='bob').check_password('secret-password'))
+
+        response = self.client.post('/api/auth/register/', {'username': 'carol', 'email': 'c@example.com'},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.data)
+
+    def test_register_cannot_create_staff(self):
+        response = self.client.post('/api/auth/register/', {
+            'username': 'mallory', 'email': 'm@example.com', 'password': 'secret-password',
+            'is_staff': True, 'is_superuser': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.data['user']['is_staff'])
+        user = User.objects.get(username='mallory')
+        self.assertFalse(user.is_staff)
+        self.assertFalse(user.is_superuser)
+
+    @override_settings(BLOG_AUTH_THROTTLES={'login': {'username': {'capacity': 2, 'per_minute': 1}}})
+    def test_login_throttled_per_username_before_hashing(self):
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login(username=' ALICE ').status_code, 401)
+        with mock.patch('blog.views.authenticate') as authenticate:
+            response = self.login(password='correct-password')
+            authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        # 其他账号不受影响
+        self.assertEqual(self.login(username='someone').status_code, 401)
+
+        # 令牌按时间补充
+        with mock.patch('blog.throttling.time.time', return_value=time.time() + 61):
+            self.assertEqual(self.login(password='correct-password').status_code, 200)
+
+    @override_settings(BLOG_AUTH_THROTTLES={'login': {'ip': {'capacity': 1, 'per_minute': 1}}})
+    def test_login_throttled_per_ip(self):
+        self.assertEqual(self.login(username='first').status_code, 401)
+        self.assertEqual(self.login(username='second').status_code, 429)
+        self.assertEqual(self.login(username='third', REMOTE_ADDR='10.0.0.2').status_code, 401)
+
+    @override_settings(BLOG_AUTH_THROTTLES={'login': {'ip': {'capacity': 2, 'per_minute': 1}}})
+    def test_forwarded_for_header_does_not_bypass_ip_throttle(self):
+        statuses = [
+            self.login(username=f'user{i}', HTTP_X_FORWARDED_FOR=f'10.1.0.{i}').status_code
+            for i in range(5)
+        ]
+        self.assertEqual(statuses, [401, 401, 429, 429, 429])
+
+        # 部署在一层代理之后时按代理追加的客户端 IP 限流
+        rest_framework = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        with override_settings(REST_FRAMEWORK=rest_framework):
+            self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='spoofed, 10.2.0.1').status_code, 401)
+            self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='spoofed, 10.2.0.2').status_code, 401)
+
+    def test_password_iterations_setting(self):
+        self.assertTrue(make_password('secret').startswith('pbkdf2_sha256$1000$'))
+        with override_settings(BLOG_PASSWORD_ITERATIONS=2000):
+            # 旧的迭代次数仍可验证，登录时按新的次数重新哈希
+            self.assertEqual(self.login(password='correct-password').status_code, 200)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+            self.assertTrue(check_password('correct-password', self.user.password))
+
+
+@override_settings(BLOG_SITE_URL='https://blog.example.com/', BLOG_FEED_TITLE='Test blog')
+class FeedTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.post = Post.objects.create(title='Feed post', content='x' * 120, summary='Feed summary',
+                                        author=self.author, published=True, tags='Django, Python')
+        self.draft = Post.objects.create(title='Draft post', content='x' * 120, author=self.author)
+
+    def test_feeds_contain_published_posts(self):
+        url = f'https://blog.example.com/posts/{self.post.slug}'
+        for path, content_type in (('/feed.xml', 'application/rss+xml'), ('/atom.xml', 'application/atom+xml')):
+            response = self.client.get(path)
+            body = response.content.decode()
+            self.assertTrue(response['Content-Type'].startswith(content_type))
+            self.assertIn('Test blog', body)
+            self.assertIn(url, body)
+            self.assertIn('Feed summary', body)
+            self.assertIn('Django', body)
+            self.assertNotIn('Draft post', body)
+
+        body = self.client.get('/sitemap.xml').content.decode()
+        self.assertIn(f'<loc>{url}</loc>', body)
+        self.assertNotIn(self.draft.slug, body)
+
+    def test_cached_feed_and_conditional_get_skip_database(self):
+        etag = self.client.get('/feed.xml')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/feed.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            response = self.client.get('/feed.xml', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_regenerated_after_post_changes(self):
+        etag = self.client.get('/atom.xml')['ETag']
+        self.draft.published = True
+        self.draft.save()
+        response = self.client.get('/atom.xml', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Draft post', response.content.decode())
+
+        self.post.delete()
+        self.assertNotIn(self.post.slug, self.client.get('/sitemap.xml').content.decode())
+
+        # 浏览计数的批量更新不使订阅失效
+        etag = self.client.get('/feed.xml')['ETag']
+        Post.objects.filter(pk=self.draft.pk).update(view_count=10)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/feed.xml', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.author = User.objects.create_user('author', 'author@example.com', 'pass')
+        self.posts = make_posts(self.author, 3)
+        self.posts[0].tags = 'Django, C++'
+        self.posts[0].save()
+        self.draft = Post.objects.create(title='Draft', content='x' * 120, author=self.author)
+        self.output = tempfile.TemporaryDirectory()
+        self.addCleanup(self.output.cleanup)
+        self.root = Path(self.output.name)
+
+    def export(self, **options):
+        output = StringIO()
+        call_command('export_snapshot', self.output.name, workers=1, stdout=output, **options)
+        return output.getvalue()
+
+    def read(self, path):
+        return json.loads((self.root / path).read_text(encoding='utf-8'))
+
+    def test_files_match_api(self):
+        self.export(page_size=2)
+        post = self.posts[0]
+        self.assertEqual(self.read(f'posts/{post.slug}.json'), self.client.get(f'/api/posts/{post.slug}/').json())
+        self.assertFalse((self.root / f'posts/{self.draft.slug}.json').exists())
+
+        first = self.read('posts/page/1.json')
+        self.assertEqual(first['results'], self.client.get('/api/posts/?page_size=2').json()['results'])
+        self.assertEqual((first['previous'], first['next']), (None, '/posts/page/2.json'))
+        second = self.read('posts/page/2.json')
+        self.assertEqual(len(second['results']), 1)
+        self.assertEqual((second['previous'], second['next']), ('/posts/page/1.json', None))
+
+        self.assertEqual(self.read('tags.json'), self.client.get('/api/posts/tags/').json())
+        tagged = self.read('tags/C%2B%2B/page/1.json')
+        self.assertEqual([item['slug'] for item in tagged['results']], [post.slug])
+
+    def test_incremental_export(self):
+        self.assertIn('重写 3 篇', self.export())
+        self.assertIn('重写 0 篇', self.export())
+
+        post = self.posts[1]
+        post.title = 'Updated'
+        post.save()
+        self.assertIn('重写 1 篇', self.export())
+        self.assertEqual(self.read(f'posts/{post.slug}.json')['title'], 'Updated')
+        self.assertIn('重写 3 篇', self.export(full=True))
+
+        # 重新渲染的内容和浏览次数不会更新 updated_at，按内容哈希判断
+        Post.objects.filter(pk=post.pk).update(content_html='<p>rendered</p>', view_count=7)
+        self.assertIn('重写 1 篇', self.export())
+        detail = self.read(f'posts/{post.slug}.json')
+        self.assertEqual((detail['content_html'], detail['view_count']), ('<p>rendered</p>', 7))
+        self.assertEqual(self.read('posts/page/1.json')['results'][1]['view_count'], 7)
+
+        # 取消发布的文章和不再存在的标签页被删除
+        post = self.posts[0]
+        post.published = False
+        post.save()
+        self.export()
+        self.assertFalse((self.root / f'posts/{post.slug}.json').exists())
+        self.assertFalse((self.root / 'tags/Django/page/1.json').exists())
+        self.assertNotIn(post.slug, self.read('manifest.json')['posts'])
+
+    def test_dot_tags_stay_inside_tag_directory(self):
+        self.posts[1].tags = '., ..'
+        self.posts[1].save()
+        self.export()
+        for name in ('%2E', '%2E%2E'):
+            page = self.read(f'tags/{name}/page/1.json')
+            self.assertEqual([item['slug'] for item in page['results']], [self.posts[1].slug])
+        self.assertFalse((self.root / 'page').exists())
+        self.assertFalse((self.root / 'tags' / 'page').exists())
@@ -1,21 +1,57 @@
+from functools import lru_cache
+from django.db.models import Q
 from django.utils.text import slugify
-from pypinyin import lazy_pinyin
 import re
 import uuid
 
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+CJK_SEGMENT_PATTERN = re.compile(r'[\u4e00-\u9fff]+|[^\u4e00-\u9fff]+')
+
+def transliterate(text):
+    """
+    将文本中的中文转换为拼音列表
+    pypinyin 的词典较大，首次调用时才加载
+    :param text: 原始文本
+    :return: 拼音列表，非中文部分原样保留
+    """
+    from pypinyin import lazy_pinyin
+    return lazy_pinyin(text)
+
+def chunked(items, size):
+    """
+    将列表按固定大小分段
+    :param items: 列表
+    :param size: 每段的长度
+    :return: 各段组成的列表
+    """
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+@lru_cache(maxsize=4096)
+def transliterate_segment(segment):
+    """带缓存的拼音转换，适用于标题等较短且重复率高的片段"""
+    return tuple(transliterate(segment))
+
 class SlugGenerator:
+    MAX_BASE_LENGTH = 240
+    SUFFIX_PATTERN = re.compile(r'^(.+)-(\d+)$')
+    # 批量生成时每次查询包含的基础slug数
+    BATCH_QUERY_SIZE = 100
+
     @staticmethod
-    def generate_unique_slug(title, model_class, instance_id=None):
+    def generate_base_slug(title):
         """
-        生成唯一的slug
+        根据标题生成基础slug（不保证唯一）
         :param title: 标题
-        :param model_class: 模型类
-        :param instance_id: 当前实例ID（用于更新时排除自身）
-        :return: 唯一的slug
+        :return: 基础slug，无法生成时为空字符串
         """
-        if re.search(r'[\u4e00-\u9fff]', title):
-            # 将中文转换为拼音
-            pinyin_list = lazy_pinyin(title)
+        if CJK_PATTERN.search(title):
+            # 按中文和非中文分段转换为拼音，中文片段的结果会被缓存
+            pinyin_list = []
+            for segment in CJK_SEGMENT_PATTERN.findall(title):
+                if CJK_PATTERN.match(segment):
+                    pinyin_list.extend(transliterate_segment(segment))
+                else:
+                    pinyin_list.append(segment)
             # 将拼音列表组合成字符串，并移除非字母数字字符
             base_slug = re.sub(r'[^a-zA-Z0-9\s-]', '', ' '.join(pinyin_list))
             base_slug = slugify(base_slug)
@@ -23,52 +59,165 @@ class SlugGenerator:
             # 英文标题直接使用slugify
             base_slug = slugify(title)
 
+        # 为数字后缀预留长度
+        return base_slug[:SlugGenerator.MAX_BASE_LENGTH].rstrip('-')
+
+    @staticmethod
+    def index_suffixes(slugs, index=None):
+        """
+        将已有slug按基础slug归类为已占用的数字后缀，无后缀记为0
+        :param slugs: 已有slug
+        :param index: 需要追加的已有归类结果
+        :return: 基础slug到已占用后缀集合的映射
+        """
+        index = {} if index is None else index
+        for slug in slugs:
+            index.setdefault(slug, set()).add(0)
+            match = SlugGenerator.SUFFIX_PATTERN.match(slug)
+            if match:
+                index.setdefault(match.group(1), set()).add(int(match.group(2)))
+        return index
+
+    @staticmethod
+    def next_free_slug(base_slug, suffixes):
+        """
+        计算下一个可用的slug，使用最小的未占用后缀
+        不取最大后缀加一，否则 foo-2024 这类本身以数字结尾的slug会让 foo 的后缀跳到 2025
+        :param base_slug: 基础slug
+        :param suffixes: 该基础slug已占用的后缀集合
+        :return: 可用的slug
+        """
+        if 0 not in suffixes:
+            return base_slug
+        suffix = 1
+        while suffix in suffixes:
+            suffix += 1
+        return f"{base_slug}-{suffix}"
+
+    @staticmethod
+    def candidates_query(base_slug):
+        """
+        匹配基础slug本身及其数字后缀形式的条件
+        前缀条件可以使用slug索引，正则排除 poster-... 等只是前缀相同的slug
+        """
+        return Q(slug=base_slug) | Q(
+            slug__startswith=f'{base_slug}-',
+            slug__regex=rf'^{re.escape(base_slug)}-[0-9]+$'
+        )
+
+    @staticmethod
+    def generate_unique_slug(title, model_class, instance_id=None):
+        """
+        生成唯一的slug
+        :param title: 标题
+        :param model_class: 模型类
+        :param instance_id: 当前实例ID（用于更新时排除自身）
+        :return: 唯一的slug
+        """
+        base_slug = SlugGenerator.generate_base_slug(title)
+
         # 如果生成的slug为空，使用UUID
         if not base_slug:
             return str(uuid.uuid4())[:8]
 
-        # 确保slug唯一
-        slug = base_slug
-        counter = 1
-        query = model_class.objects.filter(slug=slug)
+        # 一次查询取出 base_slug 及其数字后缀形式的slug，计算下一个可用后缀
+        existing = model_class.objects.filter(SlugGenerator.candidates_query(base_slug))
         if instance_id:
-            query = query.exclude(id=instance_id)
-        
-        while query.exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-            query = model_class.objects.filter(slug=slug)
-            if instance_id:
-                query = query.exclude(id=instance_id)
+            existing = existing.exclude(id=instance_id)
+        index = SlugGenerator.index_suffixes(existing.values_list('slug', flat=True))
+        return SlugGenerator.next_free_slug(base_slug, index.get(base_slug, ()))
+
+    @staticmethod
+    def generate_unique_slugs(titles, model_class, reserved=()):
+        """
+        批量生成唯一的slug，同一批次内也不会重复
+        :param titles: 标题列表
+        :param model_class: 模型类
+        :param reserved: 尚未写入数据库但已被占用的slug（如同一批次中显式指定的slug）
+        :return: 与标题一一对应的slug列表
+        """
+        base_slugs = [SlugGenerator.generate_base_slug(title) for title in titles]
+        distinct = sorted(set(filter(None, base_slugs)))
+
+        index = {}
+        for i in range(0, len(distinct), SlugGenerator.BATCH_QUERY_SIZE):
+            query = Q()
+            for base_slug in distinct[i:i + SlugGenerator.BATCH_QUERY_SIZE]:
+                query |= SlugGenerator.candidates_query(base_slug)
+            existing = model_class.objects.filter(query).values_list('slug', flat=True)
+            SlugGenerator.index_suffixes(existing, index)
+        SlugGenerator.index_suffixes(reserved, index)
+
+        slugs = []
+        for base_slug in base_slugs:
+            if base_slug:
+                slug = SlugGenerator.next_free_slug(base_slug, index.get(base_slug, ()))
+            else:
+                slug = str(uuid.uuid4())[:8]
+            SlugGenerator.index_suffixes([slug], index)
+            slugs.append(slug)
+        return slugs
+
+class ContentStats:
+    # 平均阅读速度：英文按单词计，中文按字计
+    WORDS_PER_MINUTE = 200
+    CJK_CHARS_PER_MINUTE = 400
+    SUMMARY_LENGTH = 200
+
+    CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+    WORD_PATTERN = re.compile(r'[^\W\u4e00-\u9fff]+')
+
+    @staticmethod
+    def analyze(content):
+        """
+        统计字数并估算阅读时间
+        中文按字计数，其他文字按单词计数
+        :param content: 文章内容
+        :return: (字数, 阅读时间（分钟）)
+        """
+        if not content:
+            return 0, 1
+
+        cjk_count = len(ContentStats.CJK_PATTERN.findall(content))
+        word_count = len(ContentStats.WORD_PATTERN.findall(content))
+        minutes = (
+            word_count / ContentStats.WORDS_PER_MINUTE +
+            cjk_count / ContentStats.CJK_CHARS_PER_MINUTE
+        )
+        return cjk_count + word_count, max(1, round(minutes))
 
-        return slug
+    @staticmethod
+    def generate_summary(content):
+        """
+        从内容生成摘要
+        :param content: 文章内容
+        :return: 摘要
+        """
+        length = ContentStats.SUMMARY_LENGTH
+        return content[:length] + '...' if len(content) > length else content
 
 class TagManager:
     @staticmethod
-    def normalize_tags(tags_str):
+    def parse_tags(tags):
         """
-        标准化标签字符串
-        :param tags_str: 原始标签字符串
-        :return: 标准化后的标签字符串
+        解析标签
+        :param tags: 逗号分隔的标签字符串或标签列表
+        :return: 去重并排序后的标签列表
         """
-        if not tags_str:
-            return ""
-        
-        # 分割标签，去除空白，去重，排序
-        tags = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-        tags = sorted(set(tags))
-        
-        return ','.join(tags)
+        if not tags:
+            return []
+
+        if isinstance(tags, str):
+            tags = tags.split(',')
+
+        # 去除空白，去重，排序
+        return sorted(set(tag.strip() for tag in tags if tag.strip()))
 
     @staticmethod
-    def get_all_tags(queryset):
+    def normalize_tags(tags_str):
         """
-        从查询集中获取所有唯一标签
-        :param queryset: 文章查询集
-        :return: 排序后的标签列表
+        标准化标签字符串
+        :param tags_str: 原始标签字符串
+        :return: 标准化后的标签字符串
         """
-        tags = set()
-        for obj in queryset:
-            if obj.tags:
-                tags.update(tag.strip() for tag in obj.tags.split(','))
-        return sorted(list(tags)) 
\ No newline at end of file
+        return ','.join(TagManager.parse_tags(tags_str))
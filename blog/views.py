@@ -1,77 +1,211 @@
 from django.shortcuts import render
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views import View
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import authenticate, update_session_auth_hash
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.utils.text import slugify
-from django.db.models import Q
-from datetime import datetime
-from .models import Post
-from .serializers import PostSerializer, UserSerializer
+from datetime import datetime, time, timedelta
+import hashlib
+from collections import defaultdict
+from django.db.models import Count, F, Max
+from django.db.models.functions import TruncMonth
+from .models import Post, RelatedPost, Tag, TagStat
+from .serializers import PostListSerializer, PostSerializer, RegisterSerializer, UserSerializer
 from rest_framework.views import APIView
-from .permissions import IsAdminUserOrReadOnly
+from rest_framework.settings import api_settings
+from .permissions import IsAdminUserOrReadOnly, IsStaffUser
+from .throttling import LoginThrottle, RegisterThrottle
+from .filters import FullTextSearchFilter
+from .cache import (
+    add_headers, build_validator_headers, cached_response, check_not_modified, conditional_response, get_stats
+)
+from .feeds import get_feed
+from .bulk import PostExporter, PostImporter
+from .streaming import NDJSONRenderer, is_asgi_request, streaming_response
 from .utils import TagManager
+from .authentication import token_cache
+from .analytics import counted_view, view_counter
+from .metrics import PrometheusRenderer, registry
+from django.conf import settings
 
 class PostViewSet(viewsets.ModelViewSet):
     serializer_class = PostSerializer
     lookup_field = 'slug'
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'content', 'summary', 'tags']
+    # 搜索过滤器需在排序之后，以便未指定 ordering 时按相关度排序
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['created_at', 'updated_at', 'title']
     ordering = ['-created_at']
     permission_classes = [IsAdminUserOrReadOnly]
+    # 列表类接口默认使用不含完整内容的序列化器
+    list_actions = ['list', 'published', 'drafts', 'related', 'most_viewed']
+    # 列表默认不输出的大字段，通过 fields 参数请求时才读取和输出
+    content_fields = ['content', 'content_html', 'toc']
+    # 支持 Accept: application/x-ndjson
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer]
+    # 流式输出时每次从数据库读取的行数
+    stream_chunk_size = 500
+    # 标签接口在带有这些筛选参数时实时统计，否则读取统计表
+    tag_filter_params = ['search', 'tags', 'start_date', 'end_date']
+    invalid_tag_params_message = 'min_count 和 top 必须是整数'
+    # 计算列表验证值所需的聚合
+    list_validator_aggregates = {'last_modified': Max('updated_at'), 'count': Count('id')}
+    # 计算详情验证值所需的字段，渲染器升级后重新渲染不修改 updated_at，由内容哈希区分
+    detail_validator_fields = ['id', 'updated_at', 'content_hash']
 
     def get_queryset(self):
-        queryset = Post.objects.all()
-        
+        queryset = self.filter_by_params(Post.objects.with_author().with_tags())
+
+        # 不需要输出的大字段不从数据库读取（搜索高亮需要内容）
+        if self.request.method == 'GET':
+            output_fields = self.get_output_fields()
+            deferred = [field for field in self.content_fields if field not in output_fields]
+            if self.request.query_params.get('search') and 'content' in deferred:
+                deferred.remove('content')
+            if deferred:
+                queryset = queryset.defer(*deferred)
+
+        return queryset
+
+    def filter_by_params(self, queryset):
+        """按可见性、标签和日期范围筛选"""
         # 非管理员只能看到已发布的文章
         if not self.request.user.is_staff:
             queryset = queryset.filter(published=True)
 
-        # 获取查询参数
-        search = self.request.query_params.get('search')
+        # 按标签筛选（tag_match=all 时要求包含全部标签）
         tags = self.request.query_params.get('tags')
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-
-        # 搜索标题和内容
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search) |
-                Q(summary__icontains=search)
-            )
-
-        # 按标签筛选
         if tags:
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            tag_query = Q()
-            for tag in tag_list:
-                tag_query |= Q(tags__icontains=tag)
-            queryset = queryset.filter(tag_query)
+            queryset = queryset.filter_tags(
+                TagManager.parse_tags(tags),
+                match_all=self.request.query_params.get('tag_match') == 'all'
+            )
 
         # 按日期范围筛选
+        start, end = self.get_date_range()
+        if start:
+            queryset = queryset.filter(created_at__gte=start)
+        if end:
+            queryset = queryset.filter(created_at__lt=end)
+        return queryset
+
+    def get_date_range(self):
+        """
+        解析 start_date / end_date（YYYY-MM-DD，按当前时区）
+        :return: (开始时间, 结束时间)，结束时间为 end_date 次日零点，包含 end_date 当天；无效的日期被忽略
+        """
+        params = self.request.query_params
+        start = self.parse_day(params.get('start_date'))
+        end = self.parse_day(params.get('end_date'))
+        if start:
+            start = timezone.make_aware(datetime.combine(start, time.min))
+        if end:
+            end = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        return start, end
+
+    @staticmethod
+    def parse_day(value):
         try:
-            if start_date:
-                start = datetime.strptime(start_date, '%Y-%m-%d')
-                queryset = queryset.filter(created_at__gte=start)
-            if end_date:
-                end = datetime.strptime(end_date, '%Y-%m-%d')
-                queryset = queryset.filter(created_at__lte=end)
+            return parse_date(value or '')
         except ValueError:
-            pass
+            return None
+
+    def get_requested_fields(self):
+        """解析 fields 参数，返回请求的字段列表或 None"""
+        fields = self.request.query_params.get('fields')
+        if not fields or self.request.method != 'GET':
+            return None
+        return [field.strip() for field in fields.split(',') if field.strip()]
+
+    def get_output_fields(self):
+        """返回本次响应实际输出的字段"""
+        fields = self.get_serializer_class().Meta.fields
+        requested = self.get_requested_fields()
+        if requested is not None:
+            fields = [field for field in fields if field in requested]
+        return fields
+
+    def get_serializer_class(self):
+        requested = self.get_requested_fields()
+        if self.action in self.list_actions and not (
+                requested and any(field in requested for field in self.content_fields)):
+            return PostListSerializer
+        return PostSerializer
 
-        return queryset.distinct()
+    def get_serializer(self, *args, **kwargs):
+        requested = self.get_requested_fields()
+        if requested is not None:
+            kwargs.setdefault('fields', requested)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['search_query'] = self.request.query_params.get('search', '').strip()
+        return context
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def get_list_queryset(self):
+        """返回列表类接口筛选、排序后的查询集"""
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'published':
+            queryset = queryset.filter(published=True)
+        elif self.action == 'drafts':
+            queryset = queryset.filter(published=False)
+        return queryset
+
+    def get_list_validators(self, request):
+        """
+        根据筛选后查询集的最后更新时间和文章数计算列表的验证值
+        :return: (etag, last_modified)
+        """
+        stats = self.get_list_queryset().order_by().aggregate(**self.list_validator_aggregates)
+        return self.build_list_validators(request, stats)
+
+    def build_list_validators(self, request, stats):
+        last_modified = stats['last_modified']
+        fingerprint = f"{last_modified.isoformat() if last_modified else ''}:{stats['count']}:{int(request.user.is_staff)}"
+        return hashlib.md5(fingerprint.encode('utf-8')).hexdigest(), last_modified
+
+    def get_detail_validators(self, request, slug=None):
+        """
+        根据文章ID、更新时间和内容哈希计算详情的验证值
+        :return: (etag, last_modified)，文章不存在时为 (None, None)
+        """
+        post = self.get_queryset().filter(slug=slug).values(*self.detail_validator_fields).first()
+        return self.build_detail_validators(post)
+
+    def build_detail_validators(self, post):
+        if post is None:
+            return None, None
+        etag = f"{post['id']}-{post['updated_at'].timestamp():.6f}-{post['content_hash'][:12]}"
+        return etag, post['updated_at']
+
+    @streaming_response
+    @cached_response('list')
+    @conditional_response('get_list_validators')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @counted_view
+    @cached_response('detail')
+    @conditional_response('get_detail_validators')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     @action(detail=False)
+    @streaming_response
+    @cached_response('published')
+    @conditional_response('get_list_validators')
     def published(self, request):
         """获取已发布的文章列表"""
-        posts = self.get_queryset().filter(published=True)
+        posts = self.get_list_queryset()
         page = self.paginate_queryset(posts)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -79,10 +213,11 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(posts, many=True)
         return Response(serializer.data)
 
-    @action(detail=False, permission_classes=[permissions.IsAdminUser])
+    @action(detail=False, permission_classes=[IsStaffUser])
+    @streaming_response
     def drafts(self, request):
         """获取草稿文章列表"""
-        posts = self.get_queryset().filter(published=False)
+        posts = self.get_list_queryset()
         page = self.paginate_queryset(posts)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -90,17 +225,180 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(posts, many=True)
         return Response(serializer.data)
 
+    @action(detail=True)
+    @cached_response('related')
+    def related(self, request, slug=None):
+        """
+        获取相关文章，按相关度降序
+        - limit: 返回数量（默认 5）
+        """
+        post_id = self.get_queryset().filter(slug=slug).values_list('pk', flat=True).first()
+        if post_id is None:
+            raise Http404
+        try:
+            limit = int(request.query_params.get('limit', 5))
+        except ValueError:
+            limit = 5
+        limit = max(1, min(limit, RelatedPost.objects.limit))
+
+        posts = list(
+            self.get_queryset()
+            .filter(related_from__post_id=post_id)
+            .annotate(similarity=F('related_from__score'))
+            .order_by('-similarity')[:limit]
+        )
+        data = self.get_serializer(posts, many=True).data
+        for item, related in zip(data, posts):
+            item['similarity'] = round(related.similarity, 4)
+        return Response(data)
+
+    @action(detail=False, url_path='most-viewed')
+    @cached_response('most_viewed')
+    def most_viewed(self, request):
+        """
+        获取浏览次数最多的文章（计数批量写入，略有延迟）
+        - limit: 返回数量（默认 10，最多 50）
+        - 支持与列表相同的 tags、start_date、end_date 筛选
+        """
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            limit = 10
+        limit = max(1, min(limit, 50))
+
+        posts = self.get_queryset().order_by('-view_count', '-id')[:limit]
+        return Response(self.get_serializer(posts, many=True).data)
+
     @action(detail=False)
+    @cached_response('archive')
+    def archive(self, request):
+        """
+        按年月统计已发布文章数
+        - by_tag=1: 每月再按标签统计
+        - 支持与列表相同的 tags、start_date、end_date 筛选
+        """
+        by_tag = request.query_params.get('by_tag') in ('1', 'true')
+        queryset = self.filter_by_params(Post.objects.filter(published=True)).order_by()
+        months = (
+            queryset.annotate(month=TruncMonth('created_at'))
+            .values('month')
+            .annotate(count=Count('id'))
+            .order_by('-month')
+        )
+
+        tag_counts = defaultdict(dict)
+        if by_tag:
+            rows = (
+                queryset.filter(tag_set__isnull=False)
+                .annotate(month=TruncMonth('created_at'))
+                .values('month', 'tag_set__name')
+                .annotate(count=Count('id'))
+                .order_by('tag_set__name')
+            )
+            for row in rows:
+                tag_counts[row['month']][row['tag_set__name']] = row['count']
+
+        years = []
+        for row in months:
+            month = row['month']
+            if not years or years[-1]['year'] != month.year:
+                years.append({'year': month.year, 'count': 0, 'months': []})
+            entry = {'month': month.month, 'count': row['count']}
+            if by_tag:
+                entry['tags'] = tag_counts[month]
+            years[-1]['count'] += row['count']
+            years[-1]['months'].append(entry)
+        return Response(years)
+
+    @action(detail=False)
+    @cached_response('tags')
     def tags(self, request):
-        """获取所有标签列表"""
-        queryset = self.get_queryset().filter(published=True)
-        tags = TagManager.get_all_tags(queryset)
-        return Response(tags)
+        """
+        获取标签列表及已发布文章数
+        - min_count: 最少文章数（默认 1）
+        - top: 最多返回的标签数
+        - sort: name（默认）或 count
+        """
+        try:
+            tags = self.get_tag_queryset()
+        except ValueError:
+            return Response({'error': self.invalid_tag_params_message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response([self.tag_representation(tag) for tag in tags])
+
+    def get_tag_queryset(self):
+        """
+        返回标签统计查询集
+        :raise ValueError: min_count 或 top 不是整数
+        """
+        params = self.request.query_params
+        min_count = max(1, int(params.get('min_count', 1)))
+        top = int(params['top']) if params.get('top') else None
+
+        if any(params.get(name) for name in self.tag_filter_params):
+            # 有筛选条件时按筛选后的文章实时统计
+            posts = self.filter_queryset(self.get_queryset()).filter(published=True)
+            tags = (
+                Tag.objects.filter(post_tags__post__in=posts.order_by().values('pk'))
+                .values('name')
+                .annotate(count=Count('post_tags'), last_used_at=Max('post_tags__post__updated_at'))
+                .filter(count__gte=min_count)
+            )
+        else:
+            # 否则直接读取标签统计表
+            tags = TagStat.objects.filter(post_count__gte=min_count).values(
+                'last_used_at', name=F('tag__name'), count=F('post_count')
+            )
+
+        if params.get('sort') == 'count':
+            tags = tags.order_by('-count', 'name')
+        else:
+            tags = tags.order_by('name')
+        if top is not None:
+            tags = tags[:max(0, top)]
+        return tags
+
+    @staticmethod
+    def tag_representation(tag):
+        return {'name': tag['name'], 'count': tag['count'], 'last_used_at': tag['last_used_at']}
+
+    @action(detail=False, methods=['get', 'post'], permission_classes=[IsStaffUser])
+    def bulk(self, request):
+        """
+        批量导出/导入文章（NDJSON，每行一篇）
+        GET 流式导出，POST 从请求体流式导入
+        """
+        try:
+            batch_size = int(request.query_params.get('batch_size', 500))
+        except ValueError:
+            batch_size = 500
+        batch_size = max(1, min(batch_size, 5000))
+
+        if request.method == 'GET':
+            queryset = Post.objects.all()
+            if request.query_params.get('published') is not None:
+                queryset = queryset.filter(published=request.query_params['published'] in ('1', 'true'))
+            exporter = PostExporter(queryset, chunk_size=batch_size)
+            lines = exporter.aiter_lines() if is_asgi_request(request) else exporter.iter_lines()
+            response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+            response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+            return response
+
+        importer = PostImporter(request.user, batch_size=batch_size)
+        stats = importer.run(request.stream or [])
+        return Response(stats, status=status.HTTP_200_OK)
+
+    @action(detail=False, permission_classes=[IsStaffUser])
+    def cache_stats(self, request):
+        """获取响应缓存、令牌认证缓存和浏览计数缓冲的统计"""
+        stats = get_stats()
+        stats['token_auth'] = token_cache.get_stats()
+        stats['view_counter'] = view_counter.get_stats()
+        return Response(stats)
 
 class AuthViewSet(viewsets.ViewSet):
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], throttle_classes=[LoginThrottle])
     def login(self, request):
-        """用户登录"""
+        """用户登录（按客户端 IP 和用户名限流）"""
         username = request.data.get('username')
         password = request.data.get('password')
 
@@ -124,15 +422,12 @@ class AuthViewSet(viewsets.ViewSet):
             'user': serializer.data
         })
 
-    @action(detail=False, methods=['post'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[AllowAny], throttle_classes=[RegisterThrottle])
     def register(self, request):
-        """用户注册"""
-        serializer = UserSerializer(data=request.data)
+        """用户注册（按客户端 IP 限流）"""
+        serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            user.set_password(request.data['password'])
-            user.save()
-            
             token, _ = Token.objects.get_or_create(user=user)
             return Response({
                 'token': token.key,
@@ -169,4 +464,35 @@ class AuthViewSet(viewsets.ViewSet):
         user.set_password(new_password)
         user.save()
         update_session_auth_hash(request, user)
-        return Response({'message': '密码修改成功'})
\ No newline at end of file
+        return Response({'message': '密码修改成功'})
+
+class MetricsView(APIView):
+    """
+    请求指标（需要管理员权限）
+    按路由汇总的耗时、查询数、SQL耗时、序列化耗时和响应大小直方图，
+    ?format=prometheus 时输出 Prometheus 文本格式
+    """
+    permission_classes = [IsStaffUser]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [PrometheusRenderer]
+
+    def get(self, request, format=None):
+        return Response({
+            'sample_rate': getattr(settings, 'BLOG_METRICS_SAMPLE_RATE', 1.0),
+            'routes': registry.snapshot(),
+        })
+
+class FeedView(View):
+    """
+    RSS / Atom / 站点地图
+    内容生成后缓存（见 feeds.py），命中缓存和条件请求时不查询数据库
+    """
+    feed = None
+
+    def get(self, request):
+        artifact = get_feed(self.feed)
+        headers = build_validator_headers(artifact['etag'], artifact['last_modified'])
+        not_modified = check_not_modified(request, headers)
+        if not_modified is not None:
+            return not_modified
+        response = HttpResponse(artifact['body'], content_type=artifact['content_type'])
+        return add_headers(response, headers)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -78,13 +80,121 @@ WSGI_APPLICATION = 'my_blog_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# 数据库配置档：
+# - production：开启 WAL 等连接参数，持久连接并在复用前检查连接是否可用
+# - plain：SQLite 默认行为，每个请求重新建立连接
+BLOG_DB_PROFILE = os.environ.get('BLOG_DB_PROFILE', 'production')
+BLOG_DB_PATH = Path(os.environ.get('BLOG_DB_PATH', BASE_DIR / 'db.sqlite3'))
+# 读查询使用单独的只读连接（仅 production 配置档），见 blog/routers.py
+BLOG_DB_READ_REPLICA = os.environ.get('BLOG_DB_READ_REPLICA') == '1'
+
+# 每个连接建立时执行的 PRAGMA：
+# - WAL 模式下读不阻塞写、写不阻塞读，synchronous=NORMAL 在 WAL 下只在检查点时同步磁盘
+# - busy_timeout 让写锁冲突时等待而不是立即报 "database is locked"
+# - cache_size 为负数时单位为 KiB，mmap_size 为内存映射读取的字节数
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': BLOG_DB_PATH,
     }
 }
 
+if BLOG_DB_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            # 事务开始时即获取写锁，避免读事务升级为写事务时因锁冲突直接失败（此时不会等待 busy_timeout）
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    if BLOG_DB_READ_REPLICA:
+        # 同一数据库文件的只读连接，journal_mode 由写连接设置
+        replica_pragmas = {name: value for name, value in SQLITE_PRAGMAS.items() if name != 'journal_mode'}
+        replica_pragmas['query_only'] = 'ON'
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': f'file:{BLOG_DB_PATH}?mode=ro',
+            'OPTIONS': {
+                'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in replica_pragmas.items()),
+            },
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['blog.routers.ReadReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# 多进程部署时可改用文件缓存：
+# 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+# 'LOCATION': BASE_DIR / 'cache',
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blog',
+    }
+}
+
+# 文章接口响应缓存的有效期（秒），0 表示关闭缓存
+BLOG_CACHE_TIMEOUT = 300
+
+# 令牌认证缓存：有效期（秒，0 表示关闭）和最多缓存的令牌数
+BLOG_TOKEN_CACHE_TTL = 60
+BLOG_TOKEN_CACHE_SIZE = 1024
+
+# 文章浏览计数：是否记录，以及缓冲写入数据库的间隔（秒）和缓冲的最大浏览次数
+BLOG_VIEW_COUNTS = True
+BLOG_VIEW_FLUSH_INTERVAL = 10
+BLOG_VIEW_FLUSH_SIZE = 1000
+
+# 请求指标的采样比例（0 到 1），见 /api/_metrics/
+BLOG_METRICS_SAMPLE_RATE = 1.0
+
+# 文章只读接口（列表、搜索、详情、标签）使用异步视图，asgi.py 中默认开启
+BLOG_ASYNC_VIEWS = os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+
+
+# RSS / Atom / 站点地图：前端站点地址、文章页面路径、订阅标题和描述，以及订阅包含的最新文章数
+BLOG_SITE_URL = os.environ.get('BLOG_SITE_URL', 'http://localhost:5173')
+BLOG_POST_PATH = '/posts/{slug}'
+BLOG_FEED_TITLE = 'Blog'
+BLOG_FEED_DESCRIPTION = ''
+BLOG_FEED_SIZE = 50
+
+# 密码哈希：PBKDF2 迭代次数可通过 BLOG_PASSWORD_ITERATIONS 调整（为空时使用 Django 的默认值），
+# 迭代次数越少登录越快，但密码哈希泄露后越容易被破解
+BLOG_PASSWORD_ITERATIONS = int(os.environ.get('BLOG_PASSWORD_ITERATIONS') or 0) or None
+
+PASSWORD_HASHERS = [
+    'blog.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# 登录和注册的令牌桶限流，令牌桶存储在缓存中（多进程部署时需使用共享缓存）：
+# capacity 为可连续请求的次数，per_minute 为每分钟补充的次数
+BLOG_AUTH_THROTTLES = {
+    'login': {
+        'ip': {'capacity': 20, 'per_minute': 30},
+        'username': {'capacity': 10, 'per_minute': 5},
+    },
+    'register': {
+        'ip': {'capacity': 5, 'per_minute': 2},
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -157,10 +267,15 @@ CORS_ALLOW_HEADERS = [
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'blog.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'blog.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # 客户端 IP（限流标识）取自 X-Forwarded-For 的倒数第 NUM_PROXIES 项，0 表示直接使用 REMOTE_ADDR；
+    # 未设置时 DRF 会直接使用客户端可伪造的整个 X-Forwarded-For 头。部署在反向代理之后时设置为代理层数
+    'NUM_PROXIES': int(os.environ.get('BLOG_NUM_PROXIES') or 0),
 }
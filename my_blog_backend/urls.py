@@ -14,17 +14,45 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
-from blog.views import PostViewSet, AuthViewSet
+from blog.async_views import AsyncPostView
+from blog.views import FeedView, MetricsView, PostViewSet, AuthViewSet
 
 # 创建路由器
 router = DefaultRouter()
 router.register(r'posts', PostViewSet, basename='post')
 router.register(r'auth', AuthViewSet, basename='auth')
 
+# 文章只读接口的异步实现，需放在路由器之前；其他列表级接口（drafts 等）不能被当作 slug 匹配
+list_routes = '|'.join(
+    action.url_path for action in PostViewSet.get_extra_actions() if not action.detail
+)
+async_post_urls = [
+    path('api/posts/', AsyncPostView.as_view(
+        action='list', sync_actions={'get': 'list', 'post': 'create'})),
+    path('api/posts/published/', AsyncPostView.as_view(
+        action='published', sync_actions={'get': 'published'})),
+    path('api/posts/tags/', AsyncPostView.as_view(
+        action='tags', sync_actions={'get': 'tags'})),
+    re_path(rf'^api/posts/(?!(?:{list_routes})/$)(?P<slug>[^/.]+)/$', AsyncPostView.as_view(
+        action='retrieve', sync_actions={
+            'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+        })),
+]
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/_metrics/', MetricsView.as_view(), name='metrics'),
+    path('feed.xml', FeedView.as_view(feed='rss'), name='feed-rss'),
+    path('atom.xml', FeedView.as_view(feed='atom'), name='feed-atom'),
+    path('sitemap.xml', FeedView.as_view(feed='sitemap'), name='sitemap'),
+]
+# ASGI 部署时启用（见 asgi.py）
+if settings.BLOG_ASYNC_VIEWS:
+    urlpatterns += async_post_urls
+urlpatterns += [
     path('api/', include(router.urls)),
 ]